@@ -19,7 +19,7 @@ class User(AbstractUser):
     rol = models.CharField(max_length=20, choices=ROLE_CHOICES, default=OPERADOR)
     nombre_completo = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         db_table = 'users'
@@ -1,9 +1,180 @@
+import json
+from decimal import Decimal
+
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.postgres.search import SearchQuery
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F, Q, Value
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .choices import DeportesChoices
+from .exposicion import Aporte, pendientes_bloqueadas, registrar
 from .models import (
-    Distribuidora, CasaApuestas, Agencia, PerfilOperativo,
+    Distribuidora, CasaApuestas, Ubicacion, Agencia, PerfilOperativo,
     ConfiguracionOperativa, TransaccionFinanciera, PlanificacionRotacion,
-    AlertaOperativa, BitacoraMando
+    AlertaOperativa, BitacoraMando, MovimientoCapital, Operacion, ExposicionAbierta, LiquidacionRake,
+    CONFIG_BUSQUEDA
 )
+from .vinculos import comprobar_vinculos
+
+# Por debajo de este número de filas estimadas se cuenta de verdad
+UMBRAL_CONTEO_EXACTO = 10_000
+
+def conteo_estimado(queryset):
+    """Filas que el planificador estima para el queryset (EXPLAIN, sin ejecutarlo)."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+class ConteoEstimadoPaginator(Paginator):
+    """
+    Paginador que evita el `COUNT(*)` sobre tablas grandes: si el planificador
+    estima más de `UMBRAL_CONTEO_EXACTO` filas usa la estimación (las últimas
+    páginas pueden salir vacías o faltar); si no, cuenta.
+    """
+
+    estimado = False
+
+    @cached_property
+    def count(self):
+        estimado = conteo_estimado(self.object_list)
+        if estimado < UMBRAL_CONTEO_EXACTO:
+            return self.object_list.count()
+        self.estimado = True
+        return estimado
+
+class ListadoLigeroMixin:
+    """
+    Listados de admin para tablas grandes: total estimado, sin el segundo
+    `COUNT(*)` del total sin filtrar y, en el listado, solo las columnas de
+    `columnas_listado` (con `list_select_related` para las relaciones).
+    """
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+    columnas_listado = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # Solo en el listado: el formulario de edición necesita todos los campos
+        resolver_match = getattr(request, 'resolver_match', None)
+        if self.columnas_listado and resolver_match and resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.only(*self.columnas_listado)
+        return queryset
+
+# Parámetro de la ChangeList con la clave de la última fila mostrada
+CURSOR_VAR = 'tras'
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList paginada por keyset en lugar de OFFSET: el orden es siempre el
+    `ordering` del admin, `(campo_keyset, pk)` descendente, y `?tras=<valor>|<pk>`
+    pide las filas posteriores a la última mostrada. El coste de una página
+    no depende de lo lejos que esté y el total es el del paginador del admin.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.siguiente = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        return list(self.model_admin.ordering)
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # Fuera de `params`: los enlaces de filtros y búsqueda vuelven al inicio
+        self.params.pop(CURSOR_VAR, None)
+        self.filter_params.pop(CURSOR_VAR, None)
+        queryset = super().get_queryset(request, exclude_parameters)
+        if exclude_parameters is None:
+            # El total se cuenta sin el cursor
+            self.queryset_completo = queryset
+        if not self.cursor:
+            return queryset
+        campo = self.model_admin.campo_keyset
+        try:
+            valor, pk = self.cursor.rsplit('|', 1)
+            valor = self.opts.get_field(campo).to_python(valor)
+            pk = self.opts.pk.to_python(pk)
+        except (ValueError, ValidationError):
+            raise IncorrectLookupParameters
+        return queryset.filter(Q(**{f'{campo}__lt': valor}) | Q(**{campo: valor, 'pk__lt': pk}))
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset_completo, self.list_per_page)
+        filas = list(self.queryset[:self.list_per_page + 1])
+        if len(filas) > self.list_per_page:
+            ultima = filas[self.list_per_page - 1]
+            valor = getattr(ultima, self.model_admin.campo_keyset)
+            self.siguiente = self.get_query_string({CURSOR_VAR: f'{valor.isoformat()}|{ultima.pk}'})
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = filas[:self.list_per_page]
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.siguiente)
+        self.paginator = paginator
+        self.primera_pagina = self.get_query_string(remove=[CURSOR_VAR])
+
+class PaginacionKeysetMixin(ListadoLigeroMixin):
+    """Admin con `KeysetChangeList`; requiere `campo_keyset` y `ordering` a juego."""
+    change_list_template = 'admin/gestion_operativa/change_list_keyset.html'
+    # Ordenar por otra columna rompería el keyset
+    sortable_by = ()
+    campo_keyset = None
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+class DeporteListFilter(admin.SimpleListFilter):
+    """Deportes de `DeportesChoices`, sin el SELECT DISTINCT de un filtro por valores."""
+    title = 'deporte'
+    parameter_name = 'deporte'
+
+    def lookups(self, request, model_admin):
+        return DeportesChoices.choices
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(deporte=self.value())
+        return queryset
+
+# Payout y P&L de cada liquidación, calculados en base de datos
+LIQUIDACIONES = {
+    'GANADA': (F('importe') * F('cuota'), F('importe') * F('cuota') - F('importe')),
+    'PERDIDA': (Value(Decimal('0')), -F('importe')),
+    'ANULADA': (F('importe'), Value(Decimal('0'))),
+}
+
+def liquidar_operaciones(queryset, estado):
+    """
+    Liquida con un solo UPDATE las operaciones PENDIENTE del queryset y
+    descuenta su exposición abierta en la misma transacción.
+    """
+    payout, profit_loss = LIQUIDACIONES[estado]
+    with transaction.atomic():
+        aportes = pendientes_bloqueadas(queryset)
+        liquidadas = queryset.filter(pk__in=list(aportes)).update(
+            estado=estado, payout=payout, profit_loss=profit_loss,
+            # update() no aplica auto_now
+            fecha_actualizacion=timezone.now(),
+        )
+        registrar(quitar=aportes.values())
+    return liquidadas
 
 @admin.register(Distribuidora)
 class DistribuidoraAdmin(admin.ModelAdmin):
@@ -16,28 +187,168 @@ class CasaApuestasAdmin(admin.ModelAdmin):
     list_display = ('nombre', 'distribuidora', 'capital_activo_hoy', 'activo')
     search_fields = ('nombre', 'distribuidora__nombre')
     list_filter = ('activo', 'distribuidora')
+    ordering = ('nombre', 'id_casa')
+    readonly_fields = ('capital_activo_hoy', 'capital_total', 'fecha_actualizacion_capital')
+
+@admin.register(MovimientoCapital)
+class MovimientoCapitalAdmin(admin.ModelAdmin):
+    list_display = ('casa', 'concepto', 'monto_activo', 'monto_total', 'fecha_registro', 'usuario_registro')
+    list_filter = ('concepto',)
+    search_fields = ('casa__nombre',)
+    list_select_related = ('casa', 'usuario_registro')
+    raw_id_fields = ('transaccion',)
+
+    def has_change_permission(self, request, obj=None):
+        # El libro es inmutable: los errores se corrigen con un AJUSTE
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_add_permission(self, request):
+        # Un alta desde el admin no aplicaría el delta al saldo de la casa
+        return False
+
+@admin.register(LiquidacionRake)
+class LiquidacionRakeAdmin(admin.ModelAdmin):
+    list_display = ('agencia', 'mes', 'secuencia', 'base', 'rake_porcentaje', 'volumen', 'pnl', 'rake', 'fecha_registro')
+    list_filter = ('base',)
+    search_fields = ('agencia__nombre',)
+    list_select_related = ('agencia',)
+    date_hierarchy = 'mes'
+    ordering = ('-mes', 'agencia', 'secuencia')
+
+    def has_change_permission(self, request, obj=None):
+        # Libro inmutable: las diferencias se añaden como ajustes al volver a liquidar
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(Ubicacion)
+class UbicacionAdmin(admin.ModelAdmin):
+    list_display = ('ciudad', 'provincia_estado', 'pais', 'direccion')
+    search_fields = ('ciudad', 'direccion', 'provincia_estado')
+    list_filter = ('pais',)
+    ordering = ('ciudad', 'id_ubicacion')
 
 @admin.register(Agencia)
 class AgenciaAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'ubicacion', 'responsable', 'activo')
+    list_display = ('nombre', 'ubicacion', 'responsable', 'rake_porcentaje', 'base_rake', 'activo')
+    list_select_related = ('ubicacion',)
+    autocomplete_fields = ('ubicacion',)
     search_fields = ('nombre', 'responsable')
     list_filter = ('activo',)
+    ordering = ('nombre', 'id_agencia')
 
 @admin.register(PerfilOperativo)
-class PerfilOperativoAdmin(admin.ModelAdmin):
+class PerfilOperativoAdmin(ListadoLigeroMixin, admin.ModelAdmin):
     list_display = ('nombre_usuario', 'casa', 'agencia', 'tipo_jugador', 'nivel_cuenta', 'activo')
+    list_select_related = ('casa', 'agencia')
+    columnas_listado = (
+        'nombre_usuario', 'tipo_jugador', 'nivel_cuenta', 'activo', 'casa__nombre', 'agencia__nombre',
+    )
+    # Casa y agencia se filtran buscando por nombre: como filtro lateral
+    # cargarían todas las filas relacionadas en cada página
     search_fields = ('nombre_usuario', 'casa__nombre', 'agencia__nombre')
-    list_filter = ('activo', 'tipo_jugador', 'nivel_cuenta', 'casa', 'agencia')
+    list_filter = ('activo', 'tipo_jugador', 'nivel_cuenta')
+    autocomplete_fields = ('usuario', 'casa', 'agencia')
+    ordering = ('nombre_usuario', 'id_perfil')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change or {'ip_operativa', 'casa'} & set(form.changed_data):
+            comprobar_vinculos(obj)
 
 @admin.register(ConfiguracionOperativa)
 class ConfiguracionOperativaAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'capital_total_activos', 'actualizar_meta_diariamente')
 
 @admin.register(TransaccionFinanciera)
-class TransaccionFinancieraAdmin(admin.ModelAdmin):
+class TransaccionFinancieraAdmin(ListadoLigeroMixin, admin.ModelAdmin):
     list_display = ('id_transaccion', 'perfil', 'tipo_transaccion', 'monto', 'estado', 'fecha_transaccion')
-    list_filter = ('tipo_transaccion', 'estado', 'fecha_transaccion')
+    list_select_related = ('perfil__casa',)
+    columnas_listado = (
+        'tipo_transaccion', 'monto', 'estado', 'fecha_transaccion',
+        'perfil__nombre_usuario', 'perfil__casa__nombre',
+    )
+    list_filter = ('tipo_transaccion', 'estado')
     search_fields = ('perfil__nombre_usuario',)
+    autocomplete_fields = ('perfil',)
+    # Sigue a transacciones_fecha_idx y permite descartar particiones por mes
+    date_hierarchy = 'fecha_transaccion'
+    ordering = ('-fecha_transaccion', '-id_transaccion')
+
+@admin.register(Operacion)
+class OperacionAdmin(PaginacionKeysetMixin, admin.ModelAdmin):
+    list_display = (
+        'id_operacion', 'fecha_registro', 'perfil', 'deporte', 'mercado',
+        'importe', 'cuota', 'estado', 'profit_loss',
+    )
+    list_select_related = ('perfil__casa',)
+    columnas_listado = (
+        'fecha_registro', 'deporte', 'mercado', 'importe', 'cuota', 'estado', 'profit_loss',
+        'perfil__nombre_usuario', 'perfil__casa__nombre',
+    )
+    # Ambos filtros tienen índice (estado|deporte, fecha_registro)
+    list_filter = ('estado', DeporteListFilter)
+    search_fields = ('perfil__nombre_usuario',)
+    autocomplete_fields = ('perfil',)
+    # Filtra por rangos de fecha_registro: descarta particiones
+    date_hierarchy = 'fecha_registro'
+    campo_keyset = 'fecha_registro'
+    ordering = ('-fecha_registro', '-id_operacion')
+    actions = ['liquidar_ganadas', 'liquidar_perdidas', 'liquidar_anuladas']
+
+    # Los cambios desde el admin mueven la exposición abierta, sin comprobar límites
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            anterior = pendientes_bloqueadas(Operacion.objects.filter(pk=obj.pk)).get(obj.pk) if change else None
+            super().save_model(request, obj, form, change)
+            registrar(quitar=[anterior], poner=[Aporte.de(obj)])
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Operacion.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            aportes = pendientes_bloqueadas(queryset)
+            super().delete_queryset(request, queryset)
+            registrar(quitar=aportes.values())
+
+    def _liquidar(self, request, queryset, estado):
+        liquidadas = liquidar_operaciones(queryset, estado)
+        self.message_user(request, f'{liquidadas} operaciones pendientes liquidadas como {estado}.')
+
+    @admin.action(description='Liquidar como GANADA (payout = importe × cuota)', permissions=['change'])
+    def liquidar_ganadas(self, request, queryset):
+        self._liquidar(request, queryset, 'GANADA')
+
+    @admin.action(description='Liquidar como PERDIDA', permissions=['change'])
+    def liquidar_perdidas(self, request, queryset):
+        self._liquidar(request, queryset, 'PERDIDA')
+
+    @admin.action(description='Liquidar como ANULADA (se devuelve el importe)', permissions=['change'])
+    def liquidar_anuladas(self, request, queryset):
+        self._liquidar(request, queryset, 'ANULADA')
+
+@admin.register(ExposicionAbierta)
+class ExposicionAbiertaAdmin(admin.ModelAdmin):
+    list_display = ('ambito', 'clave', 'num_operaciones', 'importe_abierto', 'payout_potencial', 'limite_importe')
+    list_filter = ('ambito',)
+    search_fields = ('clave',)
+    ordering = ('-importe_abierto', 'ambito', 'clave')
+    # Los agregados los mantienen las operaciones; solo el límite es editable
+    readonly_fields = ('ambito', 'clave', 'num_operaciones', 'importe_abierto', 'payout_potencial', 'fecha_actualizacion')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 @admin.register(PlanificacionRotacion)
 class PlanificacionRotacionAdmin(admin.ModelAdmin):
@@ -52,4 +363,19 @@ class AlertaOperativaAdmin(admin.ModelAdmin):
 @admin.register(BitacoraMando)
 class BitacoraMandoAdmin(admin.ModelAdmin):
     list_display = ('perfil', 'fecha_registro', 'usuario_registro')
-    search_fields = ('perfil__nombre_usuario', 'observacion')
+    search_fields = ('perfil__nombre_usuario',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Busca en las observaciones con el índice full-text en vez de ILIKE. Un
+        OR entre el texto y el perfil (que exige el JOIN) impide usar el índice
+        GIN: cada rama se resuelve por separado y se unen sus ids con UNION.
+        """
+        if not search_term:
+            return queryset, False
+        consulta = SearchQuery(search_term, config=CONFIG_BUSQUEDA, search_type='websearch')
+        por_perfil, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        ids = BitacoraMando.objects.filter(observacion_busqueda=consulta).values('pk').union(
+            por_perfil.order_by().values('pk')
+        )
+        return queryset.filter(pk__in=ids), may_have_duplicates
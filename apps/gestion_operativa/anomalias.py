@@ -0,0 +1,157 @@
+"""
+Detección por lotes de cambios bruscos en el comportamiento de apuesta.
+
+Las casas limitan las cuentas cuyo patrón cambia de golpe. Para un día dado
+se compara, en todos los perfiles a la vez, la actividad del día con la de
+los `dias_base` días anteriores:
+
+- `PICO_STAKE`: z-score del mayor stake del día frente a la media y la
+  desviación típica de los stakes de la ventana base.
+- `RAFAGA_OPERACIONES`: operaciones del día frente al ritmo esperado
+  (`meta_ops_semanales / 7`; sin meta, la media diaria de la ventana base).
+- `MERCADO_INUSUAL`: cuota de operaciones del día en deportes distintos del
+  `deporte_dna` del perfil, frente a la cuota habitual de la ventana base.
+
+Una sola consulta agrupada por perfil (agregados con `filter` sobre la
+ventana base y el día) trae las estadísticas como array de NumPy; los
+umbrales se evalúan vectorizados y las alertas se crean con `bulk_create`.
+No se abre una alerta si el perfil ya tiene otra ABIERTA del mismo tipo.
+"""
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db.models import Avg, Count, F, FloatField, Max, Q, StdDev
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import AlertaOperativa, Operacion
+from .simulacion import matriz
+
+PICO_STAKE = 'PICO_STAKE'
+RAFAGA_OPERACIONES = 'RAFAGA_OPERACIONES'
+MERCADO_INUSUAL = 'MERCADO_INUSUAL'
+TIPOS = [PICO_STAKE, RAFAGA_OPERACIONES, MERCADO_INUSUAL]
+
+COLUMNAS = [
+    'perfil_id', 'perfil__casa_id', 'meta', 'base_operaciones', 'base_media', 'base_desviacion',
+    'base_fuera_dna', 'dia_operaciones', 'dia_maximo', 'dia_fuera_dna',
+]
+
+
+@dataclass
+class UmbralesAnomalia:
+    z_stake: float = 3.0
+    # Operaciones del día a partir de este múltiplo del ritmo esperado
+    factor_ritmo: float = 3.0
+    min_operaciones_dia: int = 5
+    # Cuota fuera del deporte_dna y aumento mínimo sobre la habitual
+    cuota_fuera_dna: float = 0.5
+    aumento_fuera_dna: float = 0.3
+    # Operaciones mínimas en la ventana base para fiarse de sus estadísticas
+    min_operaciones_base: int = 10
+
+
+def estadisticas(dia, dias_base=28):
+    """
+    Estadísticas por perfil de la ventana base y del día (fecha local) como
+    array (perfiles × COLUMNAS). Solo aparecen los perfiles que operaron ese día.
+    """
+    inicio_dia = timezone.make_aware(datetime.combine(dia, time.min))
+    fin_dia = inicio_dia + timedelta(days=1)
+    inicio_base = inicio_dia - timedelta(days=dias_base)
+    en_dia = Q(fecha_registro__gte=inicio_dia)
+    en_base = Q(fecha_registro__lt=inicio_dia)
+    fuera_dna = Q(deporte__isnull=False) & ~Q(deporte=F('perfil__deporte_dna'))
+    stake = Cast('importe', FloatField())
+
+    queryset = Operacion.objects.filter(
+        fecha_registro__gte=inicio_base, fecha_registro__lt=fin_dia,
+    ).order_by().values('perfil_id', 'perfil__casa_id').annotate(
+        meta=Max('perfil__meta_ops_semanales'),
+        base_operaciones=Count('pk', filter=en_base),
+        base_media=Avg(stake, filter=en_base),
+        base_desviacion=StdDev(stake, filter=en_base),
+        base_fuera_dna=Count('pk', filter=en_base & fuera_dna),
+        dia_operaciones=Count('pk', filter=en_dia),
+        dia_maximo=Max(stake, filter=en_dia),
+        dia_fuera_dna=Count('pk', filter=en_dia & fuera_dna),
+    ).filter(dia_operaciones__gt=0).values_list(*COLUMNAS)
+    return matriz(queryset)
+
+
+def detectar_anomalias(dia=None, dias_base=28, umbrales=None, crear=True):
+    """
+    Evalúa el día indicado (por defecto, hoy) y devuelve las alertas nuevas;
+    con `crear=False` no las guarda.
+    """
+    dia = dia or timezone.localdate()
+    umbrales = umbrales or UmbralesAnomalia()
+    datos = estadisticas(dia, dias_base)
+    columna = dict(zip(COLUMNAS, datos.T))
+
+    base_n = columna['base_operaciones']
+    dia_n = columna['dia_operaciones']
+    fiable = base_n >= umbrales.min_operaciones_base
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (columna['dia_maximo'] - columna['base_media']) / columna['base_desviacion']
+        esperado = np.where(columna['meta'] > 0, columna['meta'] / 7, base_n / dias_base)
+        ritmo = dia_n / esperado
+        cuota_dia = columna['dia_fuera_dna'] / dia_n
+        cuota_base = columna['base_fuera_dna'] / base_n
+
+    # Los NaN/inf (sin desviación o sin base) no superan ningún umbral
+    detecciones = {
+        PICO_STAKE: (fiable & np.isfinite(z) & (z >= umbrales.z_stake), z, umbrales.z_stake),
+        RAFAGA_OPERACIONES: (
+            (dia_n >= umbrales.min_operaciones_dia) & (esperado > 0) & (ritmo >= umbrales.factor_ritmo),
+            ritmo, umbrales.factor_ritmo,
+        ),
+        MERCADO_INUSUAL: (
+            fiable & (dia_n >= umbrales.min_operaciones_dia)
+            & (cuota_dia >= umbrales.cuota_fuera_dna)
+            & (cuota_dia - cuota_base >= umbrales.aumento_fuera_dna),
+            cuota_dia, umbrales.cuota_fuera_dna,
+        ),
+    }
+
+    perfiles = columna['perfil_id'].astype(np.int64)
+    abiertas = set(
+        AlertaOperativa.objects.filter(
+            perfil_afectado__in=perfiles[np.logical_or.reduce([m for m, _, _ in detecciones.values()])].tolist(),
+            tipo_alerta__in=TIPOS, estado='ABIERTA',
+        ).values_list('perfil_afectado_id', 'tipo_alerta')
+    )
+
+    alertas = []
+    for tipo, (marcados, valores, umbral) in detecciones.items():
+        for i in np.flatnonzero(marcados):
+            perfil = int(perfiles[i])
+            if (perfil, tipo) in abiertas:
+                continue
+            casa = columna['perfil__casa_id'][i]
+            alertas.append(AlertaOperativa(
+                tipo_alerta=tipo,
+                descripcion=_descripcion(tipo, dia, i, columna, valores[i], esperado[i], cuota_base[i]),
+                severidad='ALTA' if valores[i] >= 2 * umbral else 'MEDIA',
+                perfil_afectado_id=perfil,
+                casa_afectada_id=None if np.isnan(casa) else int(casa),
+                estado='ABIERTA',
+            ))
+    if crear:
+        AlertaOperativa.objects.bulk_create(alertas, batch_size=1000)
+    return alertas
+
+
+def _descripcion(tipo, dia, i, columna, valor, esperado, cuota_base):
+    if tipo == PICO_STAKE:
+        return (
+            f'{dia}: stake máximo {columna["dia_maximo"][i]:.2f} a {valor:.1f} desviaciones de la '
+            f'media ({columna["base_media"][i]:.2f} en {int(columna["base_operaciones"][i])} operaciones)'
+        )
+    if tipo == RAFAGA_OPERACIONES:
+        return f'{dia}: {int(columna["dia_operaciones"][i])} operaciones frente a {esperado:.1f} esperadas al día'
+    return (
+        f'{dia}: {valor:.0%} de las operaciones fuera del deporte DNA '
+        f'(habitual {0 if np.isnan(cuota_base) else cuota_base:.0%})'
+    )
@@ -0,0 +1,101 @@
+"""
+Archivo de operaciones liquidadas.
+
+Las operaciones GANADA/PERDIDA/ANULADA anteriores a un corte se mueven de
+`operaciones` a `operaciones_archivo` por lotes. Cada lote es una sola
+sentencia: el DELETE ... RETURNING alimenta a la vez el INSERT en el
+archivo y el acumulado en `operaciones_resumen_mensual`, de modo que una
+fila nunca está en las dos tablas ni se cuenta dos veces en el resumen.
+
+Las consultas leen el archivo solo cuando se pide (`?incluir_archivo=true`):
+los listados unen ambas tablas y los agregados suman el resumen mensual.
+"""
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+from .models import Operacion, OperacionArchivada, ResumenOperacionMensual
+
+ESTADOS_LIQUIDADOS = ['GANADA', 'PERDIDA', 'ANULADA']
+
+COLUMNAS = [
+    'id_operacion', 'perfil_id', 'fecha_registro', 'importe', 'cuota', 'estado',
+    'payout', 'profit_loss', 'deporte', 'mercado', 'fecha_actualizacion',
+]
+
+
+@dataclass
+class ResultadoArchivo:
+    lotes: int = 0
+    operaciones: int = 0
+
+
+def incluir_archivo(request):
+    """`?incluir_archivo=true|1` en la petición."""
+    return request.query_params.get('incluir_archivo', '').lower() in ('1', 'true')
+
+
+def candidatas(antes_de):
+    """Operaciones liquidadas anteriores al corte, en orden de archivo."""
+    return Operacion.objects.filter(
+        estado__in=ESTADOS_LIQUIDADOS, fecha_registro__lt=antes_de
+    ).order_by('fecha_registro', 'id_operacion')
+
+
+def _sql_lote():
+    qn = connection.ops.quote_name
+    operaciones = qn(Operacion._meta.db_table)
+    archivo = qn(OperacionArchivada._meta.db_table)
+    resumen = qn(ResumenOperacionMensual._meta.db_table)
+    columnas = ', '.join(qn(columna) for columna in COLUMNAS)
+    acumulados = ', '.join(
+        f'{campo} = {resumen}.{campo} + EXCLUDED.{campo}'
+        for campo in ('num_operaciones', 'importe_total', 'payout_total', 'profit_loss_total')
+    )
+    return f"""
+        WITH movidas AS (
+            DELETE FROM {operaciones}
+            WHERE id_operacion = ANY(%s) AND fecha_registro < %s AND estado = ANY(%s)
+            RETURNING {columnas}
+        ), archivadas AS (
+            INSERT INTO {archivo} ({columnas}, fecha_archivo)
+            SELECT {columnas}, now() FROM movidas
+        ), resumidas AS (
+            INSERT INTO {resumen} (
+                perfil_id, mes, deporte, mercado, estado,
+                num_operaciones, importe_total, payout_total, profit_loss_total
+            )
+            SELECT
+                perfil_id,
+                date_trunc('month', fecha_registro AT TIME ZONE 'UTC')::date,
+                COALESCE(deporte, ''), COALESCE(mercado, ''), estado,
+                count(*), sum(importe), COALESCE(sum(payout), 0), COALESCE(sum(profit_loss), 0)
+            FROM movidas
+            GROUP BY 1, 2, 3, 4, 5
+            ON CONFLICT (perfil_id, mes, deporte, mercado, estado) DO UPDATE SET {acumulados}
+        )
+        SELECT count(*) FROM movidas
+    """
+
+
+def archivar_operaciones(antes_de, lote=5000, progreso=None):
+    """
+    Archiva por lotes las operaciones liquidadas anteriores a `antes_de`.
+
+    Cada lote es una transacción independiente, así que el proceso puede
+    interrumpirse y retomarse. `progreso(resultado)` se invoca tras cada lote.
+    """
+    sql = _sql_lote()
+    resultado = ResultadoArchivo()
+    while True:
+        ids = list(candidatas(antes_de).values_list('pk', flat=True)[:lote])
+        if not ids:
+            return resultado
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Se repite el filtro por si alguna fila cambió desde la selección
+            cursor.execute(sql, [ids, antes_de, ESTADOS_LIQUIDADOS])
+            movidas = cursor.fetchone()[0]
+        resultado.lotes += 1
+        resultado.operaciones += movidas
+        if progreso:
+            progreso(resultado)
@@ -0,0 +1,287 @@
+"""
+Backtesting de políticas de stake sobre el historial de operaciones.
+
+Reproduce las operaciones liquidadas de cada perfil en orden cronológico,
+con su cuota y su resultado reales, pero con el stake que habría decidido
+cada regla partiendo de un bankroll común:
+
+- `historico`: el importe que se apostó de verdad (referencia).
+- `plano`: un importe fijo por apuesta.
+- `porcentaje`: una fracción del bankroll del momento.
+- `kelly`: la fracción de Kelly `(p * cuota - 1) / (cuota - 1)` por un
+  multiplicador y con tope, donde `p` es la tasa de acierto del perfil hasta
+  la apuesta anterior (suavizada; sin mirar al futuro).
+
+Con `plano` e `historico` el perfil deja de apostar en cuanto su bankroll
+llega a cero (`quebrado`). Por perfil y por grupo (nivel de cuenta, tipo de
+jugador, casa o agencia) se informa P&L, ROI, drawdown máximo y volatilidad
+(desviación de la rentabilidad por apuesta sobre el bankroll previo).
+
+El historial, incluidas las operaciones archivadas, se lee por lotes de
+`tamano_lote` filas por keyset sobre `(fecha_registro, id_operacion)`, el
+orden de `operaciones_fecha_idx` y `archivo_fecha_idx`. Cada lote se procesa
+con operaciones vectorizadas agrupando por perfil, y entre lotes solo se
+arrastran unos acumulados por perfil y regla: la memoria no depende del
+tamaño del historial.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db.models import BigIntegerField, Case, F, FloatField, Func, Q, Value, When
+from django.db.models.functions import Cast
+
+from .models import Operacion, OperacionArchivada
+from .simulacion import LIQUIDADAS, matriz, rendimiento_por_unidad
+
+HISTORICO = 'historico'
+PLANO = 'plano'
+PORCENTAJE = 'porcentaje'
+KELLY = 'kelly'
+REGLAS = [HISTORICO, PLANO, PORCENTAJE, KELLY]
+
+# Agrupación -> campo de PerfilOperativo
+AGRUPACIONES = {
+    'nivel_cuenta': 'nivel_cuenta',
+    'tipo_jugador': 'tipo_jugador',
+    'casa': 'casa_id',
+    'agencia': 'agencia_id',
+}
+
+TAMANO_LOTE = 100_000
+EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Columnas de cada lote
+MICROSEGUNDOS, ID, PERFIL, STAKE, CUOTA, RENDIMIENTO, RESULTADO = range(7)
+
+
+@dataclass
+class ParametrosStake:
+    bankroll: float = 1000.0
+    importe: float = 10.0
+    fraccion: float = 0.02
+    kelly_multiplicador: float = 0.5
+    kelly_tope: float = 0.1
+
+
+class Acumulados:
+    """Estado de una regla por perfil que se arrastra de un lote al siguiente."""
+
+    def __init__(self, perfiles, bankroll):
+        self.bankroll = np.full(perfiles, bankroll, dtype=np.float64)
+        self.pico = np.full(perfiles, bankroll, dtype=np.float64)
+        self.drawdown = np.zeros(perfiles)
+        self.quebrado = np.zeros(perfiles, dtype=bool)
+        self.apostado = np.zeros(perfiles)
+        self.pnl = np.zeros(perfiles)
+        self.apuestas = np.zeros(perfiles, dtype=np.int64)
+        self.suma_rentabilidad = np.zeros(perfiles)
+        self.suma_cuadrados = np.zeros(perfiles)
+
+
+def _acumulado(valores, inicios, tamanos):
+    """Suma acumulada que vuelve a empezar en cada grupo contiguo."""
+    total = np.cumsum(valores)
+    return total - np.repeat(total[inicios] - valores[inicios], tamanos)
+
+
+def _maximo_acumulado(valores, tamanos):
+    """
+    Máximo acumulado por grupo contiguo: desplazando cada grupo por encima
+    del anterior, un único `maximum.accumulate` no arrastra el máximo de un
+    grupo al siguiente.
+    """
+    paso = np.ptp(valores) + 1
+    desplazamiento = np.repeat(np.arange(len(tamanos)) * paso, tamanos)
+    return np.maximum.accumulate(valores + desplazamiento) - desplazamiento
+
+
+def _historial(modelo, perfiles, desde, hasta):
+    """Operaciones liquidadas de `modelo` (vivas o archivadas) como columnas numéricas."""
+    flotante = FloatField()
+    queryset = modelo.objects.filter(perfil__in=perfiles, estado__in=LIQUIDADAS)
+    if desde:
+        queryset = queryset.filter(fecha_registro__gte=desde)
+    if hasta:
+        queryset = queryset.filter(fecha_registro__lt=hasta)
+    return queryset.annotate(
+        # Entero exacto: reconstruye la fecha del keyset sin perder precisión
+        microsegundos=Func(
+            F('fecha_registro'), template='(EXTRACT(EPOCH FROM %(expressions)s) * 1000000)::bigint',
+            output_field=BigIntegerField(),
+        ),
+        stake=Cast('importe', flotante),
+        cuota_decimal=Cast('cuota', flotante),
+        rendimiento=rendimiento_por_unidad(),
+        resultado=Case(
+            When(estado='GANADA', then=Value(1)),
+            When(estado='PERDIDA', then=Value(0)),
+            default=Value(-1),
+        ),
+    ).order_by('fecha_registro', 'id_operacion').values_list(
+        'microsegundos', 'id_operacion', 'perfil_id', 'stake', 'cuota_decimal', 'rendimiento', 'resultado'
+    )
+
+
+def lotes(perfiles, desde=None, hasta=None, tamano_lote=TAMANO_LOTE):
+    """
+    Operaciones liquidadas de los perfiles en orden cronológico, por lotes
+    (arrays), incluidas las archivadas. Cada lote mezcla las `tamano_lote`
+    siguientes de `operaciones` y de `operaciones_archivo` (cada una por su
+    índice de fecha) en un UNION ALL ordenado: el archivo conserva el id, así
+    que el keyset es el mismo en las dos tablas.
+    """
+    consultas = [_historial(modelo, perfiles, desde, hasta) for modelo in (Operacion, OperacionArchivada)]
+    posterior = Q()
+    while True:
+        vivas, archivadas = (consulta.filter(posterior)[:tamano_lote] for consulta in consultas)
+        lote = matriz(vivas.union(archivadas, all=True).order_by('microsegundos', 'id_operacion')[:tamano_lote])
+        if len(lote):
+            yield lote
+        if len(lote) < tamano_lote:
+            return
+        fecha = EPOCA + timedelta(microseconds=int(lote[-1, MICROSEGUNDOS]))
+        ultimo = int(lote[-1, ID])
+        posterior = Q(fecha_registro__gt=fecha) | Q(fecha_registro=fecha, id_operacion__gt=ultimo)
+
+
+def backtest(perfiles, reglas=REGLAS, parametros=None, agrupar='nivel_cuenta', desde=None, hasta=None,
+             tamano_lote=TAMANO_LOTE):
+    """
+    Reproduce el historial de los perfiles (queryset de PerfilOperativo) con
+    cada regla. Devuelve `{regla: {'perfiles': [...], 'grupos': [...]}}` más
+    el número de operaciones y lotes procesados.
+    """
+    parametros = parametros or ParametrosStake()
+    filas = list(perfiles.order_by('pk').values_list('pk', AGRUPACIONES[agrupar]))
+    ids = np.array([pk for pk, _ in filas], dtype=np.int64)
+    estados = {regla: Acumulados(len(ids), parametros.bankroll) for regla in reglas}
+    ganadas = np.zeros(len(ids), dtype=np.int64)
+    decididas = np.zeros(len(ids), dtype=np.int64)
+
+    operaciones = num_lotes = 0
+    for lote in lotes(perfiles.values('pk'), desde, hasta, tamano_lote):
+        operaciones += len(lote)
+        num_lotes += 1
+        # Agrupa por perfil conservando el orden cronológico dentro de cada uno
+        indice = np.searchsorted(ids, lote[:, PERFIL].astype(np.int64))
+        orden = np.argsort(indice, kind='stable')
+        lote, indice = lote[orden], indice[orden]
+        inicios = np.flatnonzero(np.r_[True, indice[1:] != indice[:-1]])
+        tamanos = np.diff(np.r_[inicios, len(indice)])
+        presentes = indice[inicios]
+
+        # Tasa de acierto previa a cada apuesta (regla de Laplace), para Kelly
+        gana = (lote[:, RESULTADO] == 1).astype(np.int64)
+        decide = (lote[:, RESULTADO] >= 0).astype(np.int64)
+        ganadas_antes = np.repeat(ganadas[presentes], tamanos) + _acumulado(gana, inicios, tamanos) - gana
+        decididas_antes = np.repeat(decididas[presentes], tamanos) + _acumulado(decide, inicios, tamanos) - decide
+        probabilidad = (ganadas_antes + 1) / (decididas_antes + 2)
+        ganadas[presentes] += np.add.reduceat(gana, inicios)
+        decididas[presentes] += np.add.reduceat(decide, inicios)
+
+        for regla, estado in estados.items():
+            _aplicar(regla, estado, lote, probabilidad, presentes, inicios, tamanos, parametros)
+
+    return {
+        'operaciones': operaciones,
+        'lotes': num_lotes,
+        'reglas': {
+            regla: _informe(estado, ids, [grupo for _, grupo in filas], parametros.bankroll)
+            for regla, estado in estados.items()
+        },
+    }
+
+
+def _aplicar(regla, estado, lote, probabilidad, presentes, inicios, tamanos, parametros):
+    rendimiento = lote[:, RENDIMIENTO]
+    inicial = np.repeat(estado.bankroll[presentes], tamanos)
+
+    if regla in (HISTORICO, PLANO):
+        stake = lote[:, STAKE].copy() if regla == HISTORICO else np.full(len(lote), parametros.importe)
+        despues = inicial + _acumulado(stake * rendimiento, inicios, tamanos)
+        # Sin bankroll no se apuesta más: se anulan las apuestas tras la quiebra
+        quiebra = (despues <= 0).astype(np.int64)
+        quebrado = np.repeat(estado.quebrado[presentes], tamanos) | (_acumulado(quiebra, inicios, tamanos) - quiebra > 0)
+        stake[quebrado] = 0
+        pnl = stake * rendimiento
+        despues = inicial + _acumulado(pnl, inicios, tamanos)
+        antes = despues - pnl
+        estado.quebrado[presentes] |= np.logical_or.reduceat(despues <= 0, inicios)
+    else:
+        if regla == PORCENTAJE:
+            fraccion = np.full(len(lote), parametros.fraccion)
+        else:
+            cuota = lote[:, CUOTA]
+            ventaja = np.divide(
+                probabilidad * cuota - 1, cuota - 1, out=np.zeros(len(lote)), where=cuota > 1
+            )
+            fraccion = np.clip(ventaja * parametros.kelly_multiplicador, 0, parametros.kelly_tope)
+        factor = 1 + fraccion * rendimiento
+        despues = inicial * np.exp(_acumulado(np.log(factor), inicios, tamanos))
+        antes = despues / factor
+        stake = fraccion * antes
+        pnl = stake * rendimiento
+
+    pico = np.maximum(np.repeat(estado.pico[presentes], tamanos), _maximo_acumulado(despues, tamanos))
+    caida = np.clip(np.divide(pico - despues, pico, out=np.ones(len(lote)), where=pico > 0), 0, 1)
+    finales = inicios + tamanos - 1
+    estado.drawdown[presentes] = np.maximum(estado.drawdown[presentes], np.maximum.reduceat(caida, inicios))
+    estado.pico[presentes] = pico[finales]
+    estado.bankroll[presentes] = despues[finales]
+
+    apuesta = (stake > 0) & (antes > 0)
+    rentabilidad = np.divide(pnl, antes, out=np.zeros(len(lote)), where=apuesta)
+    estado.apostado[presentes] += np.add.reduceat(stake, inicios)
+    estado.pnl[presentes] += np.add.reduceat(pnl, inicios)
+    estado.apuestas[presentes] += np.add.reduceat(apuesta.astype(np.int64), inicios)
+    estado.suma_rentabilidad[presentes] += np.add.reduceat(rentabilidad, inicios)
+    estado.suma_cuadrados[presentes] += np.add.reduceat(rentabilidad ** 2, inicios)
+
+
+def _volatilidad(suma, cuadrados, n):
+    media = np.divide(suma, n, out=np.zeros(len(n)), where=n > 0)
+    varianza = np.divide(cuadrados, n, out=np.zeros(len(n)), where=n > 0) - media ** 2
+    return np.sqrt(np.maximum(varianza, 0))
+
+
+def _informe(estado, ids, grupos, bankroll):
+    activos = np.flatnonzero(estado.apuestas > 0)
+    roi = np.divide(estado.pnl, estado.apostado, out=np.zeros(len(ids)), where=estado.apostado > 0)
+    volatilidad = _volatilidad(estado.suma_rentabilidad, estado.suma_cuadrados, estado.apuestas)
+
+    perfiles = [
+        {
+            'perfil': int(ids[i]),
+            'grupo': grupos[i],
+            'apuestas': int(estado.apuestas[i]),
+            'apostado': round(float(estado.apostado[i]), 2),
+            'pnl': round(float(estado.pnl[i]), 2),
+            'roi': round(float(roi[i]), 4),
+            'bankroll_final': round(float(estado.bankroll[i]), 2),
+            'drawdown_max': round(float(estado.drawdown[i]), 4),
+            'volatilidad': round(float(volatilidad[i]), 4),
+            'quebrado': bool(estado.quebrado[i]),
+        }
+        for i in activos
+    ]
+
+    etiquetas = np.array([str(grupos[i]) for i in activos], dtype=object)
+    informe_grupos = []
+    for etiqueta in sorted(set(etiquetas)):
+        miembros = activos[etiquetas == etiqueta]
+        apostado, pnl = estado.apostado[miembros].sum(), estado.pnl[miembros].sum()
+        informe_grupos.append({
+            'grupo': etiqueta,
+            'perfiles': len(miembros),
+            'apuestas': int(estado.apuestas[miembros].sum()),
+            'apostado': round(float(apostado), 2),
+            'pnl': round(float(pnl), 2),
+            'roi': round(float(pnl / apostado), 4) if apostado else 0.0,
+            'crecimiento_medio': round(float((estado.bankroll[miembros] / bankroll - 1).mean()), 4),
+            'drawdown_medio': round(float(estado.drawdown[miembros].mean()), 4),
+            'drawdown_peor': round(float(estado.drawdown[miembros].max()), 4),
+            'volatilidad_media': round(float(volatilidad[miembros].mean()), 4),
+            'quebrados': int(estado.quebrado[miembros].sum()),
+        })
+    return {'perfiles': perfiles, 'grupos': informe_grupos}
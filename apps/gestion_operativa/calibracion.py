@@ -0,0 +1,124 @@
+"""
+Calibración de cuotas: ¿las apuestas de cada tramo de cuota ganan tan a
+menudo como implica el mercado (`1 / cuota`)?
+
+Las operaciones GANADA/PERDIDA se reparten en tramos de cuota con
+`width_bucket` y se agregan en una sola consulta por deporte, mercado y
+tramo: operaciones, ganadas, probabilidad implícita media, stake y P&L. En
+Python solo se recorren las filas agregadas para añadir la tasa real con su
+intervalo de confianza de Wilson al 95 % y el yield (P&L / stake). Las
+ANULADA no cuentan y las operaciones archivadas no entran (su resumen
+mensual no guarda la cuota).
+
+El informe se guarda en caché hasta el final del día: la clave incluye la
+fecha y los parámetros.
+"""
+import hashlib
+import math
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.db.models import (
+    Avg, Count, DecimalField, F, FloatField, Func, IntegerField, Q, Sum, Value
+)
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import Operacion
+
+# Bordes de los tramos: [1.00, 1.25), [1.25, 1.50), ..., [10.00, ∞)
+BANDAS_CUOTA = [
+    Decimal(borde) for borde in
+    ('1.00', '1.25', '1.50', '1.75', '2.00', '2.50', '3.00', '4.00', '6.00', '10.00')
+]
+Z_95 = 1.96
+AGRUPACIONES = ('deporte', 'mercado')
+
+
+def intervalo_wilson(exitos, n, z=Z_95):
+    """Intervalo de confianza de Wilson para una proporción."""
+    if not n:
+        return None, None
+    p = exitos / n
+    denominador = 1 + z ** 2 / n
+    centro = (p + z ** 2 / (2 * n)) / denominador
+    margen = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominador
+    return max(0.0, centro - margen), min(1.0, centro + margen)
+
+
+def _etiqueta(banda):
+    if banda == 0:
+        return f'<{BANDAS_CUOTA[0]}'
+    if banda >= len(BANDAS_CUOTA):
+        return f'{BANDAS_CUOTA[-1]}+'
+    return f'{BANDAS_CUOTA[banda - 1]}-{BANDAS_CUOTA[banda]}'
+
+
+def informe_calibracion(agrupar=AGRUPACIONES, deporte=None, mercado=None, desde=None, hasta=None):
+    """Filas del informe por (`agrupar`..., tramo de cuota), ordenadas."""
+    decimal = DecimalField(max_digits=15, decimal_places=2)
+    operaciones = Operacion.objects.filter(estado__in=['GANADA', 'PERDIDA'])
+    if deporte:
+        operaciones = operaciones.filter(deporte=deporte)
+    if mercado:
+        operaciones = operaciones.filter(mercado=mercado)
+    if desde:
+        operaciones = operaciones.filter(fecha_registro__gte=desde)
+    if hasta:
+        operaciones = operaciones.filter(fecha_registro__lt=hasta)
+
+    ganada = Q(estado='GANADA')
+    filas = operaciones.annotate(
+        banda=Func(
+            F('cuota'), Value(BANDAS_CUOTA, output_field=ArrayField(DecimalField(max_digits=6, decimal_places=2))),
+            function='width_bucket', output_field=IntegerField(),
+        ),
+    ).order_by().values(*agrupar, 'banda').annotate(
+        operaciones=Count('pk'),
+        ganadas=Count('pk', filter=ganada),
+        prob_implicita=Avg(Value(1.0) / Cast('cuota', FloatField()), output_field=FloatField()),
+        cuota_media=Avg(Cast('cuota', FloatField())),
+        stake=Sum('importe'),
+        pnl=Sum(F('importe') * (F('cuota') - 1), filter=ganada, output_field=decimal, default=0)
+            - Sum('importe', filter=~ganada, default=0),
+    ).order_by(*agrupar, 'banda')
+
+    resultados = []
+    for fila in filas:
+        n, ganadas = fila['operaciones'], fila['ganadas']
+        inferior, superior = intervalo_wilson(ganadas, n)
+        tasa_real = ganadas / n
+        pnl = fila['pnl'].quantize(Decimal('0.01'))
+        resultados.append({
+            **{campo: fila[campo] for campo in agrupar},
+            'banda': _etiqueta(fila['banda']),
+            'operaciones': n,
+            'ganadas': ganadas,
+            'cuota_media': round(fila['cuota_media'], 3),
+            'prob_implicita': round(fila['prob_implicita'], 4),
+            'tasa_real': round(tasa_real, 4),
+            'ic_inferior': round(inferior, 4),
+            'ic_superior': round(superior, 4),
+            'desviacion': round(tasa_real - fila['prob_implicita'], 4),
+            # La implícita fuera del intervalo: descalibración significativa al 95 %
+            'significativa': not inferior <= fila['prob_implicita'] <= superior,
+            'stake': fila['stake'],
+            'pnl': pnl,
+            'yield': round(float(pnl / fila['stake']), 4) if fila['stake'] else None,
+        })
+    return resultados
+
+
+def informe_calibracion_diario(**parametros):
+    """`informe_calibracion` calculado como mucho una vez al día por combinación de parámetros."""
+    hoy = timezone.localdate()
+    firma = hashlib.md5(repr(sorted(parametros.items())).encode()).hexdigest()
+    clave = f'calibracion:{hoy.isoformat()}:{firma}'
+    informe = cache.get(clave)
+    if informe is None:
+        informe = informe_calibracion(**parametros)
+        manana = timezone.make_aware(datetime.combine(hoy + timedelta(days=1), time.min))
+        cache.set(clave, informe, timeout=max(1, int((manana - timezone.now()).total_seconds())))
+    return informe
@@ -0,0 +1,121 @@
+"""
+Libro de capital por casa.
+
+`CasaApuestas.capital_activo_hoy` y `capital_total` no se escriben
+directamente: cada cambio es un `MovimientoCapital` que se aplica con
+un UPDATE relativo (`F() + delta`) en la misma transacción. El UPDATE
+bloquea solo la fila de la casa afectada, así que operadores que mueven
+casas distintas no se esperan entre sí y los de la misma casa no pierden
+escrituras.
+
+`conciliar_capital` recalcula los saldos desde el libro por lotes. Cada
+lote bloquea sus casas con `select_for_update` antes de sumar: un
+movimiento concurrente o ya está confirmado (y entra en la suma) o aplica
+su delta después, sobre el saldo recalculado.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import CasaApuestas, MovimientoCapital
+
+CERO = Decimal('0.00')
+
+
+@dataclass
+class Diferencia:
+    casa_id: int
+    capital_activo_hoy: Decimal
+    capital_total: Decimal
+    libro_activo: Decimal
+    libro_total: Decimal
+
+
+def registrar_movimiento(casa_id, concepto, monto_activo=CERO, monto_total=CERO,
+                         transaccion=None, descripcion='', usuario=None):
+    """
+    Registra un movimiento y aplica sus deltas al saldo de la casa.
+
+    Devuelve `(movimiento, saldos)` con los saldos resultantes. Lanza
+    `CasaApuestas.DoesNotExist` si la casa no existe.
+    """
+    with transaction.atomic():
+        actualizadas = CasaApuestas.objects.filter(pk=casa_id).update(
+            capital_activo_hoy=F('capital_activo_hoy') + monto_activo,
+            capital_total=F('capital_total') + monto_total,
+            # update() no aplica auto_now
+            fecha_actualizacion_capital=timezone.now(),
+        )
+        if not actualizadas:
+            raise CasaApuestas.DoesNotExist(f'Casa {casa_id} no existe')
+
+        movimiento = MovimientoCapital.objects.create(
+            casa_id=casa_id,
+            concepto=concepto,
+            monto_activo=monto_activo,
+            monto_total=monto_total,
+            transaccion=transaccion,
+            descripcion=descripcion,
+            usuario_registro=usuario,
+        )
+        # La fila sigue bloqueada por el UPDATE: la lectura es consistente
+        saldos = CasaApuestas.objects.values(
+            'capital_activo_hoy', 'capital_total', 'fecha_actualizacion_capital'
+        ).get(pk=casa_id)
+    return movimiento, saldos
+
+
+def conciliar_capital(casas=None, lote=500, aplicar=True):
+    """
+    Recalcula los saldos de las casas a partir del libro de movimientos.
+
+    Solo reescribe las casas cuyo saldo difiere del libro (un `bulk_update`
+    por lote). Con `aplicar=False` únicamente informa. Devuelve la lista de
+    `Diferencia` encontradas.
+    """
+    queryset = CasaApuestas.objects.all()
+    if casas is not None:
+        queryset = queryset.filter(pk__in=casas)
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+    diferencias = []
+    for inicio in range(0, len(ids), lote):
+        with transaction.atomic():
+            bloque = list(
+                CasaApuestas.objects.select_for_update()
+                .filter(pk__in=ids[inicio:inicio + lote])
+                .order_by('pk')
+                .only('pk', 'capital_activo_hoy', 'capital_total')
+            )
+            libro = {
+                fila['casa']: fila
+                for fila in MovimientoCapital.objects.filter(casa__in=bloque)
+                .values('casa')
+                .annotate(activo=Sum('monto_activo'), total=Sum('monto_total'))
+            }
+
+            ahora = timezone.now()
+            corregidas = []
+            for casa in bloque:
+                fila = libro.get(casa.pk, {})
+                activo = fila.get('activo') or CERO
+                total = fila.get('total') or CERO
+                if casa.capital_activo_hoy == activo and casa.capital_total == total:
+                    continue
+                diferencias.append(Diferencia(
+                    casa.pk, casa.capital_activo_hoy, casa.capital_total, activo, total
+                ))
+                casa.capital_activo_hoy = activo
+                casa.capital_total = total
+                casa.fecha_actualizacion_capital = ahora
+                corregidas.append(casa)
+
+            if aplicar and corregidas:
+                CasaApuestas.objects.bulk_update(
+                    corregidas,
+                    ['capital_activo_hoy', 'capital_total', 'fecha_actualizacion_capital'],
+                )
+    return diferencias
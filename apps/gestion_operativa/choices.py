@@ -23,3 +23,32 @@ class NivelCuentaChoices(models.TextChoices):
     ORO = 'ORO', 'Oro'
     PLATINO = 'PLATINO', 'Platino'
     DIAMANTE = 'DIAMANTE', 'Diamante'
+
+class ConceptoCapitalChoices(models.TextChoices):
+    APERTURA = 'APERTURA', 'Saldo de apertura'
+    ASIGNACION = 'ASIGNACION', 'Asignación de capital'
+    LIBERACION = 'LIBERACION', 'Liberación de capital'
+    DEPOSITO = 'DEPOSITO', 'Depósito'
+    RETIRO = 'RETIRO', 'Retiro'
+    AJUSTE = 'AJUSTE', 'Ajuste manual'
+
+class TipoTransaccionChoices(models.TextChoices):
+    DEPOSITO = 'DEPOSITO', 'Depósito'
+    RETIRO = 'RETIRO', 'Retiro'
+    OTROS = 'OTROS', 'Otros'
+
+class EstadoTransaccionChoices(models.TextChoices):
+    PENDIENTE = 'PENDIENTE', 'Pendiente'
+    CONFIRMADA = 'CONFIRMADA', 'Confirmada'
+    FALLIDA = 'FALLIDA', 'Fallida'
+    ANULADA = 'ANULADA', 'Anulada'
+
+class AmbitoExposicionChoices(models.TextChoices):
+    PERFIL = 'PERFIL', 'Perfil'
+    CASA = 'CASA', 'Casa'
+    AGENCIA = 'AGENCIA', 'Agencia'
+    MERCADO = 'MERCADO', 'Mercado'
+
+class BaseRakeChoices(models.TextChoices):
+    PNL = 'PNL', 'P&L positivo'
+    VOLUMEN = 'VOLUMEN', 'Volumen apostado'
@@ -0,0 +1,249 @@
+"""
+Exposición abierta: stake en juego y payout potencial (`importe * cuota`)
+de las operaciones PENDIENTE, agregados por perfil, casa, agencia y mercado
+en `ExposicionAbierta`.
+
+Cada alta, cambio o liquidación de una operación aplica su delta a las
+cuatro filas afectadas con un único `INSERT ... ON CONFLICT DO UPDATE`, en
+la misma transacción que la operación. El UPDATE bloquea esas filas hasta
+el commit, así que dos apuestas concurrentes sobre el mismo perfil (o casa,
+agencia o mercado) se comprueban una detrás de otra y el control de
+límites no suma filas pendientes: cuesta lo mismo con diez operaciones
+abiertas que con un millón.
+
+Los límites son por ámbito en `ConfiguracionOperativa.limite_exposicion_*`
+y pueden sustituirse por fila con `ExposicionAbierta.limite_importe`. Solo
+se comprueban en las filas cuyo stake abierto aumenta.
+
+`conciliar_exposicion` recalcula los agregados desde `operaciones` (las
+pendientes, por `operaciones_estado_idx`) y corrige las desviaciones, p. ej.
+operaciones creadas con `bulk_create` o perfiles que cambiaron de casa con
+operaciones abiertas. Mientras dura bloquea las escrituras de exposición.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from .choices import AmbitoExposicionChoices
+from .models import ConfiguracionOperativa, ExposicionAbierta, Operacion
+
+PENDIENTE = 'PENDIENTE'
+CENTIMO = Decimal('0.01')
+CERO = Decimal('0.00')
+
+# Ámbito -> ruta desde Operacion hasta su clave
+CAMPOS_AMBITO = {
+    AmbitoExposicionChoices.PERFIL: 'perfil_id',
+    AmbitoExposicionChoices.CASA: 'perfil__casa_id',
+    AmbitoExposicionChoices.AGENCIA: 'perfil__agencia_id',
+    AmbitoExposicionChoices.MERCADO: 'mercado',
+}
+
+
+class LimiteExposicionExcedido(Exception):
+
+    def __init__(self, excesos):
+        self.excesos = excesos
+        super().__init__('; '.join(excesos))
+
+
+@dataclass(frozen=True)
+class Aporte:
+    """Lo que una operación pendiente suma a la exposición."""
+    perfil: int
+    casa: int | None
+    agencia: int
+    mercado: str
+    importe: Decimal
+    cuota: Decimal
+
+    @classmethod
+    def de(cls, operacion):
+        """Aporte de la operación, o None si no está pendiente."""
+        if operacion is None or operacion.estado != PENDIENTE:
+            return None
+        return cls(
+            operacion.perfil_id, operacion.perfil.casa_id, operacion.perfil.agencia_id,
+            operacion.mercado or '', operacion.importe, operacion.cuota,
+        )
+
+    @property
+    def payout(self):
+        return (self.importe * self.cuota).quantize(CENTIMO, ROUND_HALF_UP)
+
+    def claves(self):
+        claves = [
+            (AmbitoExposicionChoices.PERFIL, str(self.perfil)),
+            (AmbitoExposicionChoices.AGENCIA, str(self.agencia)),
+            (AmbitoExposicionChoices.MERCADO, self.mercado),
+        ]
+        if self.casa is not None:
+            claves.append((AmbitoExposicionChoices.CASA, str(self.casa)))
+        return claves
+
+
+@dataclass
+class Diferencia:
+    ambito: str
+    clave: str
+    num_operaciones: int
+    importe_abierto: Decimal
+    payout_potencial: Decimal
+    real_operaciones: int
+    real_importe: Decimal
+    real_payout: Decimal
+
+
+def limites_generales():
+    """Límite de stake abierto de cada ámbito según la configuración global."""
+    configuracion = ConfiguracionOperativa.objects.first()
+    return {
+        ambito: getattr(configuracion, f'limite_exposicion_{ambito.lower()}', None)
+        for ambito in AmbitoExposicionChoices.values
+    }
+
+
+def registrar(quitar=(), poner=(), comprobar=False):
+    """
+    Aplica a la exposición los aportes que salen (`quitar`) y entran
+    (`poner`); los None se ignoran. Con `comprobar`, lanza
+    `LimiteExposicionExcedido` si alguna fila cuyo stake aumenta supera su
+    límite: llamarla dentro de la transacción de la operación para que el
+    error la deshaga.
+    """
+    deltas = defaultdict(lambda: [0, CERO, CERO])
+    for signo, aportes in ((-1, quitar), (1, poner)):
+        for aporte in filter(None, aportes):
+            for clave in aporte.claves():
+                delta = deltas[clave]
+                delta[0] += signo
+                delta[1] += signo * aporte.importe
+                delta[2] += signo * aporte.payout
+    deltas = {clave: delta for clave, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return []
+
+    filas = _aplicar(deltas)
+    if comprobar:
+        crecen = [fila for fila in filas if deltas[fila[0], fila[1]][1] > 0]
+        if crecen:
+            generales = limites_generales()
+            excesos = []
+            for ambito, clave, importe_abierto, limite in crecen:
+                limite = limite if limite is not None else generales[ambito]
+                if limite is not None and importe_abierto > limite:
+                    excesos.append(f'{ambito} {clave}: stake abierto {importe_abierto} supera el límite {limite}')
+            if excesos:
+                raise LimiteExposicionExcedido(excesos)
+    return filas
+
+
+def _aplicar(deltas):
+    tabla = connection.ops.quote_name(ExposicionAbierta._meta.db_table)
+    # Orden fijo de filas: dos transacciones no se bloquean en orden cruzado
+    claves = sorted(deltas)
+    valores = ', '.join(['(%s, %s, %s, %s, %s, now())'] * len(claves))
+    parametros = [valor for clave in claves for valor in (*clave, *deltas[clave])]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {tabla} (
+                ambito, clave, num_operaciones, importe_abierto, payout_potencial, fecha_actualizacion
+            ) VALUES {valores}
+            ON CONFLICT (ambito, clave) DO UPDATE SET
+                num_operaciones = {tabla}.num_operaciones + EXCLUDED.num_operaciones,
+                importe_abierto = {tabla}.importe_abierto + EXCLUDED.importe_abierto,
+                payout_potencial = {tabla}.payout_potencial + EXCLUDED.payout_potencial,
+                fecha_actualizacion = EXCLUDED.fecha_actualizacion
+            RETURNING ambito, clave, importe_abierto, limite_importe
+            """,
+            parametros,
+        )
+        return cursor.fetchall()
+
+
+def pendientes_bloqueadas(queryset):
+    """
+    Bloquea las operaciones PENDIENTE del queryset y devuelve sus aportes,
+    para liquidarlas sin que otra transacción las descuente a la vez.
+    """
+    filas = (
+        queryset.filter(estado=PENDIENTE).order_by('pk').select_for_update(of=('self',))
+        .values_list('pk', 'perfil_id', 'perfil__casa_id', 'perfil__agencia_id', 'mercado', 'importe', 'cuota')
+    )
+    return {
+        pk: Aporte(perfil, casa, agencia, mercado or '', importe, cuota)
+        for pk, perfil, casa, agencia, mercado, importe, cuota in filas
+    }
+
+
+def exposicion_real():
+    """Exposición calculada desde las operaciones pendientes: {(ámbito, clave): (n, importe, payout)}."""
+    decimal = DecimalField(max_digits=15, decimal_places=2)
+    pendientes = Operacion.objects.filter(estado=PENDIENTE).order_by()
+    real = {}
+    for ambito, campo in CAMPOS_AMBITO.items():
+        filas = pendientes.values(campo).annotate(
+            n=Count('pk'),
+            stake=Sum('importe'),
+            pago=Coalesce(Sum(Round(F('importe') * F('cuota'), 2), output_field=decimal), CERO),
+        ).values_list(campo, 'n', 'stake', 'pago')
+        for clave, n, importe, payout in filas:
+            if clave is None and ambito != AmbitoExposicionChoices.MERCADO:
+                continue
+            clave = '' if clave is None else str(clave)
+            # Mercado NULL y '' son la misma clave
+            previo = real.get((ambito, clave), (0, CERO, CERO))
+            real[ambito, clave] = (previo[0] + n, previo[1] + importe, previo[2] + payout)
+    return real
+
+
+def conciliar_exposicion(aplicar=True):
+    """
+    Recalcula la exposición desde las operaciones pendientes y corrige las
+    filas desviadas (las que ya no tienen operaciones quedan a cero y
+    conservan su límite). Devuelve la lista de `Diferencia`.
+    """
+    with transaction.atomic():
+        if aplicar:
+            # Las apuestas esperan a que termine: ningún delta se pierde ni se cuenta dos veces
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE {connection.ops.quote_name(ExposicionAbierta._meta.db_table)} '
+                    f'IN SHARE ROW EXCLUSIVE MODE'
+                )
+        real = exposicion_real()
+        actuales = {(fila.ambito, fila.clave): fila for fila in ExposicionAbierta.objects.all()}
+
+        diferencias, corregidas, nuevas = [], [], []
+        for clave in sorted(real.keys() | actuales.keys()):
+            n, importe, payout = real.get(clave, (0, CERO, CERO))
+            fila = actuales.get(clave)
+            if fila is None:
+                fila = ExposicionAbierta(ambito=clave[0], clave=clave[1])
+                nuevas.append(fila)
+            elif (fila.num_operaciones, fila.importe_abierto, fila.payout_potencial) == (n, importe, payout):
+                continue
+            else:
+                corregidas.append(fila)
+            diferencias.append(Diferencia(
+                *clave, fila.num_operaciones, fila.importe_abierto, fila.payout_potencial, n, importe, payout
+            ))
+            fila.num_operaciones, fila.importe_abierto, fila.payout_potencial = n, importe, payout
+
+        if aplicar:
+            ahora = timezone.now()
+            for fila in corregidas:
+                # bulk_update no aplica auto_now
+                fila.fecha_actualizacion = ahora
+            ExposicionAbierta.objects.bulk_create(nuevas, batch_size=1000)
+            ExposicionAbierta.objects.bulk_update(
+                corregidas, ['num_operaciones', 'importe_abierto', 'payout_potencial', 'fecha_actualizacion'],
+                batch_size=1000,
+            )
+    return diferencias
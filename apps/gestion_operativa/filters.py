@@ -0,0 +1,162 @@
+"""
+FilterSets declarativos de gestión operativa.
+
+Cada filtro corresponde a una columna indexada (ver `Meta.indexes` en
+`models.py`); los rangos de fecha usan `<campo>_desde` / `<campo>_hasta`.
+La búsqueda (`?search=`) y el orden (`?ordering=`) se declaran en cada
+ViewSet con `search_fields` y `ordering_fields`.
+"""
+import django_filters
+from rest_framework.exceptions import ValidationError
+
+from .choices import DeportesChoices
+from .models import (
+    Distribuidora, CasaApuestas, Ubicacion, Agencia, PerfilOperativo,
+    TransaccionFinanciera, PlanificacionRotacion, AlertaOperativa,
+    BitacoraMando, Operacion, OperacionArchivada, ResumenOperacionMensual
+)
+
+
+def parse_deportes(valor):
+    """Lee `TENNIS` o `TENNIS,FUTBOL` y valida los valores contra DeportesChoices."""
+    deportes = [deporte.strip().upper() for deporte in valor.split(',') if deporte.strip()]
+    invalidos = [deporte for deporte in deportes if deporte not in DeportesChoices.values]
+    if invalidos:
+        raise ValidationError({'deporte': f'Deportes no válidos: {invalidos}'})
+    return deportes
+
+
+class DeportesContainsFilter(django_filters.CharFilter):
+    """
+    Filtra un JSONField de deportes por containment (@>), resuelto con el
+    índice GIN de `distribuidoras_datos.deportes`.
+    """
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.filter(**{f'{self.field_name}__contains': parse_deportes(value)})
+
+
+class DistribuidoraFilter(django_filters.FilterSet):
+    deporte = DeportesContainsFilter(field_name='deportes')
+
+    class Meta:
+        model = Distribuidora
+        fields = ['activo']
+
+
+class CasaApuestasFilter(django_filters.FilterSet):
+    deporte = DeportesContainsFilter(field_name='distribuidora__deportes')
+
+    class Meta:
+        model = CasaApuestas
+        fields = ['distribuidora', 'activo']
+
+
+class UbicacionFilter(django_filters.FilterSet):
+
+    class Meta:
+        model = Ubicacion
+        fields = ['pais', 'provincia_estado', 'ciudad']
+
+
+class AgenciaFilter(django_filters.FilterSet):
+    casa = django_filters.NumberFilter(field_name='casa_madre')
+
+    class Meta:
+        model = Agencia
+        fields = ['activo', 'ubicacion']
+
+
+class PerfilOperativoFilter(django_filters.FilterSet):
+    deporte = django_filters.ChoiceFilter(field_name='deporte_dna', choices=DeportesChoices.choices)
+
+    class Meta:
+        model = PerfilOperativo
+        fields = ['agencia', 'casa', 'activo', 'tipo_jugador', 'nivel_cuenta']
+
+
+class OperacionFilter(django_filters.FilterSet):
+    fecha_desde = django_filters.IsoDateTimeFilter(field_name='fecha_registro', lookup_expr='gte')
+    fecha_hasta = django_filters.IsoDateTimeFilter(field_name='fecha_registro', lookup_expr='lt')
+    estado = django_filters.MultipleChoiceFilter(
+        choices=Operacion._meta.get_field('estado').choices
+    )
+    deporte = django_filters.CharFilter()
+    mercado = django_filters.CharFilter()
+    agencia = django_filters.NumberFilter(field_name='perfil__agencia')
+    casa = django_filters.NumberFilter(field_name='perfil__casa')
+
+    class Meta:
+        model = Operacion
+        fields = ['perfil']
+
+
+class OperacionArchivadaFilter(OperacionFilter):
+    """Los mismos filtros de `OperacionFilter` sobre `operaciones_archivo`."""
+
+    class Meta(OperacionFilter.Meta):
+        model = OperacionArchivada
+
+
+class ResumenOperacionMensualFilter(django_filters.FilterSet):
+    """
+    Filtros de `OperacionFilter` sobre el resumen mensual del archivo. Los
+    rangos de fecha se aplican por mes: cuenta cada mes cuyo inicio cae en
+    el rango, o que contiene `fecha_desde`.
+    """
+    fecha_desde = django_filters.IsoDateTimeFilter(method='filtrar_desde')
+    fecha_hasta = django_filters.IsoDateTimeFilter(field_name='mes', lookup_expr='lt')
+    estado = django_filters.MultipleChoiceFilter(
+        choices=Operacion._meta.get_field('estado').choices
+    )
+    deporte = django_filters.CharFilter()
+    mercado = django_filters.CharFilter()
+    agencia = django_filters.NumberFilter(field_name='perfil__agencia')
+    casa = django_filters.NumberFilter(field_name='perfil__casa')
+
+    class Meta:
+        model = ResumenOperacionMensual
+        fields = ['perfil']
+
+    def filtrar_desde(self, queryset, name, value):
+        return queryset.filter(mes__gte=value.date().replace(day=1))
+
+
+class TransaccionFinancieraFilter(django_filters.FilterSet):
+    fecha_desde = django_filters.IsoDateTimeFilter(field_name='fecha_transaccion', lookup_expr='gte')
+    fecha_hasta = django_filters.IsoDateTimeFilter(field_name='fecha_transaccion', lookup_expr='lt')
+    agencia = django_filters.NumberFilter(field_name='perfil__agencia')
+    casa = django_filters.NumberFilter(field_name='perfil__casa')
+
+    class Meta:
+        model = TransaccionFinanciera
+        fields = ['perfil', 'tipo_transaccion', 'estado']
+
+
+class PlanificacionRotacionFilter(django_filters.FilterSet):
+    fecha_desde = django_filters.DateFilter(field_name='fecha', lookup_expr='gte')
+    fecha_hasta = django_filters.DateFilter(field_name='fecha', lookup_expr='lte')
+
+    class Meta:
+        model = PlanificacionRotacion
+        fields = ['perfil', 'fecha', 'estado_dia', 'mes', 'anio']
+
+
+class AlertaOperativaFilter(django_filters.FilterSet):
+    perfil = django_filters.NumberFilter(field_name='perfil_afectado')
+    casa = django_filters.NumberFilter(field_name='casa_afectada')
+
+    class Meta:
+        model = AlertaOperativa
+        fields = ['severidad', 'estado', 'tipo_alerta']
+
+
+class BitacoraMandoFilter(django_filters.FilterSet):
+    fecha_desde = django_filters.IsoDateTimeFilter(field_name='fecha_registro', lookup_expr='gte')
+    fecha_hasta = django_filters.IsoDateTimeFilter(field_name='fecha_registro', lookup_expr='lt')
+
+    class Meta:
+        model = BitacoraMando
+        fields = ['perfil']
@@ -0,0 +1,164 @@
+"""
+Árbol de totales distribuidora → casa → agencia → perfil.
+
+Cada nodo lleva los mismos totales: perfiles, perfiles activos, saldo
+(transacciones confirmadas), P&L (operaciones más el resumen mensual del
+archivo), operaciones de la semana y capital de las casas (`capital_total`,
+`capital_activo_hoy`). Las agencias cuelgan de la casa de sus perfiles (y de
+su `casa_madre`, aunque no tengan perfiles).
+
+Se hacen siete consultas, todas agrupadas por perfil o de catálogo (sin
+consultas por fila). El árbol se monta en memoria en una pasada: cada perfil
+suma sus métricas a los nodos de su camino; después se ordenan los hijos de
+cada nodo por nombre. Los niveles omitidos se colapsan: sus hijos suben al
+nivel anterior y los totales no cambian.
+
+`activo` filtra perfiles, agencias, casas y distribuidoras por su propio
+indicador; un perfil que pasa el filtro aparece siempre bajo su casa y su
+agencia.
+
+`arbol_en_cache` guarda cada combinación de parámetros durante
+`ARBOL_CACHE_SEGUNDOS`.
+"""
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .choices import EstadoTransaccionChoices
+from .models import (
+    Agencia, CasaApuestas, Distribuidora, Operacion, PerfilOperativo, ResumenOperacionMensual,
+    TransaccionFinanciera, periodos_actuales, saldo_transacciones
+)
+
+NIVELES = ['distribuidora', 'casa', 'agencia', 'perfil']
+CONTADORES = ['perfiles', 'perfiles_activos', 'ops_semana']
+IMPORTES = ['saldo', 'pnl', 'capital_total', 'capital_activo_hoy']
+
+
+def arbol(niveles=NIVELES, activo=None):
+    """Totales generales y árbol con los `niveles` pedidos (en orden jerárquico)."""
+    filtro = {} if activo is None else {'activo': activo}
+    distribuidoras = Distribuidora.objects.values_list('pk', 'nombre', 'activo')
+    casas = {
+        pk: resto for pk, *resto in CasaApuestas.objects.values_list(
+            'pk', 'nombre', 'distribuidora_id', 'capital_total', 'capital_activo_hoy', 'activo'
+        )
+    }
+    agencias = Agencia.objects.values_list('pk', 'nombre', 'casa_madre_id', 'activo')
+    perfiles = list(PerfilOperativo.objects.filter(**filtro).values_list(
+        'pk', 'nombre_usuario', 'activo', 'casa_id', 'agencia_id'
+    ))
+    metricas = _metricas_perfil(filtro)
+
+    nombres = {
+        'distribuidora': {pk: nombre for pk, nombre, _ in distribuidoras},
+        'casa': {pk: casa[0] for pk, casa in casas.items()},
+        'agencia': {pk: nombre for pk, nombre, *_ in agencias},
+        'perfil': {pk: nombre_usuario for pk, nombre_usuario, *_ in perfiles},
+    }
+    raiz = _nodo(None, None, None, hoja=False)
+    nodos = {}
+    casas_sumadas = set()
+
+    def camino(**claves):
+        """Nodos desde la raíz hasta el último nivel presente en `claves`."""
+        ruta, prefijo = [raiz], ()
+        for nivel in niveles:
+            if nivel not in claves:
+                break
+            prefijo += (claves[nivel],)
+            nodo = nodos.get((nivel, prefijo))
+            if nodo is None:
+                nodo = nodos[nivel, prefijo] = _nodo(
+                    nivel, claves[nivel], nombres[nivel].get(claves[nivel]), hoja=nivel == niveles[-1]
+                )
+                ruta[-1]['hijos'].append(nodo)
+            ruta.append(nodo)
+        return ruta
+
+    def sumar_casa(casa):
+        # El capital de cada casa se suma una sola vez, entre o no por sus perfiles
+        if casa is None or casa in casas_sumadas:
+            return
+        casas_sumadas.add(casa)
+        _, distribuidora, capital_total, capital_activo_hoy, _ = casas[casa]
+        for nodo in camino(distribuidora=distribuidora, casa=casa):
+            nodo['capital_total'] += capital_total
+            nodo['capital_activo_hoy'] += capital_activo_hoy
+
+    # Las entidades sin perfiles también aparecen, con los totales a cero
+    for distribuidora, _, distribuidora_activa in distribuidoras:
+        if activo in (None, distribuidora_activa):
+            camino(distribuidora=distribuidora)
+    for casa, (*_, casa_activa) in casas.items():
+        if activo in (None, casa_activa):
+            sumar_casa(casa)
+    for agencia, _, casa, agencia_activa in agencias:
+        if casa is not None and activo in (None, agencia_activa):
+            sumar_casa(casa)
+            camino(distribuidora=casas[casa][1], casa=casa, agencia=agencia)
+
+    for pk, _, perfil_activo, casa, agencia in perfiles:
+        sumar_casa(casa)
+        saldo, pnl, ops_semana = metricas.get(pk, (Decimal('0'), Decimal('0'), 0))
+        distribuidora = casas[casa][1] if casa is not None else None
+        for nodo in camino(distribuidora=distribuidora, casa=casa, agencia=agencia, perfil=pk):
+            nodo['perfiles'] += 1
+            nodo['perfiles_activos'] += perfil_activo
+            nodo['saldo'] += saldo
+            nodo['pnl'] += pnl
+            nodo['ops_semana'] += ops_semana
+
+    for nodo in [raiz, *nodos.values()]:
+        if 'hijos' in nodo:
+            # Los nodos sin entidad (perfiles sin casa) van al final
+            nodo['hijos'].sort(key=lambda hijo: (hijo['nombre'] is None, hijo['nombre'] or '', hijo['id'] or 0))
+    return raiz
+
+
+def arbol_en_cache(**parametros):
+    firma = hashlib.md5(repr(sorted(parametros.items())).encode()).hexdigest()
+    clave = f'arbol:{firma}'
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = arbol(**parametros)
+        cache.set(clave, resultado, timeout=settings.ARBOL_CACHE_SEGUNDOS)
+    return resultado
+
+
+def _nodo(nivel, pk, nombre, hoja):
+    nodo = {'nivel': nivel, 'id': pk, 'nombre': nombre, **dict.fromkeys(CONTADORES, 0),
+            **{campo: Decimal('0') for campo in IMPORTES}}
+    if not hoja:
+        nodo['hijos'] = []
+    return nodo
+
+
+def _metricas_perfil(filtro):
+    """{perfil: (saldo, pnl, ops_semana)} con tres consultas agrupadas por perfil."""
+    filtro = {f'perfil__{campo}': valor for campo, valor in filtro.items()}
+    inicio_semana, _, _ = periodos_actuales()
+    metricas = {}
+    saldos = TransaccionFinanciera.objects.filter(
+        estado=EstadoTransaccionChoices.CONFIRMADA, **filtro
+    ).order_by().values('perfil_id').annotate(saldo=saldo_transacciones()).values_list('perfil_id', 'saldo')
+    for perfil, saldo in saldos:
+        metricas[perfil] = [saldo, Decimal('0'), 0]
+
+    operaciones = Operacion.objects.filter(**filtro).order_by().values('perfil_id').annotate(
+        pnl=Sum('profit_loss', default=Decimal('0')),
+        ops_semana=Count('pk', filter=Q(fecha_registro__gte=inicio_semana)),
+    ).values_list('perfil_id', 'pnl', 'ops_semana')
+    for perfil, pnl, ops_semana in operaciones:
+        fila = metricas.setdefault(perfil, [Decimal('0'), Decimal('0'), 0])
+        fila[1] += pnl
+        fila[2] += ops_semana
+    archivadas = ResumenOperacionMensual.objects.filter(**filtro).order_by().values('perfil_id').annotate(
+        pnl=Sum('profit_loss_total'),
+    ).values_list('perfil_id', 'pnl')
+    for perfil, pnl in archivadas:
+        metricas.setdefault(perfil, [Decimal('0'), Decimal('0'), 0])[1] += pnl
+    return {perfil: tuple(fila) for perfil, fila in metricas.items()}
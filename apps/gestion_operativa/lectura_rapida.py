@@ -0,0 +1,87 @@
+"""
+Camino de lectura rápido para listados.
+
+`ListadoRapido` compila un `ModelSerializer` de solo lectura en:
+- las columnas para `values_list()`, en el orden del serializer (con los nombres relacionados, como
+  `perfil__nombre_usuario`, resueltos con JOIN en el SQL), y
+- una tabla plana `(campo, índice, conversor)` que produce exactamente la
+  misma representación que el serializer, sin instanciarlo por fila.
+
+Los conversores triviales (texto, enteros, FKs, decimales sin coerción) son
+la identidad; el resto usa el `to_representation` del propio campo.
+"""
+from functools import lru_cache
+
+from django.db.models import F
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+_IDENTIDAD = (
+    serializers.ReadOnlyField, serializers.CharField, serializers.IntegerField,
+    serializers.BooleanField,
+)
+
+
+class CampoNoSoportado(Exception):
+    pass
+
+
+def _conversor(campo):
+    """Devuelve el conversor de un campo o `None` si es la identidad."""
+    if isinstance(campo, PrimaryKeyRelatedField):
+        return campo.pk_field.to_representation if campo.pk_field else None
+    if isinstance(campo, serializers.ChoiceField):
+        if all(isinstance(clave, str) for clave in campo.choices):
+            return None
+        return campo.to_representation
+    if isinstance(campo, serializers.DecimalField):
+        coerce = getattr(campo, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        return '{:f}'.format if coerce else None
+    if isinstance(campo, serializers.DateField):
+        if getattr(campo, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+            return _isoformat
+        return campo.to_representation
+    if isinstance(campo, _IDENTIDAD):
+        return None
+    if isinstance(campo, (serializers.Serializer, serializers.ListSerializer,
+                          serializers.SerializerMethodField)):
+        raise CampoNoSoportado(campo.field_name)
+    return campo.to_representation
+
+
+def _isoformat(valor):
+    return valor.isoformat()
+
+
+class ListadoRapido:
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.expresiones = {}
+        self.columnas = []
+        self.tabla = []
+        for i, campo in enumerate(serializer._readable_fields):
+            ruta = '__'.join(campo.source_attrs)
+            if ruta != campo.field_name:
+                self.expresiones[campo.field_name] = F(ruta)
+            self.columnas.append(campo.field_name)
+            self.tabla.append((campo.field_name, i, _conversor(campo)))
+
+    def filas(self, queryset):
+        return queryset.annotate(**self.expresiones).values_list(*self.columnas)
+
+    def representar(self, filas):
+        tabla = self.tabla
+        return [
+            {
+                nombre: fila[i] if conversor is None or fila[i] is None else conversor(fila[i])
+                for nombre, i, conversor in tabla
+            }
+            for fila in filas
+        ]
+
+
+@lru_cache(maxsize=None)
+def listado_rapido(serializer_class):
+    return ListadoRapido(serializer_class)
@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gestion_operativa.metas import actualizar_meta
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula la meta de volumen diario y los perfiles listos y en descanso de la '
+        'configuración operativa si tiene activa la actualización diaria (programar en cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Día de la meta, AAAA-MM-DD (por defecto, hoy)')
+        parser.add_argument('--dias-base', type=int, default=28, help='Días anteriores para el volumen medio')
+        parser.add_argument('--forzar', action='store_true',
+                            help='Recalcula aunque `actualizar_meta_diariamente` esté desactivado')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa, sin guardar')
+
+    def handle(self, *args, **options):
+        try:
+            dia = date.fromisoformat(options['fecha']) if options['fecha'] else None
+        except ValueError:
+            raise CommandError('--fecha debe tener el formato AAAA-MM-DD')
+        if options['dias_base'] < 1:
+            raise CommandError('--dias-base debe ser al menos 1')
+
+        meta = actualizar_meta(dia, options['dias_base'], forzar=options['forzar'], aplicar=not options['dry_run'])
+        if meta is None:
+            self.stdout.write('Sin configuración con actualización diaria activa: nada que hacer')
+            return
+        self.stdout.write(
+            f'{meta.fecha}: {meta.perfiles_listos_operar} perfiles listos, {meta.perfiles_en_descanso} en descanso, '
+            f'{meta.volumen_por_perfil if meta.volumen_por_perfil is not None else "sin historial"} por perfil y día'
+        )
+        if meta.meta_volumen_diario is None:
+            self.stdout.write(self.style.WARNING('Sin operaciones en la ventana: se conserva la meta anterior'))
+        accion = 'calculada' if options['dry_run'] else 'guardada'
+        self.stdout.write(self.style.SUCCESS(f'Meta {accion}: {meta.meta_volumen_diario or "sin cambios"}'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.gestion_operativa.archivo import archivar_operaciones, candidatas
+from apps.gestion_operativa.particiones import inicio_mes, limite, sumar_meses
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve las operaciones liquidadas (GANADA/PERDIDA/ANULADA) anteriores al '
+        'corte a operaciones_archivo, acumulándolas en el resumen mensual'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, default=12,
+                            help='Antigüedad mínima en meses; el corte es el inicio de ese mes (UTC)')
+        parser.add_argument('--lote', type=int, default=5000, help='Operaciones por transacción')
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta las operaciones a archivar')
+
+    def handle(self, *args, **options):
+        if options['meses'] < 1:
+            raise CommandError('--meses debe ser al menos 1')
+        corte = limite(sumar_meses(inicio_mes(timezone.now()), -options['meses']))
+
+        if options['dry_run']:
+            total = candidatas(corte).count()
+            self.stdout.write(f'{total} operaciones anteriores a {corte:%Y-%m-%d} por archivar')
+            return
+
+        def progreso(resultado):
+            self.stdout.write(f'   lote {resultado.lotes}: {resultado.operaciones} operaciones archivadas')
+
+        resultado = archivar_operaciones(corte, lote=options['lote'], progreso=progreso)
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.operaciones} operaciones anteriores a {corte:%Y-%m-%d} archivadas '
+            f'en {resultado.lotes} lotes'
+        ))
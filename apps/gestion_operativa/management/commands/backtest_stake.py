@@ -0,0 +1,80 @@
+import json
+import time
+from datetime import datetime, time as dt_time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.gestion_operativa.backtest import AGRUPACIONES, REGLAS, TAMANO_LOTE, ParametrosStake, backtest
+from apps.gestion_operativa.choices import NivelCuentaChoices, TipoJugadorChoices
+from apps.gestion_operativa.models import PerfilOperativo
+
+
+class Command(BaseCommand):
+    help = (
+        'Reproduce el historial de operaciones liquidadas con otras reglas de stake '
+        '(plano, porcentaje del bankroll, Kelly) y compara P&L, ROI, drawdown y '
+        'volatilidad por perfil y por grupo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--regla', choices=REGLAS, action='append', dest='reglas',
+                            help='Regla a evaluar (repetible; por defecto, todas)')
+        parser.add_argument('--agrupar', choices=list(AGRUPACIONES), default='nivel_cuenta')
+        parser.add_argument('--nivel', choices=NivelCuentaChoices.values, action='append', dest='niveles',
+                            help='Solo perfiles de este nivel de cuenta (repetible)')
+        parser.add_argument('--tipo-jugador', choices=TipoJugadorChoices.values, action='append', dest='tipos',
+                            help='Solo perfiles de este tipo de jugador (repetible)')
+        parser.add_argument('--desde', help='Fecha inicial (YYYY-MM-DD)')
+        parser.add_argument('--hasta', help='Fecha final, excluida (YYYY-MM-DD)')
+        parser.add_argument('--bankroll', type=float, default=1000.0, help='Bankroll inicial de cada perfil')
+        parser.add_argument('--importe', type=float, default=10.0, help='Stake de la regla plano')
+        parser.add_argument('--fraccion', type=float, default=0.02, help='Fracción del bankroll de la regla porcentaje')
+        parser.add_argument('--kelly-multiplicador', type=float, default=0.5)
+        parser.add_argument('--kelly-tope', type=float, default=0.1, help='Fracción máxima por apuesta con Kelly')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Operaciones leídas por consulta')
+        parser.add_argument('--salida', help='Ruta del JSON de resultados (incluye el detalle por perfil)')
+
+    def handle(self, *args, **options):
+        if not 0 < options['fraccion'] < 1 or not 0 < options['kelly_tope'] < 1:
+            raise CommandError('--fraccion y --kelly-tope deben estar entre 0 y 1.')
+        fechas = {}
+        for clave in ('desde', 'hasta'):
+            if options[clave]:
+                fecha = parse_date(options[clave])
+                if fecha is None:
+                    raise CommandError(f'--{clave} no es una fecha YYYY-MM-DD.')
+                fechas[clave] = timezone.make_aware(datetime.combine(fecha, dt_time.min))
+
+        perfiles = PerfilOperativo.objects.all()
+        if options['niveles']:
+            perfiles = perfiles.filter(nivel_cuenta__in=options['niveles'])
+        if options['tipos']:
+            perfiles = perfiles.filter(tipo_jugador__in=options['tipos'])
+        parametros = ParametrosStake(
+            bankroll=options['bankroll'], importe=options['importe'], fraccion=options['fraccion'],
+            kelly_multiplicador=options['kelly_multiplicador'], kelly_tope=options['kelly_tope'],
+        )
+
+        inicio = time.perf_counter()
+        resultado = backtest(
+            perfiles, reglas=options['reglas'] or REGLAS, parametros=parametros, agrupar=options['agrupar'],
+            tamano_lote=options['lote'], **fechas,
+        )
+        duracion = time.perf_counter() - inicio
+
+        for regla, informe in resultado['reglas'].items():
+            self.stdout.write(f'\n{regla}')
+            for g in informe['grupos']:
+                self.stdout.write(
+                    f"  {g['grupo']:<14} {g['perfiles']:>5} perfiles  P&L {g['pnl']:>14,.2f}  "
+                    f"ROI {g['roi']:>+7.2%}  drawdown medio {g['drawdown_medio']:>6.2%}  "
+                    f"volatilidad {g['volatilidad_media']:.4f}  quebrados {g['quebrados']}"
+                )
+        if options['salida']:
+            Path(options['salida']).write_text(json.dumps(resultado, indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{resultado['operaciones']} operaciones en {resultado['lotes']} lotes ({duracion:.1f}s)"
+        ))
@@ -0,0 +1,154 @@
+import json
+import math
+import statistics
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.gestion_operativa.replicas import CABECERA
+from apps.gestion_operativa.urls import router
+
+User = get_user_model()
+
+
+def _percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide latencia (p50/p95/p99) y consultas por petición de cada endpoint '
+        'de gestión operativa y guarda el resultado en JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=50)
+        parser.add_argument('--calentamiento', type=int, default=3)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--usuario', help='Username con el que autenticar (por defecto, el primer superusuario)')
+        parser.add_argument('--solo', nargs='*', default=None, help='Prefijos de ruta a medir (ej: operaciones perfiles-operativos)')
+        parser.add_argument('--salida', help='Ruta del JSON de resultados')
+        parser.add_argument('--comparar', help='JSON de una ejecución previa para mostrar diferencias')
+
+    def handle(self, *args, **options):
+        usuario = self._usuario(options['usuario'])
+        cliente = APIClient()
+        cliente.force_authenticate(usuario)
+
+        resultados = []
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for prefijo, viewset, basename in router.registry:
+                if options['solo'] and prefijo not in options['solo']:
+                    continue
+                basename = basename or router.get_default_basename(viewset)
+                casos = [('list', reverse(f'{basename}-list'), {'page_size': options['page_size']})]
+                instancia = viewset.queryset.model.objects.order_by('pk').only('pk').first()
+                if instancia is not None:
+                    casos.append(('retrieve', reverse(f'{basename}-detail', args=[instancia.pk]), {}))
+
+                for accion, url, params in casos:
+                    resultado = self._medir(cliente, url, params, options)
+                    resultado.update({'endpoint': prefijo, 'accion': accion, 'url': url})
+                    resultados.append(resultado)
+                    self.stdout.write(
+                        f"{prefijo:<26} {accion:<9} p50={resultado['p50_ms']:>8.2f}ms "
+                        f"p95={resultado['p95_ms']:>8.2f}ms p99={resultado['p99_ms']:>8.2f}ms "
+                        f"consultas={resultado['consultas']} bd={resultado['lectura']}"
+                    )
+
+        informe = {
+            'fecha': timezone.now().isoformat(),
+            'base_de_datos': connection.settings_dict['NAME'],
+            'iteraciones': options['iteraciones'],
+            'page_size': options['page_size'],
+            'volumen': {
+                viewset.queryset.model._meta.db_table: viewset.queryset.model.objects.count()
+                for _, viewset, _ in router.registry
+            },
+            'resultados': resultados,
+        }
+
+        salida = Path(options['salida'] or f"benchmark_{timezone.now():%Y%m%d_%H%M%S}.json")
+        salida.write_text(json.dumps(informe, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f'✅ Resultados guardados en {salida}'))
+
+        if options['comparar']:
+            self._comparar(Path(options['comparar']), resultados)
+
+    def _usuario(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'El usuario "{username}" no existe.')
+        usuario = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if usuario is None:
+            raise CommandError('No hay usuarios; crea uno o genera datos sintéticos primero.')
+        return usuario
+
+    def _medir(self, cliente, url, params, options):
+        for _ in range(options['calentamiento']):
+            cliente.get(url, params)
+
+        tiempos = []
+        consultas = []
+        consultas_por_bd = {}
+        for _ in range(options['iteraciones']):
+            # Una captura por alias: las lecturas pueden ir a una réplica
+            with ExitStack() as pila:
+                contextos = {
+                    alias: pila.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in connections
+                }
+                inicio = time.perf_counter()
+                respuesta = cliente.get(url, params)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            if respuesta.status_code != 200:
+                raise CommandError(f'{url} respondió {respuesta.status_code}')
+            por_bd = {alias: len(contexto.captured_queries) for alias, contexto in contextos.items()}
+            consultas.append(sum(por_bd.values()))
+            for alias, total in por_bd.items():
+                if total:
+                    consultas_por_bd[alias] = max(consultas_por_bd.get(alias, 0), total)
+
+        tiempos.sort()
+        return {
+            'p50_ms': round(_percentil(tiempos, 50), 3),
+            'p95_ms': round(_percentil(tiempos, 95), 3),
+            'p99_ms': round(_percentil(tiempos, 99), 3),
+            'media_ms': round(statistics.fmean(tiempos), 3),
+            'consultas': max(consultas),
+            'consultas_por_bd': consultas_por_bd,
+            'lectura': respuesta.get(CABECERA, 'default'),
+            'bytes': len(respuesta.content),
+        }
+
+    def _comparar(self, ruta, resultados):
+        if not ruta.exists():
+            raise CommandError(f'No existe {ruta}')
+        previos = {
+            (r['endpoint'], r['accion']): r
+            for r in json.loads(ruta.read_text())['resultados']
+        }
+        self.stdout.write('')
+        self.stdout.write(f'Comparación con {ruta}:')
+        for actual in resultados:
+            previo = previos.get((actual['endpoint'], actual['accion']))
+            if previo is None:
+                continue
+            delta = (actual['p95_ms'] - previo['p95_ms']) / previo['p95_ms'] * 100 if previo['p95_ms'] else 0
+            self.stdout.write(
+                f"{actual['endpoint']:<26} {actual['accion']:<9} "
+                f"p95 {previo['p95_ms']:.2f} → {actual['p95_ms']:.2f}ms ({delta:+.1f}%) "
+                f"consultas {previo['consultas']} → {actual['consultas']}"
+            )
@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gestion_operativa.lectura_rapida import listado_rapido
+from apps.gestion_operativa.models import (
+    Operacion, TransaccionFinanciera, PlanificacionRotacion
+)
+from apps.gestion_operativa.renderers import ORJSONRenderer
+from apps.gestion_operativa.serializers import (
+    OperacionSerializer, TransaccionFinancieraSerializer,
+    PlanificacionRotacionSerializer
+)
+
+CASOS = [
+    (Operacion, OperacionSerializer),
+    (TransaccionFinanciera, TransaccionFinancieraSerializer),
+    (PlanificacionRotacion, PlanificacionRotacionSerializer),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el serializer DRF con el camino de lectura rápida en páginas de '
+        'listado: verifica que el JSON es idéntico y mide el speedup'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=100, help='Filas por página')
+        parser.add_argument('--repeticiones', type=int, default=50)
+
+    def handle(self, *args, **options):
+        renderer = ORJSONRenderer()
+        for model, serializer_class in CASOS:
+            filas = options['filas']
+            queryset = model.objects.select_related('perfil').order_by('pk')
+            listado = listado_rapido(serializer_class)
+
+            def serializer():
+                return serializer_class(list(queryset[:filas]), many=True).data
+
+            def rapido():
+                return listado.representar(listado.filas(queryset)[:filas])
+
+            if renderer.render(serializer()) != renderer.render(rapido()):
+                raise CommandError(f'{serializer_class.__name__}: la salida rápida difiere')
+
+            base = self._medir(serializer, options['repeticiones'])
+            nuevo = self._medir(rapido, options['repeticiones'])
+            self.stdout.write(
+                f'{serializer_class.__name__:<34} serializer={base:8.2f}ms  '
+                f'rápido={nuevo:8.2f}ms  speedup={base / nuevo:5.1f}x  (JSON idéntico)'
+            )
+
+    def _medir(self, funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
@@ -0,0 +1,46 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gestion_operativa.models import Operacion
+from apps.gestion_operativa.renderers import ORJSONRenderer, StdJSONRenderer
+from apps.gestion_operativa.serializers import OperacionSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compara el tiempo de render JSON (stdlib vs orjson) sobre páginas grandes de Operacion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1000, help='Filas por página')
+        parser.add_argument('--repeticiones', type=int, default=20)
+
+    def handle(self, *args, **options):
+        operaciones = list(
+            Operacion.objects.select_related('perfil')[:options['filas']]
+        )
+        if not operaciones:
+            raise CommandError('No hay operaciones; ejecuta generar_datos_sinteticos primero.')
+        data = OperacionSerializer(operaciones, many=True).data
+
+        self.stdout.write(f'Página de {len(operaciones)} operaciones, {options["repeticiones"]} repeticiones')
+        for decimals in ('str', 'float'):
+            media_type = f'application/json; decimals={decimals}'
+            base = self._medir(StdJSONRenderer(), data, media_type, options['repeticiones'])
+            rapido = self._medir(ORJSONRenderer(), data, media_type, options['repeticiones'])
+
+            if ORJSONRenderer().render(data, media_type) != StdJSONRenderer().render(data, media_type):
+                raise CommandError(f'La salida de ambos renderers difiere (decimals={decimals})')
+
+            self.stdout.write(
+                f'decimals={decimals:<5} stdlib={base:8.2f}ms  orjson={rapido:8.2f}ms  '
+                f'speedup={base / rapido:5.1f}x'
+            )
+
+    def _medir(self, renderer, data, media_type, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            renderer.render(data, media_type)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.gestion_operativa.capital import conciliar_capital
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula capital_activo_hoy y capital_total de cada casa a partir del '
+        'libro de movimientos y corrige las que se hayan desviado'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--casa', type=int, action='append', dest='casas',
+                            help='Conciliar solo esta casa (repetible)')
+        parser.add_argument('--lote', type=int, default=500, help='Casas por transacción')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo informa las diferencias, sin corregirlas')
+
+    def handle(self, *args, **options):
+        diferencias = conciliar_capital(
+            casas=options['casas'], lote=options['lote'], aplicar=not options['dry_run']
+        )
+        for d in diferencias:
+            self.stdout.write(
+                f'Casa {d.casa_id}: activo {d.capital_activo_hoy} → {d.libro_activo}, '
+                f'total {d.capital_total} → {d.libro_total}'
+            )
+        accion = 'con diferencias' if options['dry_run'] else 'corregidas'
+        self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} casas {accion}'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.gestion_operativa.exposicion import conciliar_exposicion
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula la exposición abierta por perfil, casa, agencia y mercado a partir '
+        'de las operaciones pendientes y corrige las filas que se hayan desviado'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo informa las diferencias, sin corregirlas')
+
+    def handle(self, *args, **options):
+        diferencias = conciliar_exposicion(aplicar=not options['dry_run'])
+        for d in diferencias:
+            self.stdout.write(
+                f'{d.ambito} {d.clave or "(sin mercado)"}: operaciones {d.num_operaciones} → {d.real_operaciones}, '
+                f'stake {d.importe_abierto} → {d.real_importe}, payout {d.payout_potencial} → {d.real_payout}'
+            )
+        accion = 'con diferencias' if options['dry_run'] else 'corregidas'
+        self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} filas {accion}'))
@@ -0,0 +1,43 @@
+import time
+from collections import Counter
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gestion_operativa.anomalias import UmbralesAnomalia, detectar_anomalias
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la actividad de un día de cada perfil con su ventana anterior y abre '
+        'alertas por picos de stake, ráfagas de operaciones y deportes fuera del DNA'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Día a evaluar, AAAA-MM-DD (por defecto, hoy)')
+        parser.add_argument('--dias-base', type=int, default=28, help='Días anteriores que forman la línea base')
+        parser.add_argument('--z-stake', type=float, default=UmbralesAnomalia.z_stake)
+        parser.add_argument('--factor-ritmo', type=float, default=UmbralesAnomalia.factor_ritmo,
+                            help='Múltiplo del ritmo diario esperado que se considera ráfaga')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa, sin crear alertas')
+
+    def handle(self, *args, **options):
+        try:
+            dia = date.fromisoformat(options['fecha']) if options['fecha'] else None
+        except ValueError:
+            raise CommandError('--fecha debe tener el formato AAAA-MM-DD')
+        if options['dias_base'] < 1:
+            raise CommandError('--dias-base debe ser al menos 1')
+        umbrales = UmbralesAnomalia(z_stake=options['z_stake'], factor_ritmo=options['factor_ritmo'])
+
+        inicio = time.perf_counter()
+        alertas = detectar_anomalias(dia, options['dias_base'], umbrales, crear=not options['dry_run'])
+        duracion = time.perf_counter() - inicio
+
+        for alerta in alertas[:20]:
+            self.stdout.write(f'Perfil {alerta.perfil_afectado_id} [{alerta.tipo_alerta}] {alerta.descripcion}')
+        por_tipo = ', '.join(f'{tipo}: {n}' for tipo, n in sorted(Counter(a.tipo_alerta for a in alertas).items()))
+        accion = 'detectadas' if options['dry_run'] else 'creadas'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(alertas)} alertas {accion} ({por_tipo or "ninguna"}) en {duracion:.1f}s'
+        ))
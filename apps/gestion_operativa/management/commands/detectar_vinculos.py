@@ -0,0 +1,23 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from apps.gestion_operativa.vinculos import detectar_vinculos
+
+
+class Command(BaseCommand):
+    help = (
+        'Busca perfiles de casas distintas que comparten IP o subred y abre las alertas '
+        'que falten (las altas y cambios de IP ya se comprueban al guardar)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa, sin crear alertas')
+
+    def handle(self, *args, **options):
+        alertas = detectar_vinculos(crear=not options['dry_run'])
+        for alerta in alertas[:20]:
+            self.stdout.write(f'Perfil {alerta.perfil_afectado_id} [{alerta.tipo_alerta}] {alerta.descripcion}')
+        por_tipo = ', '.join(f'{tipo}: {n}' for tipo, n in sorted(Counter(a.tipo_alerta for a in alertas).items()))
+        accion = 'detectadas' if options['dry_run'] else 'creadas'
+        self.stdout.write(self.style.SUCCESS(f'{len(alertas)} alertas {accion} ({por_tipo or "ninguna"})'))
@@ -0,0 +1,308 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.gestion_operativa.choices import (
+    DeportesChoices, TipoJugadorChoices, NivelCuentaChoices, ConceptoCapitalChoices,
+    TipoTransaccionChoices, EstadoTransaccionChoices
+)
+from apps.gestion_operativa.models import (
+    Distribuidora, CasaApuestas, Ubicacion, Agencia, PerfilOperativo,
+    TransaccionFinanciera, PlanificacionRotacion, AlertaOperativa,
+    BitacoraMando, Operacion, MovimientoCapital
+)
+from apps.gestion_operativa.exposicion import conciliar_exposicion
+
+User = get_user_model()
+
+MERCADOS = [
+    'Ganador del partido', 'Doble oportunidad', 'Over 2.5', 'Under 2.5',
+    'Ambos marcan', 'Handicap asiático', 'Total de puntos', 'Primer set',
+]
+CIUDADES = [
+    ('Lima', 'Lima'), ('Arequipa', 'Arequipa'), ('Cusco', 'Cusco'),
+    ('La Libertad', 'Trujillo'), ('Piura', 'Piura'), ('Lambayeque', 'Chiclayo'),
+]
+METODOS_PAGO = ['Transferencia', 'Yape', 'Plin', 'Tarjeta', 'Efectivo']
+TWO_PLACES = Decimal('0.01')
+
+
+def _dinero(valor):
+    return Decimal(valor).quantize(TWO_PLACES)
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera un dataset sintético de volumen productivo con bulk_create y una '
+        'semilla reproducible (distribuidoras → casas → agencias → perfiles → '
+        'operaciones y transacciones)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--distribuidoras', type=int, default=5)
+        parser.add_argument('--casas-por-distribuidora', type=int, default=4)
+        parser.add_argument('--agencias-por-casa', type=int, default=5)
+        parser.add_argument('--perfiles-por-agencia', type=int, default=20)
+        parser.add_argument('--operaciones', type=int, default=1_000_000)
+        parser.add_argument('--transacciones', type=int, default=200_000)
+        parser.add_argument('--dias', type=int, default=365, help='Días de historia a cubrir')
+        parser.add_argument('--lote', type=int, default=10_000, help='Tamaño de lote de bulk_create')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['semilla'])
+        self.lote = options['lote']
+        self.ahora = timezone.now()
+        self.dias = options['dias']
+        self.prefijo = f"sint{options['semilla']}"
+
+        if User.objects.filter(username__startswith=f'{self.prefijo}_').exists():
+            raise CommandError(
+                f'Ya existen datos sintéticos con la semilla {options["semilla"]}. '
+                'Usa otra semilla o limpia la base de datos.'
+            )
+
+        with transaction.atomic():
+            distribuidoras = self._crear_distribuidoras(options['distribuidoras'])
+            casas = self._crear_casas(distribuidoras, options['casas_por_distribuidora'])
+            agencias = self._crear_agencias(casas, options['agencias_por_casa'])
+            perfiles = self._crear_perfiles(agencias, options['perfiles_por_agencia'])
+            self._crear_planificacion(perfiles)
+            self._crear_alertas_y_bitacora(perfiles)
+
+        self._crear_operaciones(perfiles, options['operaciones'])
+        self._crear_transacciones(perfiles, options['transacciones'])
+        # bulk_create no pasa por registrar(): la exposición se reconstruye al final
+        conciliar_exposicion()
+
+        self.stdout.write(self.style.SUCCESS('✅ Dataset sintético generado'))
+
+    # ------------------------------------------------------------------
+    # Catálogo
+    # ------------------------------------------------------------------
+
+    def _crear_distribuidoras(self, n):
+        deportes = DeportesChoices.values
+        objs = [
+            Distribuidora(
+                nombre=f'Distribuidora {self.prefijo}-{i}',
+                deportes=self.rng.sample(deportes, self.rng.randint(1, len(deportes))),
+            )
+            for i in range(n)
+        ]
+        return self._bulk(Distribuidora, objs)
+
+    def _crear_casas(self, distribuidoras, por_distribuidora):
+        objs = []
+        for distribuidora in distribuidoras:
+            for i in range(por_distribuidora):
+                capital_total = _dinero(self.rng.uniform(20_000, 500_000))
+                objs.append(CasaApuestas(
+                    distribuidora=distribuidora,
+                    nombre=f'Casa {distribuidora.pk}-{i}',
+                    capital_total=capital_total,
+                    capital_activo_hoy=_dinero(capital_total * Decimal(self.rng.uniform(0.1, 0.6))),
+                    perfiles_minimos_req=self.rng.randint(5, 50),
+                    activo=self.rng.random() > 0.05,
+                ))
+        casas = self._bulk(CasaApuestas, objs)
+        self._bulk(MovimientoCapital, [
+            MovimientoCapital(
+                casa=casa,
+                concepto=ConceptoCapitalChoices.APERTURA,
+                monto_activo=casa.capital_activo_hoy,
+                monto_total=casa.capital_total,
+            )
+            for casa in casas
+        ])
+        return casas
+
+    def _crear_agencias(self, casas, por_casa):
+        ubicaciones = self._bulk(Ubicacion, [
+            Ubicacion(
+                provincia_estado=provincia,
+                ciudad=ciudad,
+                direccion=f'Av. Sintética {i}',
+            )
+            for i, (provincia, ciudad) in enumerate(
+                self.rng.choice(CIUDADES) for _ in range(len(casas) * por_casa)
+            )
+        ])
+        objs = []
+        for i, ubicacion in enumerate(ubicaciones):
+            objs.append(Agencia(
+                nombre=f'Agencia {self.prefijo}-{i}',
+                ubicacion=ubicacion,
+                responsable=f'Responsable {i}',
+                casa_madre=casas[i // por_casa],
+                rake_porcentaje=_dinero(self.rng.uniform(1, 15)),
+                activo=self.rng.random() > 0.05,
+            ))
+        return self._bulk(Agencia, objs)
+
+    def _crear_perfiles(self, agencias, por_agencia):
+        total = len(agencias) * por_agencia
+        usuarios = self._bulk(User, [
+            User(
+                username=f'{self.prefijo}_{i}',
+                email=f'{self.prefijo}_{i}@sintetico.local',
+                password='!',
+                rol=User.OPERADOR,
+            )
+            for i in range(total)
+        ])
+        objs = []
+        for i, usuario in enumerate(usuarios):
+            agencia = agencias[i // por_agencia]
+            objs.append(PerfilOperativo(
+                usuario=usuario,
+                casa_id=agencia.casa_madre_id if self.rng.random() > 0.1 else None,
+                agencia=agencia,
+                nombre_usuario=f'{self.prefijo}_perfil_{i}',
+                tipo_jugador=self.rng.choice(TipoJugadorChoices.values),
+                deporte_dna=self.rng.choice(DeportesChoices.values),
+                ip_operativa=f'10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}',
+                nivel_cuenta=self.rng.choice(NivelCuentaChoices.values),
+                meta_ops_semanales=self.rng.randint(5, 60),
+                activo=self.rng.random() > 0.1,
+            ))
+        return self._bulk(PerfilOperativo, objs)
+
+    def _crear_planificacion(self, perfiles):
+        hoy = self.ahora.date()
+        objs = []
+        for perfil in perfiles:
+            for delta in range(-14, 15):
+                fecha = hoy + timedelta(days=delta)
+                objs.append(PlanificacionRotacion(
+                    perfil=perfil,
+                    fecha=fecha,
+                    estado_dia='A' if self.rng.random() < 0.7 else 'D',
+                    mes=fecha.month,
+                    anio=fecha.year,
+                ))
+        self._bulk(PlanificacionRotacion, objs)
+
+    def _crear_alertas_y_bitacora(self, perfiles):
+        alertas = [
+            AlertaOperativa(
+                tipo_alerta=self.rng.choice(['SALDO_BAJO', 'LIMITACION', 'VERIFICACION']),
+                descripcion='Alerta sintética',
+                severidad=self.rng.choice(['BAJA', 'MEDIA', 'ALTA']),
+                perfil_afectado=perfil,
+                casa_afectada_id=perfil.casa_id,
+                estado=self.rng.choice(['ABIERTA', 'CERRADA']),
+            )
+            for perfil in self.rng.sample(perfiles, len(perfiles) // 10)
+        ]
+        self._bulk(AlertaOperativa, alertas)
+        bitacora = [
+            BitacoraMando(
+                perfil=perfil,
+                observacion=f'Seguimiento del perfil {perfil.nombre_usuario}: '
+                            f'{self.rng.choice(MERCADOS)} sin incidencias',
+                usuario_registro_id=perfil.usuario_id,
+            )
+            for perfil in perfiles
+            for _ in range(self.rng.randint(0, 3))
+        ]
+        self._bulk(BitacoraMando, bitacora)
+
+    # ------------------------------------------------------------------
+    # Volumen: operaciones y transacciones
+    # ------------------------------------------------------------------
+
+    def _fecha_aleatoria(self):
+        return self.ahora - timedelta(seconds=self.rng.uniform(0, self.dias * 86400))
+
+    def _crear_operaciones(self, perfiles, total):
+        stakes = {perfil.pk: self.rng.uniform(5, 300) for perfil in perfiles}
+
+        def generar():
+            for _ in range(total):
+                perfil = self.rng.choice(perfiles)
+                fecha = self._fecha_aleatoria()
+                importe = _dinero(max(1.0, self.rng.gauss(stakes[perfil.pk], stakes[perfil.pk] / 3)))
+                cuota = _dinero(min(20.0, 1.05 + self.rng.lognormvariate(-0.2, 0.6)))
+                if self.ahora - fecha < timedelta(days=2) and self.rng.random() < 0.5:
+                    estado, payout = 'PENDIENTE', None
+                elif self.rng.random() < 0.02:
+                    estado, payout = 'ANULADA', importe
+                elif self.rng.random() < 0.97 / float(cuota):
+                    estado, payout = 'GANADA', _dinero(importe * cuota)
+                else:
+                    estado, payout = 'PERDIDA', Decimal('0.00')
+                deporte = (
+                    perfil.deporte_dna if self.rng.random() < 0.7
+                    else self.rng.choice(DeportesChoices.values)
+                )
+                yield Operacion(
+                    perfil_id=perfil.pk,
+                    fecha_registro=fecha,
+                    importe=importe,
+                    cuota=cuota,
+                    estado=estado,
+                    payout=payout,
+                    profit_loss=None if payout is None else payout - importe,
+                    deporte=deporte,
+                    mercado=self.rng.choice(MERCADOS),
+                )
+
+        self._bulk_stream(Operacion, generar(), total)
+
+    def _crear_transacciones(self, perfiles, total):
+        def generar():
+            for _ in range(total):
+                yield TransaccionFinanciera(
+                    perfil_id=self.rng.choice(perfiles).pk,
+                    tipo_transaccion=(
+                        TipoTransaccionChoices.DEPOSITO if self.rng.random() < 0.6
+                        else TipoTransaccionChoices.RETIRO
+                    ),
+                    monto=_dinero(self.rng.uniform(20, 2000)),
+                    fecha_transaccion=self._fecha_aleatoria(),
+                    metodo_pago=self.rng.choice(METODOS_PAGO),
+                    estado=self.rng.choices(
+                        [
+                            EstadoTransaccionChoices.CONFIRMADA,
+                            EstadoTransaccionChoices.PENDIENTE,
+                            EstadoTransaccionChoices.FALLIDA,
+                        ],
+                        weights=[90, 7, 3]
+                    )[0],
+                )
+
+        self._bulk_stream(TransaccionFinanciera, generar(), total)
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+
+    def _bulk(self, model, objs):
+        creados = model.objects.bulk_create(objs, batch_size=self.lote)
+        self.stdout.write(f'   {model._meta.verbose_name_plural}: {len(creados)}')
+        return creados
+
+    def _bulk_stream(self, model, generador, total):
+        """Inserta en lotes sin materializar todo el volumen en memoria."""
+        creados = 0
+        lote = []
+        for obj in generador:
+            lote.append(obj)
+            if len(lote) >= self.lote:
+                creados += self._insertar_lote(model, lote)
+                lote = []
+                self.stdout.write(f'   {model._meta.verbose_name_plural}: {creados}/{total}', ending='\r')
+        if lote:
+            creados += self._insertar_lote(model, lote)
+        self.stdout.write(f'   {model._meta.verbose_name_plural}: {creados}/{total}')
+
+    def _insertar_lote(self, model, lote):
+        with transaction.atomic():
+            model.objects.bulk_create(lote, batch_size=self.lote)
+        return len(lote)
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.gestion_operativa.particiones import (
+    TABLAS, crear_particion, desacoplar_particion, es_particionada,
+    inicio_mes, listar_particiones, nombre_particion, repartir_default, sumar_meses
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Da partición propia a los meses que hayan caído en la DEFAULT, pre-crea '
+        'las particiones mensuales futuras de operaciones y transacciones_financieras '
+        'y desacopla (o elimina) las anteriores al periodo de retención. Pensado para '
+        'ejecutarse a diario desde cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tabla', action='append', choices=sorted(TABLAS), dest='tablas',
+                            help='Tabla a gestionar (repetible; por defecto todas)')
+        parser.add_argument('--meses-adelante', type=int, default=3,
+                            help='Meses futuros con partición ya creada')
+        parser.add_argument('--retener-meses', type=int,
+                            help='Desacopla las particiones de meses anteriores a este número de meses')
+        parser.add_argument('--eliminar', action='store_true',
+                            help='Elimina las particiones desacopladas en vez de conservarlas como tablas sueltas')
+
+    def handle(self, *args, **options):
+        mes_actual = inicio_mes(timezone.now())
+        for tabla in options['tablas'] or sorted(TABLAS):
+            if not es_particionada(tabla):
+                raise CommandError(f'{tabla} no es una tabla particionada; aplique las migraciones')
+
+            # Meses pasados cargados tarde: sin partición propia no hay pruning ni retención
+            for mes, movidas in repartir_default(tabla).items():
+                self.stdout.write(f'{nombre_particion(tabla, mes)}: creada ({movidas} filas movidas desde DEFAULT)')
+
+            for desplazamiento in range(options['meses_adelante'] + 1):
+                mes = sumar_meses(mes_actual, desplazamiento)
+                movidas = crear_particion(tabla, mes)
+                if movidas is not None:
+                    self.stdout.write(
+                        f'{nombre_particion(tabla, mes)}: creada ({movidas} filas movidas desde DEFAULT)'
+                    )
+
+            if options['retener_meses'] is None:
+                continue
+            corte = sumar_meses(mes_actual, -options['retener_meses'])
+            for mes in listar_particiones(tabla):
+                if mes >= corte:
+                    break
+                nombre = desacoplar_particion(tabla, mes, eliminar=options['eliminar'])
+                accion = 'eliminada' if options['eliminar'] else 'desacoplada'
+                self.stdout.write(f'{nombre}: {accion}')
+
+        self.stdout.write(self.style.SUCCESS('Particiones al día'))
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.gestion_operativa.rake import liquidar_rake
+
+
+class Command(BaseCommand):
+    help = (
+        'Liquida el rake mensual de las agencias. Volver a ejecutarlo sobre el mismo mes '
+        'solo añade ajustes por las diferencias (operaciones liquidadas tarde)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mes', help='Mes a liquidar, AAAA-MM (por defecto, el mes anterior)')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa, sin guardar las liquidaciones')
+
+    def handle(self, *args, **options):
+        if options['mes']:
+            try:
+                mes = datetime.strptime(options['mes'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--mes debe tener el formato AAAA-MM')
+        else:
+            mes = (timezone.localdate().replace(day=1) - timezone.timedelta(days=1)).replace(day=1)
+        if mes > timezone.localdate():
+            raise CommandError('No se puede liquidar un mes futuro')
+
+        nuevas = liquidar_rake(mes, aplicar=not options['dry_run'])
+        for fila in nuevas:
+            tipo = 'liquidación' if fila.secuencia == 1 else f'ajuste #{fila.secuencia}'
+            self.stdout.write(
+                f'Agencia {fila.agencia_id} ({tipo}): {fila.num_operaciones} operaciones, '
+                f'volumen {fila.volumen}, P&L {fila.pnl}, rake {fila.rake} ({fila.rake_porcentaje}% {fila.base})'
+            )
+        accion = 'por registrar' if options['dry_run'] else 'registradas'
+        self.stdout.write(self.style.SUCCESS(f'{mes:%Y-%m}: {len(nuevas)} líneas {accion}'))
@@ -0,0 +1,55 @@
+import json
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.gestion_operativa.models import PerfilOperativo
+from apps.gestion_operativa.simulacion import FIJO, POLITICAS, simular_bankroll
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula por Monte Carlo el bankroll de los perfiles a partir de su historial '
+        'de operaciones: riesgo de ruina, drawdown y crecimiento esperado'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perfil', type=int, action='append', dest='perfiles',
+                            help='Simular solo este perfil (repetible; por defecto, todos los activos)')
+        parser.add_argument('--politica', choices=POLITICAS, default=FIJO)
+        parser.add_argument('--fraccion', type=float, default=0.02,
+                            help='Fracción del bankroll apostada en las políticas fijo y proporcional')
+        parser.add_argument('--trayectorias', type=int, default=1000)
+        parser.add_argument('--apuestas', type=int, default=100, help='Apuestas por trayectoria')
+        parser.add_argument('--historial', type=int, default=500,
+                            help='Operaciones liquidadas más recientes de cada perfil a remuestrear')
+        parser.add_argument('--bankroll', type=Decimal, help='Bankroll inicial común (por defecto, el saldo de cada perfil)')
+        parser.add_argument('--semilla', type=int)
+        parser.add_argument('--salida', help='Ruta del JSON de resultados')
+
+    def handle(self, *args, **options):
+        perfiles = options['perfiles'] or list(
+            PerfilOperativo.objects.filter(activo=True).order_by('pk').values_list('pk', flat=True)
+        )
+        inicio = time.perf_counter()
+        resultados = simular_bankroll(
+            perfiles, politica=options['politica'], fraccion=options['fraccion'],
+            trayectorias=options['trayectorias'], apuestas=options['apuestas'],
+            historial=options['historial'], bankroll=options['bankroll'], semilla=options['semilla'],
+        )
+        duracion = time.perf_counter() - inicio
+
+        simulados = [r for r in resultados if 'motivo' not in r]
+        for r in sorted(simulados, key=lambda r: r['riesgo_ruina'], reverse=True)[:10]:
+            self.stdout.write(
+                f"Perfil {r['perfil']}: ruina {r['riesgo_ruina']:.2%}, drawdown p95 {r['drawdown_p95']:.2%}, "
+                f"crecimiento esperado {r['crecimiento_esperado']:+.2%}"
+            )
+        if options['salida']:
+            Path(options['salida']).write_text(json.dumps(resultados, indent=2))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(simulados)} perfiles simulados ({len(resultados) - len(simulados)} sin datos suficientes) '
+            f'en {duracion:.1f}s'
+        ))
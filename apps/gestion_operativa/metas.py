@@ -0,0 +1,131 @@
+"""
+Meta diaria de volumen y progreso del día.
+
+`calcular_meta` estima, para un día, los perfiles listos para operar (activos
+sin descanso en `PlanificacionRotacion`), los que descansan y la meta de
+volumen: el volumen medio por perfil y día de los `dias_base` días anteriores
+(solo días y perfiles con operaciones) multiplicado por los perfiles listos.
+Son dos consultas agregadas; `actualizar_meta` escribe los tres campos de
+`ConfiguracionOperativa` con un único UPDATE, y solo si
+`actualizar_meta_diariamente` está activo (salvo `forzar`). Sin historial en
+la ventana se conserva la meta anterior.
+
+`progreso` compara la meta con el volumen del día. Los contadores del día
+(operaciones, volumen y perfiles que operan) se guardan en caché durante
+`PROGRESO_CACHE_SEGUNDOS`, así que un panel que consulta cada pocos segundos
+no cuenta las operaciones en cada petición.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ConfiguracionOperativa, Operacion, PerfilOperativo, PlanificacionRotacion
+
+CERO = Decimal('0.00')
+
+
+@dataclass
+class MetaDiaria:
+    fecha: date
+    perfiles_listos_operar: int
+    perfiles_en_descanso: int
+    volumen_por_perfil: Decimal | None
+    meta_volumen_diario: Decimal | None
+
+
+def _inicio(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def calcular_meta(dia=None, dias_base=28):
+    dia = dia or timezone.localdate()
+    descansa = PlanificacionRotacion.objects.filter(perfil=OuterRef('pk'), fecha=dia, estado_dia='D')
+    perfiles = PerfilOperativo.objects.filter(activo=True).annotate(descansa=Exists(descansa)).aggregate(
+        activos=Count('pk'), en_descanso=Count('pk', filter=Q(descansa=True)),
+    )
+    listos = perfiles['activos'] - perfiles['en_descanso']
+
+    # Por día: volumen y perfiles que operaron (la ventana filtra por rango: pruning de particiones)
+    dias = Operacion.objects.filter(
+        fecha_registro__gte=_inicio(dia - timedelta(days=dias_base)), fecha_registro__lt=_inicio(dia),
+    ).exclude(estado='ANULADA').order_by().values(
+        dia=TruncDate('fecha_registro', tzinfo=timezone.get_current_timezone())
+    ).annotate(volumen=Sum('importe'), perfiles=Count('perfil', distinct=True)).values_list('volumen', 'perfiles')
+    volumen, perfiles_dia = CERO, 0
+    for volumen_dia, perfiles_operando in dias:
+        volumen += volumen_dia
+        perfiles_dia += perfiles_operando
+
+    por_perfil = (volumen / perfiles_dia).quantize(CERO) if perfiles_dia else None
+    return MetaDiaria(
+        fecha=dia,
+        perfiles_listos_operar=listos,
+        perfiles_en_descanso=perfiles['en_descanso'],
+        volumen_por_perfil=por_perfil,
+        meta_volumen_diario=None if por_perfil is None else por_perfil * listos,
+    )
+
+
+def actualizar_meta(dia=None, dias_base=28, forzar=False, aplicar=True):
+    """
+    Calcula la meta del día y la guarda en la configuración. Devuelve la meta
+    calculada, o None si no hay configuración o no tiene activa la
+    actualización diaria.
+    """
+    configuracion = ConfiguracionOperativa.objects.filter(
+        **({} if forzar else {'actualizar_meta_diariamente': True})
+    ).first()
+    if configuracion is None:
+        return None
+    meta = calcular_meta(dia, dias_base)
+    if aplicar:
+        campos = {
+            'perfiles_listos_operar': meta.perfiles_listos_operar,
+            'perfiles_en_descanso': meta.perfiles_en_descanso,
+            # update() no pasa por auto_now: se fecha a mano para las cabeceras condicionales
+            'fecha_actualizacion': timezone.now(),
+        }
+        if meta.meta_volumen_diario is not None:
+            campos['meta_volumen_diario'] = meta.meta_volumen_diario
+        ConfiguracionOperativa.objects.filter(pk=configuracion.pk).update(**campos)
+    return meta
+
+
+def contadores_del_dia(dia=None):
+    """(operaciones, volumen, perfiles que operan) del día, con caché."""
+    dia = dia or timezone.localdate()
+    clave = f'progreso:{dia.isoformat()}'
+    contadores = cache.get(clave)
+    if contadores is None:
+        contadores = Operacion.objects.filter(
+            fecha_registro__gte=_inicio(dia), fecha_registro__lt=_inicio(dia + timedelta(days=1)),
+        ).exclude(estado='ANULADA').aggregate(
+            operaciones=Count('pk'), volumen=Sum('importe', default=CERO), perfiles=Count('perfil', distinct=True),
+        )
+        contadores['calculado'] = timezone.now()
+        cache.set(clave, contadores, timeout=settings.PROGRESO_CACHE_SEGUNDOS)
+    return contadores
+
+
+def progreso(configuracion, dia=None):
+    contadores = contadores_del_dia(dia)
+    meta = configuracion.meta_volumen_diario
+    return {
+        'fecha': dia or timezone.localdate(),
+        'meta_volumen_diario': meta,
+        'volumen': contadores['volumen'],
+        'restante': max(meta - contadores['volumen'], CERO),
+        'porcentaje': round(float(contadores['volumen'] / meta) * 100, 1) if meta else None,
+        'operaciones': contadores['operaciones'],
+        'perfiles_operando': contadores['perfiles'],
+        'perfiles_listos_operar': configuracion.perfiles_listos_operar,
+        'perfiles_en_descanso': configuracion.perfiles_en_descanso,
+        'configuracion_actualizada': configuracion.fecha_actualizacion,
+        'contadores_calculados': contadores['calculado'],
+    }
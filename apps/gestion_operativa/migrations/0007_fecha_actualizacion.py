@@ -0,0 +1,57 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0006_remove_perfiloperativo_ciudad_sede_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agencia",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="alertaoperativa",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="bitacoramando",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="configuracionoperativa",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="operacion",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="perfiloperativo",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="planificacionrotacion",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="transaccionfinanciera",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="ubicacion",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
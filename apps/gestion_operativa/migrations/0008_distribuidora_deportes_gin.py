@@ -0,0 +1,75 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:41
+
+import unicodedata
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+# Valores de DeportesChoices y sus etiquetas, congelados para la migración
+DEPORTES = {
+    'FUTBOL': 'Fútbol',
+    'BASKETBALL': 'Basketball',
+    'TENNIS': 'Tennis',
+    'BEISBOL': 'Béisbol',
+    'AMERICANO': 'Fútbol Americano',
+    'HOCKEY': 'Hockey',
+    'BOXEO': 'Boxeo',
+    'UFC': 'UFC',
+    'OTROS': 'Otros',
+}
+
+
+def _clave(texto):
+    sin_acentos = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return sin_acentos.strip().upper()
+
+
+EQUIVALENCIAS = {
+    **{_clave(etiqueta): valor for valor, etiqueta in DEPORTES.items()},
+    **{valor: valor for valor in DEPORTES},
+    'TENIS': 'TENNIS',
+    'BALONCESTO': 'BASKETBALL',
+    'BASQUET': 'BASKETBALL',
+    'BASEBALL': 'BEISBOL',
+    'FOOTBALL': 'AMERICANO',
+}
+
+
+def normalizar_deportes(apps, schema_editor):
+    """Deja `deportes` como lista JSON de valores de DeportesChoices sin duplicados."""
+    Distribuidora = apps.get_model('gestion_operativa', 'Distribuidora')
+    for distribuidora in Distribuidora.objects.only('pk', 'deportes').iterator():
+        deportes = distribuidora.deportes
+        if isinstance(deportes, str):
+            deportes = deportes.split(',')
+        elif not isinstance(deportes, list):
+            deportes = []
+
+        normalizados = []
+        for deporte in deportes:
+            if not str(deporte).strip():
+                continue
+            valor = EQUIVALENCIAS.get(_clave(deporte), 'OTROS')
+            if valor not in normalizados:
+                normalizados.append(valor)
+
+        if normalizados != distribuidora.deportes:
+            Distribuidora.objects.filter(pk=distribuidora.pk).update(deportes=normalizados)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0007_fecha_actualizacion"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_deportes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="distribuidora",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["deportes"],
+                name="distribuidoras_deportes_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
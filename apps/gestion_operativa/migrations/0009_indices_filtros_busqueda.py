@@ -0,0 +1,223 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:43
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+INDICES_TRIGRAMAS = [
+    (
+        "agencia",
+        django.contrib.postgres.indexes.GinIndex(
+            django.contrib.postgres.indexes.OpClass(
+                django.db.models.functions.text.Upper("nombre"), name="gin_trgm_ops"
+            ),
+            name="agencias_nombre_trgm",
+        ),
+    ),
+    (
+        "casaapuestas",
+        django.contrib.postgres.indexes.GinIndex(
+            django.contrib.postgres.indexes.OpClass(
+                django.db.models.functions.text.Upper("nombre"), name="gin_trgm_ops"
+            ),
+            name="casas_nombre_trgm",
+        ),
+    ),
+    (
+        "distribuidora",
+        django.contrib.postgres.indexes.GinIndex(
+            django.contrib.postgres.indexes.OpClass(
+                django.db.models.functions.text.Upper("nombre"), name="gin_trgm_ops"
+            ),
+            name="distribuidoras_nombre_trgm",
+        ),
+    ),
+    (
+        "perfiloperativo",
+        django.contrib.postgres.indexes.GinIndex(
+            django.contrib.postgres.indexes.OpClass(
+                django.db.models.functions.text.Upper("nombre_usuario"),
+                name="gin_trgm_ops",
+            ),
+            name="perfiles_nombre_trgm",
+        ),
+    ),
+]
+
+
+def _pg_trgm_disponible(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def crear_indices_trigramas(apps, schema_editor):
+    """
+    Crea pg_trgm y los índices de trigramas. Si el servidor no trae pg_trgm
+    (postgresql-contrib no instalado) se omiten: la búsqueda funciona igual,
+    aunque sin índice.
+    """
+    if not _pg_trgm_disponible(schema_editor):
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model_name, index in INDICES_TRIGRAMAS:
+        schema_editor.add_index(apps.get_model("gestion_operativa", model_name), index)
+
+
+def eliminar_indices_trigramas(apps, schema_editor):
+    for _, index in INDICES_TRIGRAMAS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{index.name}"')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0008_distribuidora_deportes_gin"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="agencia",
+            index=models.Index(
+                fields=["nombre", "id_agencia"], name="agencias_nombre_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="agencia",
+            index=models.Index(
+                fields=["fecha_registro"], name="agencias_fecha_registro_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alertaoperativa",
+            index=models.Index(
+                fields=["severidad", "estado"], name="alertas_severidad_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bitacoramando",
+            index=models.Index(
+                fields=["fecha_registro", "id_bitacora"], name="bitacora_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bitacoramando",
+            index=models.Index(
+                fields=["perfil", "fecha_registro"], name="bitacora_perfil_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="casaapuestas",
+            index=models.Index(fields=["nombre", "id_casa"], name="casas_nombre_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="casaapuestas",
+            index=models.Index(
+                fields=["fecha_actualizacion_capital"], name="casas_fecha_capital_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="distribuidora",
+            index=models.Index(
+                fields=["nombre", "id_distribuidora"], name="distribuidoras_nombre_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="operacion",
+            index=models.Index(
+                fields=["fecha_registro", "id_operacion"], name="operaciones_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="operacion",
+            index=models.Index(
+                fields=["perfil", "fecha_registro"], name="operaciones_perfil_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="operacion",
+            index=models.Index(
+                fields=["estado", "fecha_registro"], name="operaciones_estado_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="operacion",
+            index=models.Index(
+                fields=["deporte", "fecha_registro"], name="operaciones_deporte_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="operacion",
+            index=models.Index(
+                fields=["mercado", "fecha_registro"], name="operaciones_mercado_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="perfiloperativo",
+            index=models.Index(
+                fields=["nombre_usuario", "id_perfil"], name="perfiles_nombre_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="planificacionrotacion",
+            index=models.Index(
+                fields=["fecha", "id_planificacion"], name="planificacion_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="planificacionrotacion",
+            index=models.Index(
+                fields=["perfil", "fecha"], name="planificacion_perfil_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="planificacionrotacion",
+            index=models.Index(
+                fields=["anio", "mes"], name="planificacion_periodo_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaccionfinanciera",
+            index=models.Index(
+                fields=["fecha_transaccion", "id_transaccion"],
+                name="transacciones_fecha_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaccionfinanciera",
+            index=models.Index(
+                fields=["perfil", "fecha_transaccion"], name="transacciones_perfil_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaccionfinanciera",
+            index=models.Index(
+                fields=["tipo_transaccion", "fecha_transaccion"],
+                name="transacciones_tipo_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaccionfinanciera",
+            index=models.Index(
+                fields=["estado", "fecha_transaccion"], name="transacciones_estado_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ubicacion",
+            index=models.Index(
+                fields=["ciudad", "id_ubicacion"], name="ubicaciones_ciudad_idx"
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDICES_TRIGRAMAS
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    crear_indices_trigramas, eliminar_indices_trigramas
+                ),
+            ],
+        ),
+    ]
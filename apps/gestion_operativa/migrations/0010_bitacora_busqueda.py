@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0009_indices_filtros_busqueda"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bitacoramando",
+            name="observacion_busqueda",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "observacion", config="spanish"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bitacoramando",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["observacion_busqueda"], name="bitacora_busqueda_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def abrir_libro(apps, schema_editor):
+    """Un movimiento APERTURA por casa con el saldo actual, para que libro y saldo cuadren."""
+    CasaApuestas = apps.get_model('gestion_operativa', 'CasaApuestas')
+    MovimientoCapital = apps.get_model('gestion_operativa', 'MovimientoCapital')
+    casas = CasaApuestas.objects.exclude(capital_activo_hoy=0, capital_total=0)
+    MovimientoCapital.objects.bulk_create(
+        (
+            MovimientoCapital(
+                casa_id=casa.pk,
+                concepto='APERTURA',
+                monto_activo=casa.capital_activo_hoy,
+                monto_total=casa.capital_total,
+                descripcion='Saldo existente al crear el libro',
+            )
+            for casa in casas.only('pk', 'capital_activo_hoy', 'capital_total').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0010_bitacora_busqueda"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MovimientoCapital",
+            fields=[
+                ("id_movimiento", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "concepto",
+                    models.CharField(
+                        choices=[
+                            ("APERTURA", "Saldo de apertura"),
+                            ("ASIGNACION", "Asignación de capital"),
+                            ("LIBERACION", "Liberación de capital"),
+                            ("DEPOSITO", "Depósito"),
+                            ("RETIRO", "Retiro"),
+                            ("AJUSTE", "Ajuste manual"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "monto_activo",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Variación de capital_activo_hoy",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "monto_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Variación de capital_total",
+                        max_digits=12,
+                    ),
+                ),
+                ("descripcion", models.CharField(blank=True, max_length=255)),
+                ("fecha_registro", models.DateTimeField(auto_now_add=True)),
+                (
+                    "casa",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="movimientos_capital",
+                        to="gestion_operativa.casaapuestas",
+                    ),
+                ),
+                (
+                    "transaccion",
+                    models.OneToOneField(
+                        blank=True,
+                        help_text="Transacción que origina el movimiento",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="movimiento_capital",
+                        to="gestion_operativa.transaccionfinanciera",
+                    ),
+                ),
+                (
+                    "usuario_registro",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Movimiento de Capital",
+                "verbose_name_plural": "Movimientos de Capital",
+                "db_table": "movimientos_capital",
+                "indexes": [
+                    models.Index(
+                        fields=["casa", "fecha_registro"], name="movimientos_casa_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(abrir_libro, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:49
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Prefijos de palabra del texto libre → valor de TipoTransaccionChoices / EstadoTransaccionChoices.
+# Se comparan con el inicio de cada palabra, no como subcadena: 'incompleto' o
+# 'desaprobado' no contienen la palabra 'completo' ni 'aprobado'. Los fallos y
+# anulaciones se comprueban antes que las confirmaciones ('completado con error')
+TIPOS = [
+    (('DEPOSIT', 'RECARGA', 'INGRESO', 'ABONO'), 'DEPOSITO'),
+    (('RETIR', 'COBRO', 'EGRESO', 'WITHDRAW'), 'RETIRO'),
+]
+ESTADOS = [
+    (('FALL', 'RECHAZ', 'ERROR', 'FAIL', 'DENEG', 'UNSUCCESS'), 'FALLIDA'),
+    (('ANUL', 'CANCEL', 'REVERT', 'DEVUEL'), 'ANULADA'),
+    (('CONFIRM', 'COMPLET', 'APROB', 'EXITO', 'PAGAD', 'ACREDIT', 'SUCCESS', 'DONE'), 'CONFIRMADA'),
+]
+# Una negación ('no pagado', 'pago no completado') anula una confirmación: el
+# estado queda como desconocido (PENDIENTE) y no suma al saldo
+NEGACIONES = {'NO', 'NOT', 'SIN', 'NUNCA'}
+AFIRMATIVOS = {'CONFIRMADA'}
+
+
+def _clave(texto):
+    sin_acentos = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return sin_acentos.strip().upper()
+
+
+def _normalizar(texto, reglas, por_defecto):
+    palabras = re.findall(r'[A-Z0-9]+', _clave(texto))
+    for prefijos, valor in reglas:
+        if any(palabra.startswith(prefijos) for palabra in palabras):
+            if valor in AFIRMATIVOS and NEGACIONES.intersection(palabras):
+                return por_defecto
+            return valor
+    return por_defecto
+
+
+def normalizar_transacciones(apps, schema_editor):
+    """
+    Convierte el texto libre de `tipo_transaccion` y `estado` en valores de
+    choices. Tipos desconocidos pasan a OTROS y estados desconocidos a
+    PENDIENTE, de modo que no alteren el saldo. Un UPDATE por valor distinto.
+    """
+    TransaccionFinanciera = apps.get_model('gestion_operativa', 'TransaccionFinanciera')
+    ahora = timezone.now()
+    for campo, reglas, por_defecto in (
+        ('tipo_transaccion', TIPOS, 'OTROS'),
+        ('estado', ESTADOS, 'PENDIENTE'),
+    ):
+        valores = TransaccionFinanciera.objects.order_by().values_list(campo, flat=True).distinct()
+        for valor in list(valores):
+            normalizado = _normalizar(valor, reglas, por_defecto)
+            if normalizado != valor:
+                TransaccionFinanciera.objects.filter(**{campo: valor}).update(
+                    **{campo: normalizado, 'fecha_actualizacion': ahora}
+                )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0011_movimientos_capital"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_transacciones, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="transaccionfinanciera",
+            name="estado",
+            field=models.CharField(
+                choices=[
+                    ("PENDIENTE", "Pendiente"),
+                    ("CONFIRMADA", "Confirmada"),
+                    ("FALLIDA", "Fallida"),
+                    ("ANULADA", "Anulada"),
+                ],
+                default="PENDIENTE",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transaccionfinanciera",
+            name="tipo_transaccion",
+            field=models.CharField(
+                choices=[
+                    ("DEPOSITO", "Depósito"),
+                    ("RETIRO", "Retiro"),
+                    ("OTROS", "Otros"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
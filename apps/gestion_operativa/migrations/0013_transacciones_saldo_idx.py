@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0012_transacciones_choices"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaccionfinanciera",
+            index=models.Index(
+                condition=models.Q(("estado", "CONFIRMADA")),
+                fields=["perfil"],
+                include=("tipo_transaccion", "monto"),
+                name="transacciones_saldo_idx",
+            ),
+        ),
+    ]
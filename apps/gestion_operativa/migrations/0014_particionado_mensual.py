@@ -0,0 +1,187 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:52
+
+from datetime import date, datetime, timezone as dt_timezone
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+# Tabla → (pk, columna de partición), congelado para la migración
+TABLAS = {
+    'operaciones': ('id_operacion', 'fecha_registro'),
+    'transacciones_financieras': ('id_transaccion', 'fecha_transaccion'),
+}
+MESES_ADELANTE = 3
+
+
+def _sumar_meses(mes, meses):
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _limite(mes):
+    return datetime(mes.year, mes.month, 1, tzinfo=dt_timezone.utc)
+
+
+def rellenar_fecha_registro(apps, schema_editor):
+    """Las operaciones sin fecha toman la de su última actualización."""
+    schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    schema_editor.execute(
+        "UPDATE operaciones SET fecha_registro = fecha_actualizacion WHERE fecha_registro IS NULL"
+    )
+
+
+def _particionar(cursor, tabla, pk, columna):
+    """
+    Reemplaza `tabla` por una tabla particionada por mes con las mismas
+    columnas, índices y FKs salientes, y copia los datos.
+    """
+    antigua = f'{tabla}_legacy'
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [tabla, f'{tabla}_pkey'],
+    )
+    indices = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [tabla],
+    )
+    fks = cursor.fetchall()
+    cursor.execute(
+        "SELECT attidentity <> '', pg_get_serial_sequence(%s, %s) FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attname = %s",
+        [tabla, pk, tabla, pk],
+    )
+    es_identity, secuencia = cursor.fetchone()
+
+    cursor.execute(f'ALTER TABLE "{tabla}" RENAME TO "{antigua}"')
+    cursor.execute(f'ALTER INDEX "{tabla}_pkey" RENAME TO "{antigua}_pkey"')
+    for nombre, _ in indices:
+        cursor.execute(f'DROP INDEX "{nombre}"')
+    for nombre, _ in fks:
+        cursor.execute(f'ALTER TABLE "{antigua}" DROP CONSTRAINT "{nombre}"')
+
+    cursor.execute(
+        f'CREATE TABLE "{tabla}" (LIKE "{antigua}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+        f'INCLUDING IDENTITY) PARTITION BY RANGE ("{columna}")'
+    )
+    cursor.execute(f'ALTER TABLE "{tabla}" ADD CONSTRAINT "{tabla}_pkey" PRIMARY KEY ("{pk}", "{columna}")')
+    cursor.execute(f'CREATE TABLE "{tabla}_pdefault" PARTITION OF "{tabla}" DEFAULT')
+
+    cursor.execute(f'SELECT min("{columna}") FROM "{antigua}"')
+    primera = cursor.fetchone()[0] or django.utils.timezone.now()
+    mes = date(primera.year, primera.month, 1)
+    ultimo = _sumar_meses(date.today().replace(day=1), MESES_ADELANTE)
+    while mes <= ultimo:
+        cursor.execute(
+            f'CREATE TABLE "{tabla}_p{mes:%Y%m}" PARTITION OF "{tabla}" FOR VALUES FROM (%s) TO (%s)',
+            [_limite(mes), _limite(_sumar_meses(mes, 1))],
+        )
+        mes = _sumar_meses(mes, 1)
+
+    cursor.execute(f'INSERT INTO "{tabla}" OVERRIDING SYSTEM VALUE SELECT * FROM "{antigua}"')
+    if es_identity:
+        cursor.execute(
+            f'SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(max("{pk}"), 0) + 1, false) '
+            f'FROM "{tabla}"',
+            [tabla, pk],
+        )
+    elif secuencia:
+        cursor.execute(f'ALTER SEQUENCE {secuencia} OWNED BY "{tabla}"."{pk}"')
+
+    for _, definicion in indices:
+        cursor.execute(definicion)
+    for nombre, definicion in fks:
+        cursor.execute(f'ALTER TABLE "{tabla}" ADD CONSTRAINT "{nombre}" {definicion}')
+    cursor.execute(f'DROP TABLE "{antigua}"')
+
+
+def _desparticionar(cursor, tabla, pk):
+    """
+    Inverso de `_particionar`: vuelve a una tabla normal con PK `(id)` y los
+    mismos índices y FKs, copiando las filas de todas las particiones
+    adjuntas. Las particiones ya desacopladas quedan como tablas sueltas.
+    """
+    particionada = f'{tabla}_particionada'
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [tabla, f'{tabla}_pkey'],
+    )
+    indices = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [tabla],
+    )
+    fks = cursor.fetchall()
+
+    cursor.execute(f'ALTER TABLE "{tabla}" RENAME TO "{particionada}"')
+    cursor.execute(f'ALTER INDEX "{tabla}_pkey" RENAME TO "{particionada}_pkey"')
+    for nombre, _ in indices:
+        cursor.execute(f'DROP INDEX "{nombre}"')
+    for nombre, _ in fks:
+        cursor.execute(f'ALTER TABLE "{particionada}" DROP CONSTRAINT "{nombre}"')
+
+    cursor.execute(
+        f'CREATE TABLE "{tabla}" (LIKE "{particionada}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+        f'INCLUDING IDENTITY)'
+    )
+    cursor.execute(f'ALTER TABLE "{tabla}" ADD CONSTRAINT "{tabla}_pkey" PRIMARY KEY ("{pk}")')
+    cursor.execute(f'INSERT INTO "{tabla}" OVERRIDING SYSTEM VALUE SELECT * FROM "{particionada}"')
+    cursor.execute(
+        f'SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(max("{pk}"), 0) + 1, false) '
+        f'FROM "{tabla}"',
+        [tabla, pk],
+    )
+    for _, definicion in indices:
+        cursor.execute(definicion)
+    for nombre, definicion in fks:
+        cursor.execute(f'ALTER TABLE "{tabla}" ADD CONSTRAINT "{nombre}" {definicion}')
+    cursor.execute(f'DROP TABLE "{particionada}"')
+
+
+def particionar(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for tabla, (pk, columna) in TABLAS.items():
+            _particionar(cursor, tabla, pk, columna)
+
+
+def desparticionar(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for tabla, (pk, _) in TABLAS.items():
+            _desparticionar(cursor, tabla, pk)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0013_transacciones_saldo_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="movimientocapital",
+            name="transaccion",
+            field=models.OneToOneField(
+                blank=True,
+                db_constraint=False,
+                help_text="Transacción que origina el movimiento",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="movimiento_capital",
+                to="gestion_operativa.transaccionfinanciera",
+            ),
+        ),
+        migrations.RunPython(rellenar_fecha_registro, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="operacion",
+            name="fecha_registro",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                help_text="Fecha y hora exacta de la operación",
+            ),
+        ),
+        migrations.RunPython(particionar, desparticionar),
+    ]
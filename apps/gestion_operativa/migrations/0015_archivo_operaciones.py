@@ -0,0 +1,138 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0014_particionado_mensual"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OperacionArchivada",
+            fields=[
+                (
+                    "id_operacion",
+                    models.IntegerField(primary_key=True, serialize=False),
+                ),
+                ("fecha_registro", models.DateTimeField()),
+                ("importe", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("cuota", models.DecimalField(decimal_places=2, max_digits=6)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("PENDIENTE", "Pendiente"),
+                            ("GANADA", "Ganada"),
+                            ("PERDIDA", "Perdida"),
+                            ("ANULADA", "Anulada"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "payout",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=12, null=True
+                    ),
+                ),
+                (
+                    "profit_loss",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=12, null=True
+                    ),
+                ),
+                ("deporte", models.CharField(blank=True, max_length=50, null=True)),
+                ("mercado", models.CharField(blank=True, max_length=100, null=True)),
+                ("fecha_actualizacion", models.DateTimeField()),
+                ("fecha_archivo", models.DateTimeField(auto_now_add=True)),
+                (
+                    "perfil",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="operaciones_archivadas",
+                        to="gestion_operativa.perfiloperativo",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Operación Archivada",
+                "verbose_name_plural": "Operaciones Archivadas",
+                "db_table": "operaciones_archivo",
+                "indexes": [
+                    models.Index(
+                        fields=["perfil", "fecha_registro"], name="archivo_perfil_idx"
+                    ),
+                    models.Index(
+                        fields=["fecha_registro", "id_operacion"],
+                        name="archivo_fecha_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResumenOperacionMensual",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mes", models.DateField(help_text="Primer día del mes (UTC)")),
+                ("deporte", models.CharField(blank=True, default="", max_length=50)),
+                ("mercado", models.CharField(blank=True, default="", max_length=100)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("PENDIENTE", "Pendiente"),
+                            ("GANADA", "Ganada"),
+                            ("PERDIDA", "Perdida"),
+                            ("ANULADA", "Anulada"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("num_operaciones", models.IntegerField(default=0)),
+                (
+                    "importe_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "payout_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "profit_loss_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "perfil",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_mensuales",
+                        to="gestion_operativa.perfiloperativo",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen Mensual de Operaciones",
+                "verbose_name_plural": "Resúmenes Mensuales de Operaciones",
+                "db_table": "operaciones_resumen_mensual",
+                "indexes": [models.Index(fields=["mes"], name="resumen_mes_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="resumenoperacionmensual",
+            constraint=models.UniqueConstraint(
+                fields=("perfil", "mes", "deporte", "mercado", "estado"),
+                name="resumen_mensual_unico",
+            ),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:09
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, Round
+
+
+def abrir_exposicion(apps, schema_editor):
+    """Exposición inicial desde las operaciones pendientes existentes."""
+    Operacion = apps.get_model('gestion_operativa', 'Operacion')
+    ExposicionAbierta = apps.get_model('gestion_operativa', 'ExposicionAbierta')
+    pendientes = Operacion.objects.filter(estado='PENDIENTE').order_by()
+    campos = {
+        'PERFIL': 'perfil_id',
+        'CASA': 'perfil__casa_id',
+        'AGENCIA': 'perfil__agencia_id',
+        'MERCADO': 'mercado',
+    }
+    filas = {}
+    for ambito, campo in campos.items():
+        agregados = pendientes.values(campo).annotate(
+            n=Count('pk'),
+            stake=Sum('importe'),
+            pago=Coalesce(
+                Sum(Round(F('importe') * F('cuota'), 2), output_field=DecimalField(max_digits=15, decimal_places=2)),
+                0,
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            ),
+        ).values_list(campo, 'n', 'stake', 'pago')
+        for clave, n, importe, payout in agregados:
+            if clave is None and ambito != 'MERCADO':
+                continue
+            fila = filas.setdefault(
+                (ambito, '' if clave is None else str(clave)),
+                ExposicionAbierta(ambito=ambito, clave='' if clave is None else str(clave)),
+            )
+            fila.num_operaciones += n
+            fila.importe_abierto += importe
+            fila.payout_potencial += payout
+    ExposicionAbierta.objects.bulk_create(filas.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0015_archivo_operaciones"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExposicionAbierta",
+            fields=[
+                ("id_exposicion", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "ambito",
+                    models.CharField(
+                        choices=[
+                            ("PERFIL", "Perfil"),
+                            ("CASA", "Casa"),
+                            ("AGENCIA", "Agencia"),
+                            ("MERCADO", "Mercado"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "clave",
+                    models.CharField(
+                        help_text="Id del perfil/casa/agencia o nombre del mercado",
+                        max_length=100,
+                    ),
+                ),
+                ("num_operaciones", models.IntegerField(default=0)),
+                (
+                    "importe_abierto",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "payout_potencial",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "limite_importe",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        help_text="Límite de stake abierto; si está vacío se usa el de ConfiguracionOperativa",
+                        max_digits=15,
+                        null=True,
+                    ),
+                ),
+                ("fecha_actualizacion", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Exposición Abierta",
+                "verbose_name_plural": "Exposiciones Abiertas",
+                "db_table": "exposicion_abierta",
+            },
+        ),
+        migrations.AddField(
+            model_name="configuracionoperativa",
+            name="limite_exposicion_agencia",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=15, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="configuracionoperativa",
+            name="limite_exposicion_casa",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=15, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="configuracionoperativa",
+            name="limite_exposicion_mercado",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=15, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="configuracionoperativa",
+            name="limite_exposicion_perfil",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=15, null=True
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="exposicionabierta",
+            constraint=models.UniqueConstraint(
+                fields=("ambito", "clave"), name="exposicion_ambito_clave_unico"
+            ),
+        ),
+        migrations.RunPython(abrir_exposicion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:25
+
+import apps.gestion_operativa.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0016_exposicion_abierta"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="perfiloperativo",
+            index=models.Index(fields=["ip_operativa"], name="perfiles_ip_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="perfiloperativo",
+            index=models.Index(
+                apps.gestion_operativa.models.SubredIP("ip_operativa"),
+                name="perfiles_subred_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gestion_operativa", "0017_perfiles_ip_subred"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agencia",
+            name="base_rake",
+            field=models.CharField(
+                choices=[("PNL", "P&L positivo"), ("VOLUMEN", "Volumen apostado")],
+                default="PNL",
+                help_text="Sobre qué se calcula el rake mensual (ver rake.py)",
+                max_length=10,
+            ),
+        ),
+        migrations.CreateModel(
+            name="LiquidacionRake",
+            fields=[
+                ("id_liquidacion", models.AutoField(primary_key=True, serialize=False)),
+                ("mes", models.DateField(help_text="Primer día del mes liquidado")),
+                (
+                    "secuencia",
+                    models.PositiveSmallIntegerField(
+                        default=1, help_text="1 = liquidación; 2 en adelante, ajustes"
+                    ),
+                ),
+                (
+                    "base",
+                    models.CharField(
+                        choices=[
+                            ("PNL", "P&L positivo"),
+                            ("VOLUMEN", "Volumen apostado"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "rake_porcentaje",
+                    models.DecimalField(decimal_places=2, max_digits=5),
+                ),
+                ("num_operaciones", models.IntegerField(default=0)),
+                (
+                    "volumen",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "pnl",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "rake",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                ("fecha_registro", models.DateTimeField(auto_now_add=True)),
+                (
+                    "agencia",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="liquidaciones_rake",
+                        to="gestion_operativa.agencia",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Liquidación de Rake",
+                "verbose_name_plural": "Liquidaciones de Rake",
+                "db_table": "liquidaciones_rake",
+                "indexes": [
+                    models.Index(fields=["mes"], name="liquidaciones_rake_mes_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="liquidacionrake",
+            constraint=models.UniqueConstraint(
+                fields=("agencia", "mes", "secuencia"), name="liquidacion_rake_unica"
+            ),
+        ),
+    ]
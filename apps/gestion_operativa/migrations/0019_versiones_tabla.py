@@ -0,0 +1,62 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+# Tablas servidas con GET condicional (modelos de los viewsets y sus dependientes)
+TABLAS = [
+    'distribuidoras_datos', 'casas_apuestas', 'ubicaciones', 'agencias', 'perfiles_operativos',
+    'operaciones', 'configuracion_operativa', 'transacciones_financieras', 'planificacion_rotacion',
+    'alertas_operativas', 'bitacora_mando', 'users',
+]
+
+FUNCION = """
+CREATE FUNCTION versiones_tabla_borrado() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO versiones_tabla (tabla, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (tabla) DO UPDATE SET version = versiones_tabla.version + 1;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Un disparo por sentencia, no por fila: un borrado masivo solo suma uno
+TRIGGERS = [
+    f'CREATE TRIGGER "{tabla}_version_borrado" AFTER DELETE OR TRUNCATE ON "{tabla}" '
+    f'FOR EACH STATEMENT EXECUTE FUNCTION versiones_tabla_borrado();'
+    for tabla in TABLAS
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0003_users_updated_at_idx"),
+        ("gestion_operativa", "0018_liquidaciones_rake"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionTabla",
+            fields=[
+                (
+                    "tabla",
+                    models.CharField(max_length=63, primary_key=True, serialize=False),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Versión de Tabla",
+                "verbose_name_plural": "Versiones de Tabla",
+                "db_table": "versiones_tabla",
+            },
+        ),
+        migrations.AlterField(
+            model_name="distribuidora",
+            name="fecha_actualizacion",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunSQL(
+            [FUNCION, *TRIGGERS],
+            [*(f'DROP TRIGGER "{tabla}_version_borrado" ON "{tabla}";' for tabla in TABLAS),
+             'DROP FUNCTION versiones_tabla_borrado();'],
+        ),
+    ]
@@ -1,6 +1,38 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import Case, Count, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, NullIf, Upper
 from django.conf import settings
-from .choices import DeportesChoices, TipoJugadorChoices, NivelCuentaChoices
+from django.utils import timezone
+from .choices import (
+    DeportesChoices, TipoJugadorChoices, NivelCuentaChoices, ConceptoCapitalChoices,
+    TipoTransaccionChoices, EstadoTransaccionChoices, AmbitoExposicionChoices, BaseRakeChoices
+)
+
+# Configuración de text search usada para la bitácora
+CONFIG_BUSQUEDA = 'spanish'
+
+
+def trigram_index(campo, name):
+    """
+    Índice GIN de trigramas sobre `UPPER(campo)`: es la expresión que genera
+    `icontains` en PostgreSQL, así `?search=` no recorre la tabla.
+    """
+    return GinIndex(OpClass(Upper(campo), name='gin_trgm_ops'), name=name)
+
+
+class SubredIP(models.Func):
+    """
+    Subred de una IP como `cidr` en texto: /24 si es IPv4 y /64 si es IPv6
+    (p. ej. `10.1.2.0/24`). Indexada en `perfiles_subred_idx`, ver vinculos.py.
+    """
+    template = (
+        'network(set_masklen(%(expressions)s, '
+        'CASE WHEN family(%(expressions)s) = 4 THEN 24 ELSE 64 END))'
+    )
+    output_field = models.CharField()
+
 
 class Distribuidora(models.Model):
     id_distribuidora = models.AutoField(primary_key=True)
@@ -9,12 +41,18 @@ class Distribuidora(models.Model):
     descripcion = models.TextField(blank=True, null=True)
     activo = models.BooleanField(default=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
-    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'distribuidoras_datos'
         verbose_name = 'Distribuidora'
         verbose_name_plural = 'Distribuidoras'
+        indexes = [
+            # Soporta `deportes__contains=[...]` (operador @>) sin recorrer la tabla
+            GinIndex(fields=['deportes'], name='distribuidoras_deportes_gin', opclasses=['jsonb_path_ops']),
+            models.Index(fields=['nombre', 'id_distribuidora'], name='distribuidoras_nombre_idx'),
+            trigram_index('nombre', 'distribuidoras_nombre_trgm'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -35,6 +73,11 @@ class CasaApuestas(models.Model):
         db_table = 'casas_apuestas'
         verbose_name = 'Casa de Apuestas'
         verbose_name_plural = 'Casas de Apuestas'
+        indexes = [
+            models.Index(fields=['nombre', 'id_casa'], name='casas_nombre_idx'),
+            models.Index(fields=['fecha_actualizacion_capital'], name='casas_fecha_capital_idx'),
+            trigram_index('nombre', 'casas_nombre_trgm'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -49,11 +92,15 @@ class Ubicacion(models.Model):
     link_google_maps = models.URLField(blank=True, null=True, help_text="Enlace exacto a Google Maps")
     
     # Campo activo eliminado pues "una ubicación siempre existe"
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'ubicaciones'
         verbose_name = 'Ubicación'
         verbose_name_plural = 'Ubicaciones'
+        indexes = [
+            models.Index(fields=['ciudad', 'id_ubicacion'], name='ubicaciones_ciudad_idx'),
+        ]
 
     def __str__(self):
         return f"{self.ciudad} - {self.direccion}"
@@ -72,20 +119,160 @@ class Agencia(models.Model):
     # Operatividad
     casa_madre = models.ForeignKey(CasaApuestas, on_delete=models.SET_NULL, null=True, related_name='agencias')
     rake_porcentaje = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="% Rake")
+    base_rake = models.CharField(
+        max_length=10, choices=BaseRakeChoices.choices, default=BaseRakeChoices.PNL,
+        help_text="Sobre qué se calcula el rake mensual (ver rake.py)"
+    )
     perfiles_minimos = models.IntegerField(default=5)
     url_backoffice = models.URLField(blank=True, null=True)
     
     activo = models.BooleanField(default=True)
     fecha_registro = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'agencias'
         verbose_name = 'Agencia'
         verbose_name_plural = 'Agencias'
+        indexes = [
+            models.Index(fields=['nombre', 'id_agencia'], name='agencias_nombre_idx'),
+            models.Index(fields=['fecha_registro'], name='agencias_fecha_registro_idx'),
+            trigram_index('nombre', 'agencias_nombre_trgm'),
+        ]
 
     def __str__(self):
         return self.nombre
 
+def _subquery_perfil(queryset, agregado, output_field):
+    """Subconsulta correlacionada que agrega filas relacionadas a un perfil."""
+    subquery = (
+        queryset.filter(perfil=OuterRef('pk'))
+        .order_by()
+        .values('perfil')
+        .annotate(valor=agregado)
+        .values('valor')
+    )
+    return Subquery(subquery, output_field=output_field)
+
+
+def saldo_transacciones():
+    """
+    Agregado del saldo de transacciones: depósitos en positivo, retiros en
+    negativo y solo las confirmadas, en un único SUM condicional. Filtrando
+    también `estado=CONFIRMADA` en el WHERE se resuelve con el índice
+    parcial `transacciones_saldo_idx`.
+    """
+    decimal = models.DecimalField(max_digits=15, decimal_places=2)
+    return Coalesce(
+        Sum(
+            Case(
+                When(tipo_transaccion=TipoTransaccionChoices.DEPOSITO, then=F('monto')),
+                When(tipo_transaccion=TipoTransaccionChoices.RETIRO, then=-F('monto')),
+                default=Value(0),
+                output_field=decimal,
+            ),
+            filter=Q(estado=EstadoTransaccionChoices.CONFIRMADA),
+        ),
+        Value(0),
+        output_field=decimal,
+    )
+
+
+def periodos_actuales():
+    """
+    Inicio de la semana y del mes en curso y del mes siguiente, como
+    datetimes (medianoche local). Filtrar con rangos sobre la fecha, y no
+    con `__date`/`__month`, permite el pruning de particiones.
+    """
+    hoy = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    inicio_semana = hoy - timezone.timedelta(days=hoy.weekday())
+    inicio_mes = hoy.replace(day=1)
+    fin_mes = (inicio_mes + timezone.timedelta(days=32)).replace(day=1)
+    return inicio_semana, inicio_mes, fin_mes
+
+
+class PerfilOperativoQuerySet(models.QuerySet):
+
+    def con_metricas(self):
+        """
+        Anota las métricas calculadas (saldo, stake y conteos de operaciones)
+        en la misma consulta del listado, evitando consultas por fila. Las
+        históricas (stake promedio y total de operaciones) suman también las
+        archivadas, leídas de `ResumenOperacionMensual`.
+        """
+        decimal = models.DecimalField(max_digits=15, decimal_places=2)
+        inicio_semana, inicio_mes, fin_mes = periodos_actuales()
+        operaciones = Operacion.objects.all()
+        transacciones = TransaccionFinanciera.objects.all()
+        resumenes = ResumenOperacionMensual.objects.all()
+
+        ops_historicas = (
+            Coalesce(_subquery_perfil(operaciones, Count('pk'), models.IntegerField()), Value(0))
+            + Coalesce(_subquery_perfil(resumenes, Sum('num_operaciones'), models.IntegerField()), Value(0))
+        )
+        importe_historico = (
+            Coalesce(_subquery_perfil(operaciones, Sum('importe'), decimal), Value(0), output_field=decimal)
+            + Coalesce(_subquery_perfil(resumenes, Sum('importe_total'), decimal), Value(0), output_field=decimal)
+        )
+
+        return self.annotate(
+            metrica_saldo=Coalesce(
+                _subquery_perfil(
+                    transacciones.filter(estado=EstadoTransaccionChoices.CONFIRMADA),
+                    saldo_transacciones(), decimal
+                ),
+                Value(0), output_field=decimal
+            ),
+            metrica_ops_semanales=Coalesce(
+                _subquery_perfil(
+                    operaciones.filter(fecha_registro__gte=inicio_semana),
+                    Count('pk'), models.IntegerField()
+                ),
+                Value(0)
+            ),
+            metrica_ops_mensuales=Coalesce(
+                _subquery_perfil(
+                    operaciones.filter(
+                        fecha_registro__gte=inicio_mes,
+                        fecha_registro__lt=fin_mes
+                    ),
+                    Count('pk'), models.IntegerField()
+                ),
+                Value(0)
+            ),
+            metrica_ops_historicas=ops_historicas,
+        ).annotate(
+            # NULL sin operaciones, como el AVG anterior
+            metrica_stake_promedio=ExpressionWrapper(
+                importe_historico / NullIf(F('metrica_ops_historicas'), Value(0)), output_field=decimal
+            ),
+        )
+
+    def con_disponibilidad(self):
+        """
+        Anota solo lo que necesita la selección de perfiles (`seleccion.py`):
+        saldo y operaciones de la semana en curso.
+        """
+        decimal = models.DecimalField(max_digits=15, decimal_places=2)
+        inicio_semana, _, _ = periodos_actuales()
+        return self.annotate(
+            metrica_saldo=Coalesce(
+                _subquery_perfil(
+                    TransaccionFinanciera.objects.filter(estado=EstadoTransaccionChoices.CONFIRMADA),
+                    saldo_transacciones(), decimal
+                ),
+                Value(0), output_field=decimal
+            ),
+            metrica_ops_semanales=Coalesce(
+                _subquery_perfil(
+                    Operacion.objects.filter(fecha_registro__gte=inicio_semana),
+                    Count('pk'), models.IntegerField()
+                ),
+                Value(0)
+            ),
+        )
+
+
 class PerfilOperativo(models.Model):
     id_perfil = models.AutoField(primary_key=True)
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='perfiles_operativos')
@@ -110,13 +297,25 @@ class PerfilOperativo(models.Model):
     # Ahora se calculan dinámicamente desde la tabla Operacion
     meta_ops_semanales = models.IntegerField(default=0)
     activo = models.BooleanField(default=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = PerfilOperativoQuerySet.as_manager()
 
     class Meta:
         db_table = 'perfiles_operativos'
         verbose_name = 'Perfil Operativo'
         verbose_name_plural = 'Perfiles Operativos'
+        indexes = [
+            models.Index(fields=['nombre_usuario', 'id_perfil'], name='perfiles_nombre_idx'),
+            trigram_index('nombre_usuario', 'perfiles_nombre_trgm'),
+            # Perfiles que comparten IP o subred (vinculos.py)
+            models.Index(fields=['ip_operativa'], name='perfiles_ip_idx'),
+            models.Index(SubredIP('ip_operativa'), name='perfiles_subred_idx'),
+        ]
 
     def __str__(self):
+        if self.casa_id is None:
+            return self.nombre_usuario
         return f"{self.nombre_usuario} - {self.casa.nombre}"
 
 class ConfiguracionOperativa(models.Model):
@@ -127,6 +326,12 @@ class ConfiguracionOperativa(models.Model):
     perfiles_en_descanso = models.IntegerField(default=0)
     umbral_saldo_critico = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     actualizar_meta_diariamente = models.BooleanField(default=False)
+    # Límites de stake abierto por ámbito (vacío = sin límite), ver exposicion.py
+    limite_exposicion_perfil = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    limite_exposicion_casa = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    limite_exposicion_agencia = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    limite_exposicion_mercado = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'configuracion_operativa'
@@ -145,16 +350,60 @@ class ConfiguracionOperativa(models.Model):
 class TransaccionFinanciera(models.Model):
     id_transaccion = models.AutoField(primary_key=True)
     perfil = models.ForeignKey(PerfilOperativo, on_delete=models.CASCADE, related_name='transacciones')
-    tipo_transaccion = models.CharField(max_length=50) # Consider adding choices for this too
+    tipo_transaccion = models.CharField(max_length=50, choices=TipoTransaccionChoices.choices)
     monto = models.DecimalField(max_digits=12, decimal_places=2)
     fecha_transaccion = models.DateTimeField()
     metodo_pago = models.CharField(max_length=100)
-    estado = models.CharField(max_length=50) # Consider adding choices for this
+    estado = models.CharField(max_length=50, choices=EstadoTransaccionChoices.choices, default=EstadoTransaccionChoices.PENDIENTE)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'transacciones_financieras'
         verbose_name = 'Transacción Financiera'
         verbose_name_plural = 'Transacciones Financieras'
+        indexes = [
+            models.Index(fields=['fecha_transaccion', 'id_transaccion'], name='transacciones_fecha_idx'),
+            models.Index(fields=['perfil', 'fecha_transaccion'], name='transacciones_perfil_idx'),
+            models.Index(fields=['tipo_transaccion', 'fecha_transaccion'], name='transacciones_tipo_idx'),
+            models.Index(fields=['estado', 'fecha_transaccion'], name='transacciones_estado_idx'),
+            # Cubre saldo_transacciones(): index-only scan por perfil
+            models.Index(
+                fields=['perfil'], include=['tipo_transaccion', 'monto'],
+                condition=Q(estado=EstadoTransaccionChoices.CONFIRMADA),
+                name='transacciones_saldo_idx',
+            ),
+        ]
+
+class MovimientoCapital(models.Model):
+    """
+    Libro de movimientos de capital de una casa. Los saldos de
+    `CasaApuestas` son la suma de sus movimientos: se aplican con
+    `capital.registrar_movimiento` y se recalculan con `conciliar_capital`.
+    """
+    id_movimiento = models.AutoField(primary_key=True)
+    casa = models.ForeignKey(CasaApuestas, on_delete=models.CASCADE, related_name='movimientos_capital')
+    concepto = models.CharField(max_length=20, choices=ConceptoCapitalChoices.choices)
+    monto_activo = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Variación de capital_activo_hoy")
+    monto_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Variación de capital_total")
+    # Sin FK en BD: transacciones_financieras está particionada (ver particiones.py)
+    transaccion = models.OneToOneField(
+        TransaccionFinanciera, on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False,
+        related_name='movimiento_capital', help_text="Transacción que origina el movimiento"
+    )
+    descripcion = models.CharField(max_length=255, blank=True)
+    usuario_registro = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    fecha_registro = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'movimientos_capital'
+        verbose_name = 'Movimiento de Capital'
+        verbose_name_plural = 'Movimientos de Capital'
+        indexes = [
+            models.Index(fields=['casa', 'fecha_registro'], name='movimientos_casa_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.casa_id} {self.concepto} {self.monto_activo}/{self.monto_total}"
 
 class PlanificacionRotacion(models.Model):
     id_planificacion = models.AutoField(primary_key=True)
@@ -163,11 +412,17 @@ class PlanificacionRotacion(models.Model):
     estado_dia = models.CharField(max_length=1, choices=[('A', 'Activo'), ('D', 'Descanso')])
     mes = models.IntegerField()
     anio = models.IntegerField()
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'planificacion_rotacion'
         verbose_name = 'Planificación Rotación'
         verbose_name_plural = 'Planificaciones de Rotación'
+        indexes = [
+            models.Index(fields=['fecha', 'id_planificacion'], name='planificacion_fecha_idx'),
+            models.Index(fields=['perfil', 'fecha'], name='planificacion_perfil_idx'),
+            models.Index(fields=['anio', 'mes'], name='planificacion_periodo_idx'),
+        ]
 
 class AlertaOperativa(models.Model):
     id_alerta = models.AutoField(primary_key=True)
@@ -177,11 +432,15 @@ class AlertaOperativa(models.Model):
     perfil_afectado = models.ForeignKey(PerfilOperativo, on_delete=models.CASCADE, null=True, blank=True)
     casa_afectada = models.ForeignKey(CasaApuestas, on_delete=models.CASCADE, null=True, blank=True)
     estado = models.CharField(max_length=50)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'alertas_operativas'
         verbose_name = 'Alerta Operativa'
         verbose_name_plural = 'Alertas Operativas'
+        indexes = [
+            models.Index(fields=['severidad', 'estado'], name='alertas_severidad_idx'),
+        ]
 
 class BitacoraMando(models.Model):
     id_bitacora = models.AutoField(primary_key=True)
@@ -189,16 +448,29 @@ class BitacoraMando(models.Model):
     fecha_registro = models.DateTimeField(auto_now_add=True)
     observacion = models.TextField()
     usuario_registro = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+    # tsvector almacenado; PostgreSQL lo recalcula en cada INSERT/UPDATE
+    observacion_busqueda = models.GeneratedField(
+        expression=SearchVector('observacion', config=CONFIG_BUSQUEDA),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = 'bitacora_mando'
         verbose_name = 'Bitácora de Mando'
         verbose_name_plural = 'Bitácoras de Mando'
+        indexes = [
+            models.Index(fields=['fecha_registro', 'id_bitacora'], name='bitacora_fecha_idx'),
+            models.Index(fields=['perfil', 'fecha_registro'], name='bitacora_perfil_idx'),
+            GinIndex(fields=['observacion_busqueda'], name='bitacora_busqueda_gin'),
+        ]
 
 class Operacion(models.Model):
     id_operacion = models.AutoField(primary_key=True)
     perfil = models.ForeignKey(PerfilOperativo, on_delete=models.CASCADE, related_name='operaciones_reales')
-    fecha_registro = models.DateTimeField(null=True, blank=True, help_text="Fecha y hora exacta de la operación")
+    # Clave de partición de `operaciones` (ver particiones.py)
+    fecha_registro = models.DateTimeField(default=timezone.now, help_text="Fecha y hora exacta de la operación")
     importe = models.DecimalField(max_digits=12, decimal_places=2, help_text="Stake o monto apostado")
     cuota = models.DecimalField(max_digits=6, decimal_places=2, help_text="Odds de la apuesta")
     estado = models.CharField(max_length=20, choices=[
@@ -212,12 +484,20 @@ class Operacion(models.Model):
     
     deporte = models.CharField(max_length=50, blank=True, null=True)
     mercado = models.CharField(max_length=100, blank=True, null=True, help_text="Ej: Ganador del partido, Over 2.5")
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'operaciones'
         verbose_name = 'Operación'
         verbose_name_plural = 'Operaciones'
         ordering = ['-fecha_registro']
+        indexes = [
+            models.Index(fields=['fecha_registro', 'id_operacion'], name='operaciones_fecha_idx'),
+            models.Index(fields=['perfil', 'fecha_registro'], name='operaciones_perfil_idx'),
+            models.Index(fields=['estado', 'fecha_registro'], name='operaciones_estado_idx'),
+            models.Index(fields=['deporte', 'fecha_registro'], name='operaciones_deporte_idx'),
+            models.Index(fields=['mercado', 'fecha_registro'], name='operaciones_mercado_idx'),
+        ]
 
     def __str__(self):
         return f"Op {self.id_operacion} - {self.perfil} - ${self.importe}"
@@ -227,3 +507,149 @@ class Operacion(models.Model):
         if self.payout is not None and self.importe:
             self.profit_loss = self.payout - self.importe
         super(Operacion, self).save(*args, **kwargs)
+
+
+class OperacionArchivada(models.Model):
+    """
+    Operación liquidada movida fuera de `operaciones` por `archivo.archivar_operaciones`.
+    Conserva el id y las columnas originales; solo se consulta bajo demanda
+    (`?incluir_archivo=true`).
+    """
+    id_operacion = models.IntegerField(primary_key=True)
+    perfil = models.ForeignKey(PerfilOperativo, on_delete=models.CASCADE, related_name='operaciones_archivadas')
+    fecha_registro = models.DateTimeField()
+    importe = models.DecimalField(max_digits=12, decimal_places=2)
+    cuota = models.DecimalField(max_digits=6, decimal_places=2)
+    estado = models.CharField(max_length=20, choices=Operacion._meta.get_field('estado').choices)
+    payout = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    profit_loss = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    deporte = models.CharField(max_length=50, blank=True, null=True)
+    mercado = models.CharField(max_length=100, blank=True, null=True)
+    fecha_actualizacion = models.DateTimeField()
+    fecha_archivo = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'operaciones_archivo'
+        verbose_name = 'Operación Archivada'
+        verbose_name_plural = 'Operaciones Archivadas'
+        indexes = [
+            models.Index(fields=['perfil', 'fecha_registro'], name='archivo_perfil_idx'),
+            models.Index(fields=['fecha_registro', 'id_operacion'], name='archivo_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"Op {self.id_operacion} (archivada)"
+
+
+class ResumenOperacionMensual(models.Model):
+    """
+    Totales mensuales de las operaciones archivadas, para que los agregados
+    sigan incluyéndolas sin leer el archivo fila a fila.
+    """
+    perfil = models.ForeignKey(PerfilOperativo, on_delete=models.CASCADE, related_name='resumenes_mensuales')
+    mes = models.DateField(help_text="Primer día del mes (UTC)")
+    deporte = models.CharField(max_length=50, blank=True, default='')
+    mercado = models.CharField(max_length=100, blank=True, default='')
+    estado = models.CharField(max_length=20, choices=Operacion._meta.get_field('estado').choices)
+    num_operaciones = models.IntegerField(default=0)
+    importe_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    payout_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    profit_loss_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'operaciones_resumen_mensual'
+        verbose_name = 'Resumen Mensual de Operaciones'
+        verbose_name_plural = 'Resúmenes Mensuales de Operaciones'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['perfil', 'mes', 'deporte', 'mercado', 'estado'], name='resumen_mensual_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['mes'], name='resumen_mes_idx'),
+        ]
+
+
+class ExposicionAbierta(models.Model):
+    """
+    Stake abierto (operaciones PENDIENTE) y payout potencial agregados por
+    perfil, casa, agencia y mercado. Lo mantiene `exposicion.py` con deltas
+    en la misma transacción que la operación y `conciliar_exposicion` lo
+    recalcula desde `operaciones`.
+    """
+    id_exposicion = models.AutoField(primary_key=True)
+    ambito = models.CharField(max_length=10, choices=AmbitoExposicionChoices.choices)
+    clave = models.CharField(max_length=100, help_text="Id del perfil/casa/agencia o nombre del mercado")
+    num_operaciones = models.IntegerField(default=0)
+    importe_abierto = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    payout_potencial = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    limite_importe = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True,
+        help_text="Límite de stake abierto; si está vacío se usa el de ConfiguracionOperativa"
+    )
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'exposicion_abierta'
+        verbose_name = 'Exposición Abierta'
+        verbose_name_plural = 'Exposiciones Abiertas'
+        constraints = [
+            models.UniqueConstraint(fields=['ambito', 'clave'], name='exposicion_ambito_clave_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.ambito} {self.clave}: {self.importe_abierto}"
+
+
+class LiquidacionRake(models.Model):
+    """
+    Libro de liquidaciones mensuales del rake de una agencia. Las filas no se
+    modifican: la primera (`secuencia` 1) liquida el mes y, si al repetir la
+    liquidación los totales cambiaron (operaciones liquidadas tarde), se añade
+    otra con la diferencia. Lo escribe `rake.liquidar_rake`.
+    """
+    id_liquidacion = models.AutoField(primary_key=True)
+    agencia = models.ForeignKey(Agencia, on_delete=models.PROTECT, related_name='liquidaciones_rake')
+    mes = models.DateField(help_text="Primer día del mes liquidado")
+    secuencia = models.PositiveSmallIntegerField(default=1, help_text="1 = liquidación; 2 en adelante, ajustes")
+    base = models.CharField(max_length=10, choices=BaseRakeChoices.choices)
+    rake_porcentaje = models.DecimalField(max_digits=5, decimal_places=2)
+    # Variaciones respecto a las filas anteriores del mes
+    num_operaciones = models.IntegerField(default=0)
+    volumen = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    pnl = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    rake = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    fecha_registro = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'liquidaciones_rake'
+        verbose_name = 'Liquidación de Rake'
+        verbose_name_plural = 'Liquidaciones de Rake'
+        constraints = [
+            models.UniqueConstraint(fields=['agencia', 'mes', 'secuencia'], name='liquidacion_rake_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['mes'], name='liquidaciones_rake_mes_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.agencia_id} {self.mes:%Y-%m} #{self.secuencia}: {self.rake}"
+
+
+class VersionTabla(models.Model):
+    """
+    Contador de sentencias DELETE/TRUNCATE por tabla, mantenido por triggers
+    de sentencia (migración 0019) y por `particiones.desacoplar_particion`.
+    El GET condicional lo combina con `MAX(fecha_actualizacion)`: un borrado
+    no mueve la fecha máxima, pero sí la versión.
+    """
+    tabla = models.CharField(max_length=63, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'versiones_tabla'
+        verbose_name = 'Versión de Tabla'
+        verbose_name_plural = 'Versiones de Tabla'
+
+    def __str__(self):
+        return f"{self.tabla}: {self.version}"
@@ -0,0 +1,26 @@
+"""
+Parser JSON basado en orjson.
+"""
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """Parsea cuerpos JSON con orjson (rechaza NaN/Infinity igual que DRF)."""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            contenido = stream.read() if stream is not None else b''
+            if codecs.lookup(encoding).name != 'utf-8':
+                contenido = contenido.decode(encoding)
+            return orjson.loads(contenido)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
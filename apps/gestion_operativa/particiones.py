@@ -0,0 +1,190 @@
+"""
+Particionado declarativo por mes de las tablas de histórico.
+
+`operaciones` y `transacciones_financieras` están particionadas por rango
+sobre su fecha (ver `TABLAS`). Cada mes vive en `<tabla>_pYYYYMM` y una
+partición DEFAULT, `<tabla>_pdefault`, recoge las filas que caen fuera de
+las particiones existentes; `crear_particion` las mueve a su mes cuando
+este se crea y `repartir_default` crea de una vez las particiones de los
+meses que hayan quedado en ella.
+
+PostgreSQL exige que la clave primaria incluya la clave de partición: en
+base de datos la PK es `(id, fecha)` aunque Django siga viendo solo el id,
+cuya unicidad garantiza la secuencia identity. Por el mismo motivo ninguna
+FK puede apuntar a estas tablas (`MovimientoCapital.transaccion` usa
+`db_constraint=False`).
+
+Para que una consulta descarte particiones (pruning) tiene que acotar la
+columna de partición con comparaciones directas (`__gte`, `__lt`,
+`__range`); `__date`, `__month` o cualquier función sobre la columna
+obligan a recorrer todas.
+"""
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+TABLAS = {
+    'operaciones': 'fecha_registro',
+    'transacciones_financieras': 'fecha_transaccion',
+}
+
+PATRON_PARTICION = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def inicio_mes(fecha):
+    return date(fecha.year, fecha.month, 1)
+
+
+def sumar_meses(mes, meses):
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def limite(mes):
+    """Medianoche UTC del primer día del mes: límite de rango de una partición."""
+    return datetime(mes.year, mes.month, 1, tzinfo=dt_timezone.utc)
+
+
+def nombre_particion(tabla, mes):
+    return f'{tabla}_p{mes:%Y%m}'
+
+
+def nombre_default(tabla):
+    return f'{tabla}_pdefault'
+
+
+def es_particionada(tabla):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [tabla]
+        )
+        fila = cursor.fetchone()
+    return bool(fila) and fila[0] == 'p'
+
+
+def listar_particiones(tabla):
+    """Meses con partición propia, en orden cronológico (sin la DEFAULT)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT hija.relname
+            FROM pg_inherits
+            JOIN pg_class hija ON hija.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [tabla],
+        )
+        nombres = [fila[0] for fila in cursor.fetchall()]
+    meses = []
+    for nombre in nombres:
+        coincidencia = PATRON_PARTICION.search(nombre)
+        if coincidencia:
+            meses.append(date(int(coincidencia[1]), int(coincidencia[2]), 1))
+    return sorted(meses)
+
+
+def crear_particion(tabla, mes):
+    """
+    Crea la partición de `mes` si no existe. Si la DEFAULT ya tiene filas de
+    ese mes, las mueve a la nueva partición antes de adjuntarla. Devuelve
+    el número de filas movidas, o None si la partición ya existía.
+    """
+    nombre = nombre_particion(tabla, mes)
+    columna = TABLAS[tabla]
+    desde, hasta = limite(mes), limite(sumar_meses(mes, 1))
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [nombre])
+        if cursor.fetchone()[0]:
+            return None
+        # El DDL sobre la tabla falla si quedan chequeos de FK diferidos
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            f"SELECT count(*) FROM {qn(nombre_default(tabla))} "
+            f"WHERE {qn(columna)} >= %s AND {qn(columna)} < %s",
+            [desde, hasta],
+        )
+        pendientes = cursor.fetchone()[0]
+        if not pendientes:
+            cursor.execute(
+                f"CREATE TABLE {qn(nombre)} PARTITION OF {qn(tabla)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [desde, hasta],
+            )
+            return 0
+
+        cursor.execute(
+            f"CREATE TABLE {qn(nombre)} (LIKE {qn(tabla)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH movidas AS ("
+            f"DELETE FROM {qn(nombre_default(tabla))} "
+            f"WHERE {qn(columna)} >= %s AND {qn(columna)} < %s RETURNING *"
+            f") INSERT INTO {qn(nombre)} SELECT * FROM movidas",
+            [desde, hasta],
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(tabla)} ATTACH PARTITION {qn(nombre)} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [desde, hasta],
+        )
+    return pendientes
+
+
+def repartir_default(tabla):
+    """
+    Da partición propia a los meses que tienen filas en la DEFAULT (cargas
+    tardías, históricos importados): desacopla la DEFAULT, crea las
+    particiones de esos meses, reinserta sus filas por la tabla padre (que
+    las enruta) y vuelve a adjuntarla, ya vacía. Todo en una transacción.
+    Devuelve `{mes: filas movidas}`.
+    """
+    columna = TABLAS[tabla]
+    default = nombre_default(tabla)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT date_trunc('month', {qn(columna)} AT TIME ZONE 'UTC')::date, count(*) "
+            f"FROM {qn(default)} GROUP BY 1 ORDER BY 1"
+        )
+        meses = dict(cursor.fetchall())
+        if not meses:
+            return {}
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"ALTER TABLE {qn(tabla)} DETACH PARTITION {qn(default)}")
+        for mes in meses:
+            cursor.execute(
+                f"CREATE TABLE {qn(nombre_particion(tabla, mes))} PARTITION OF {qn(tabla)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [limite(mes), limite(sumar_meses(mes, 1))],
+            )
+        cursor.execute(
+            f"WITH movidas AS (DELETE FROM {qn(default)} RETURNING *) "
+            f"INSERT INTO {qn(tabla)} OVERRIDING SYSTEM VALUE SELECT * FROM movidas"
+        )
+        cursor.execute(f"ALTER TABLE {qn(tabla)} ATTACH PARTITION {qn(default)} DEFAULT")
+    return meses
+
+
+def desacoplar_particion(tabla, mes, eliminar=False):
+    """
+    Saca la partición de `mes` de la tabla: queda como tabla independiente
+    (fuera de todas las consultas) o se elimina si `eliminar`.
+    """
+    nombre = nombre_particion(tabla, mes)
+    qn = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"ALTER TABLE {qn(tabla)} DETACH PARTITION {qn(nombre)}")
+        # DETACH no dispara el trigger de borrado, pero las filas salen de la tabla
+        cursor.execute(
+            "INSERT INTO versiones_tabla (tabla, version) VALUES (%s, 1) "
+            "ON CONFLICT (tabla) DO UPDATE SET version = versiones_tabla.version + 1",
+            [tabla],
+        )
+        if eliminar:
+            cursor.execute(f"DROP TABLE {qn(nombre)}")
+    return nombre
@@ -0,0 +1,134 @@
+"""
+Liquidación mensual del rake de las agencias.
+
+Una consulta agrupada por agencia sobre `operaciones` y otra igual sobre el
+archivo (`operaciones_archivo`, que conserva `fecha_registro`) suman, para
+las operaciones liquidadas del mes (en hora local) de los perfiles de cada
+agencia: número de operaciones, volumen (stake de las GANADA/PERDIDA) y P&L.
+Archivar un mes ya liquidado no cambia sus totales.
+El rake es `rake_porcentaje` % del P&L si es positivo (base PNL) o del
+volumen (base VOLUMEN), según `Agencia.base_rake`.
+
+Las liquidaciones son un libro inmutable (`LiquidacionRake`), como el de
+capital: repetir la liquidación de un mes solo añade, por agencia, una fila
+con la diferencia entre los totales actuales y lo ya liquidado; si nada
+cambió no escribe nada. Los ajustes usan la base y el porcentaje de la
+primera liquidación del mes. Las agencias afectadas se bloquean con
+`select_for_update`, así que dos liquidaciones simultáneas del mismo mes no
+duplican filas.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .choices import BaseRakeChoices
+from .models import Agencia, LiquidacionRake, Operacion, OperacionArchivada
+
+CERO = Decimal('0.00')
+LIQUIDADAS = ['GANADA', 'PERDIDA', 'ANULADA']
+TOTALES = ['num_operaciones', 'volumen', 'pnl', 'rake']
+
+
+@dataclass
+class Totales:
+    num_operaciones: int = 0
+    volumen: Decimal = CERO
+    pnl: Decimal = CERO
+    rake: Decimal = CERO
+
+
+def periodo(mes):
+    """Inicio y fin (exclusivo) del mes como datetimes locales."""
+    siguiente = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+    return (
+        timezone.make_aware(datetime.combine(mes.replace(day=1), time.min)),
+        timezone.make_aware(datetime.combine(siguiente, time.min)),
+    )
+
+
+def calcular_rake(base, porcentaje, volumen, pnl):
+    importe = volumen if base == BaseRakeChoices.VOLUMEN else max(pnl, CERO)
+    return (importe * porcentaje / 100).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def totales_por_agencia(mes):
+    """{agencia: (num_operaciones, volumen, pnl)} del mes, vivas y archivadas."""
+    inicio, fin = periodo(mes)
+    totales = {}
+    for modelo in (Operacion, OperacionArchivada):
+        filas = modelo.objects.filter(
+            fecha_registro__gte=inicio, fecha_registro__lt=fin, estado__in=LIQUIDADAS,
+        ).order_by().values('perfil__agencia_id').annotate(
+            num_operaciones=Count('pk'),
+            volumen=Sum('importe', filter=~Q(estado='ANULADA'), default=CERO),
+            pnl=Sum('profit_loss', default=CERO),
+        ).values_list('perfil__agencia_id', 'num_operaciones', 'volumen', 'pnl')
+        for agencia, num_operaciones, volumen, pnl in filas:
+            previo = totales.get(agencia, (0, CERO, CERO))
+            totales[agencia] = (previo[0] + num_operaciones, previo[1] + volumen, previo[2] + pnl)
+    return totales
+
+
+def liquidar_rake(mes, aplicar=True):
+    """
+    Liquida (o ajusta) el rake del mes para todas las agencias y devuelve las
+    filas nuevas; con `aplicar=False` las calcula sin guardarlas.
+    """
+    mes = mes.replace(day=1)
+    actuales = totales_por_agencia(mes)
+    with transaction.atomic():
+        liquidadas = LiquidacionRake.objects.filter(mes=mes)
+        ids = sorted(set(actuales) | set(liquidadas.values_list('agencia_id', flat=True)))
+        # Bloqueo en orden de id: las liquidaciones concurrentes se esperan sin interbloquearse
+        agencias = {
+            pk: (base, porcentaje) for pk, base, porcentaje in Agencia.objects.select_for_update().filter(
+                pk__in=ids
+            ).order_by('pk').values_list('pk', 'base_rake', 'rake_porcentaje')
+        }
+        previas, condiciones, secuencias = {}, {}, {}
+        for fila in liquidadas.order_by('agencia_id', 'secuencia'):
+            acumulado = previas.setdefault(fila.agencia_id, Totales())
+            for campo in TOTALES:
+                setattr(acumulado, campo, getattr(acumulado, campo) + getattr(fila, campo))
+            condiciones.setdefault(fila.agencia_id, (fila.base, fila.rake_porcentaje))
+            secuencias[fila.agencia_id] = fila.secuencia
+
+        nuevas = []
+        for agencia in ids:
+            num_operaciones, volumen, pnl = actuales.get(agencia, (0, CERO, CERO))
+            base, porcentaje = condiciones.get(agencia, agencias[agencia])
+            rake = calcular_rake(base, porcentaje, volumen, pnl)
+            previo = previas.get(agencia, Totales())
+            diferencia = Totales(
+                num_operaciones - previo.num_operaciones, volumen - previo.volumen,
+                pnl - previo.pnl, rake - previo.rake,
+            )
+            if diferencia == Totales():
+                continue
+            nuevas.append(LiquidacionRake(
+                agencia_id=agencia, mes=mes, secuencia=secuencias.get(agencia, 0) + 1,
+                base=base, rake_porcentaje=porcentaje, **vars(diferencia),
+            ))
+        if aplicar:
+            LiquidacionRake.objects.bulk_create(nuevas)
+    return nuevas
+
+
+def estado_de_cuenta(agencia, desde=None, hasta=None):
+    """Liquidaciones de la agencia agrupadas por mes, del más reciente al más antiguo."""
+    filas = agencia.liquidaciones_rake.order_by('-mes', 'secuencia')
+    if desde:
+        filas = filas.filter(mes__gte=desde)
+    if hasta:
+        filas = filas.filter(mes__lte=hasta)
+    meses = {}
+    for fila in filas:
+        mes = meses.setdefault(fila.mes, {'mes': fila.mes, **vars(Totales()), 'lineas': []})
+        for campo in TOTALES:
+            mes[campo] += getattr(fila, campo)
+        mes['lineas'].append(fila)
+    return list(meses.values())
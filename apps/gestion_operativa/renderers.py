@@ -0,0 +1,117 @@
+"""
+Renderers JSON basados en orjson.
+
+`ORJSONRenderer` es el renderer por defecto de la API. Los `Decimal` (importe,
+cuota, payout, ...) llegan sin convertir desde los serializers
+(`COERCE_DECIMAL_TO_STRING = False`) y se codifican aquí en un solo paso,
+igual que los `datetime`.
+
+Codificación de decimales:
+- Por defecto según `settings.JSON_DECIMAL_ENCODING` (`'str'` o `'float'`).
+- Por petición con el parámetro de media type `decimals`:
+  `Accept: application/json; decimals=float`.
+
+`StdJSONRenderer` mantiene el camino de la librería estándar con la misma
+salida, seleccionable con `?format=stdjson`.
+"""
+from decimal import Decimal
+
+import orjson
+from django.conf import settings
+from rest_framework.compat import (
+    INDENT_SEPARATORS, LONG_SEPARATORS, SHORT_SEPARATORS, parse_header_parameters
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders, json
+
+DECIMAL_STR = 'str'
+DECIMAL_FLOAT = 'float'
+
+
+def codificacion_decimal(accepted_media_type=None):
+    """Resuelve la codificación de decimales para una petición."""
+    if accepted_media_type:
+        _, params = parse_header_parameters(accepted_media_type)
+        if params.get('decimals') in (DECIMAL_STR, DECIMAL_FLOAT):
+            return params['decimals']
+    return getattr(settings, 'JSON_DECIMAL_ENCODING', DECIMAL_STR)
+
+
+class DecimalJSONEncoder(encoders.JSONEncoder):
+    """Encoder de DRF que codifica `Decimal` como string (igual que DRF)."""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return format(obj, 'f')
+        return super().default(obj)
+
+
+class FloatDecimalJSONEncoder(encoders.JSONEncoder):
+    """Encoder de DRF que codifica `Decimal` como float."""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super().default(obj)
+
+
+_drf_default = encoders.JSONEncoder().default
+
+
+def _default_str(obj):
+    if isinstance(obj, Decimal):
+        return format(obj, 'f')
+    return _drf_default(obj)
+
+
+def _default_float(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _drf_default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Renderer JSON rápido con soporte de Decimal y datetime."""
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+
+        if codificacion_decimal(accepted_media_type) == DECIMAL_FLOAT:
+            default = _default_float
+        else:
+            default = _default_str
+        return orjson.dumps(data, default=default, option=options)
+
+
+class StdJSONRenderer(JSONRenderer):
+    """Renderer de la librería estándar con la misma salida que `ORJSONRenderer`."""
+    format = 'stdjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # El encoder depende de la petición: va en una variable local, nunca en la instancia
+        if codificacion_decimal(accepted_media_type) == DECIMAL_FLOAT:
+            encoder = FloatDecimalJSONEncoder
+        else:
+            encoder = DecimalJSONEncoder
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is None:
+            separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        else:
+            separators = INDENT_SEPARATORS
+
+        ret = json.dumps(
+            data, cls=encoder, indent=indent, ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict, separators=separators,
+        )
+        # Igual que JSONRenderer: U+2028/U+2029 escapados para que sea JavaScript válido
+        return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
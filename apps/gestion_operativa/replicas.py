@@ -0,0 +1,102 @@
+"""
+Enrutado de lecturas a réplicas.
+
+`ReplicaLecturaMixin` decide, por petición, de qué base de datos leen los
+ViewSets de gestión operativa y deja la decisión en una ContextVar que
+consulta `ReplicaRouter`:
+
+- GET/HEAD/OPTIONS van a una réplica de `settings.DATABASE_REPLICAS`
+  (elegida al azar y fija durante toda la petición).
+- Las escrituras y todo lo que ocurra dentro de un bloque atómico del
+  primario se quedan en `default`.
+- Tras una escritura con éxito, el usuario queda fijado al primario durante
+  `REPLICA_VENTANA_PRIMARIO` segundos (read-your-writes). La marca vive en
+  la caché, así que con varios procesos debe ser una caché compartida.
+
+La decisión se expone en la cabecera `X-DB-Lectura` y en el logger
+`apps.gestion_operativa.replicas`.
+"""
+import logging
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+CABECERA = 'X-DB-Lectura'
+
+# Alias de la réplica de la petición en curso; None = primario
+_replica_actual = ContextVar('replica_actual', default=None)
+
+
+def _clave_primario(usuario):
+    return f'replicas:primario:{usuario.pk}'
+
+
+def fijar_primario(usuario):
+    """Fija al usuario al primario durante la ventana de read-your-writes."""
+    if settings.DATABASE_REPLICAS and usuario.is_authenticated:
+        cache.set(_clave_primario(usuario), True, timeout=settings.REPLICA_VENTANA_PRIMARIO)
+
+
+def decidir_lectura(request):
+    """Devuelve `(alias, motivo)` para las lecturas de la petición."""
+    if not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS, 'sin_replicas'
+    if request.method not in SAFE_METHODS:
+        return DEFAULT_DB_ALIAS, 'escritura'
+    if request.user.is_authenticated and cache.get(_clave_primario(request.user)):
+        return DEFAULT_DB_ALIAS, 'lectura_tras_escritura'
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS, 'transaccion'
+    return random.choice(settings.DATABASE_REPLICAS), 'replica'
+
+
+class ReplicaRouter:
+    """Router de Django: lecturas según la petición en curso, escrituras al primario."""
+
+    def db_for_read(self, model, **hints):
+        alias = _replica_actual.get()
+        # Dentro de una transacción del primario se lee lo propio
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sin esto Django escribiría en la BD de la que se leyó la instancia
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaLecturaMixin:
+    """Aplica `decidir_lectura` a las peticiones del ViewSet."""
+
+    def initial(self, request, *args, **kwargs):
+        # Tras autenticar: la ventana de read-your-writes es por usuario
+        super().initial(request, *args, **kwargs)
+        self.lectura = decidir_lectura(request)
+        alias = self.lectura[0]
+        self._token_replica = _replica_actual.set(None if alias == DEFAULT_DB_ALIAS else alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if hasattr(self, '_token_replica'):
+            _replica_actual.reset(self._token_replica)
+            del self._token_replica
+            alias, motivo = self.lectura
+            response[CABECERA] = f'{alias}; motivo={motivo}'
+            logger.debug('%s %s → %s (%s)', request.method, request.path, alias, motivo)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            fijar_primario(request.user)
+        return response
@@ -0,0 +1,210 @@
+"""
+Selección de perfiles para una nueva apuesta.
+
+`indice` guarda en memoria del proceso los perfiles candidatos agrupados por
+`(deporte_dna, casa)`, con su cupo semanal restante (`meta_ops_semanales`
+menos las operaciones de la semana) y su saldo. `seleccionar` responde sin
+recorrer tablas: toma los grupos pedidos, descarta y ordena.
+
+Un perfil es elegible si está activo, su casa está activa y con capital
+(`capital_activo_hoy > 0`), no descansa hoy según `PlanificacionRotacion`
+(sin planificación para hoy cuenta como disponible), le queda cupo semanal y,
+si se indica importe, su saldo lo cubre. Los elegibles se ordenan por cupo
+restante y después por saldo, para repartir la carga.
+
+Frescura del índice:
+
+- Como mucho cada `INTERVALO_SONDEO` segundos se buscan, por sus fechas de
+  actualización indexadas, las filas escritas desde el sondeo anterior
+  (operaciones de la semana, planificación de hoy, transacciones, perfiles y
+  capital de casas) y se recalculan solo los perfiles y casas afectados. Así
+  se ven también las escrituras de otros procesos. Cada sondeo repasa los
+  últimos `MARGEN_SONDEO` para recoger transacciones que confirmaron tarde
+  (o réplicas con retraso).
+- Al cambiar de día, y cada `INTERVALO_RECARGA` segundos, se recarga entero:
+  recoge los borrados y los UPDATE que no tocan la fecha de actualización.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import (
+    CasaApuestas, Operacion, PerfilOperativo, PlanificacionRotacion,
+    TransaccionFinanciera, periodos_actuales
+)
+
+INTERVALO_SONDEO = 1
+INTERVALO_RECARGA = 300
+MARGEN_SONDEO = timedelta(seconds=5)
+
+DESCANSO = 'D'
+
+
+@dataclass
+class Candidato:
+    id_perfil: int
+    nombre_usuario: str
+    casa: int
+    deporte: str
+    meta_ops_semanales: int
+    ops_semanales: int
+    saldo: Decimal
+    descansa: bool = False
+
+    @property
+    def cupo_semanal(self):
+        return self.meta_ops_semanales - self.ops_semanales
+
+
+@dataclass
+class Casa:
+    nombre: str
+    capital_activo_hoy: Decimal
+    activo: bool
+
+    @property
+    def operable(self):
+        return self.activo and self.capital_activo_hoy > 0
+
+
+class IndiceSeleccion:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vaciar()
+
+    def _vaciar(self):
+        self.perfiles = {}
+        # deporte -> casa -> ids de perfil
+        self.grupos = defaultdict(lambda: defaultdict(set))
+        self.casas = {}
+        self.dia = None
+        self.cargado = None
+        self.sondeado = None
+        self.marca = None
+
+    def invalidar(self):
+        """Fuerza una recarga completa en la próxima selección."""
+        with self._lock:
+            self._vaciar()
+
+    def seleccionar(self, deporte, casa=None, importe=None, limite=10):
+        """Lista ordenada de hasta `limite` perfiles elegibles para la apuesta."""
+        with self._lock:
+            self._actualizar()
+            grupos = self.grupos.get(deporte, {})
+            casas = [casa] if casa is not None else list(grupos)
+
+            candidatos = []
+            for casa_id in casas:
+                datos_casa = self.casas.get(casa_id)
+                if datos_casa is None or not datos_casa.operable:
+                    continue
+                for id_perfil in grupos.get(casa_id, ()):
+                    candidato = self.perfiles[id_perfil]
+                    if candidato.descansa or candidato.cupo_semanal <= 0:
+                        continue
+                    if importe is not None and candidato.saldo < importe:
+                        continue
+                    candidatos.append(candidato)
+
+            elegidos = heapq.nlargest(
+                limite, candidatos,
+                key=lambda c: (c.cupo_semanal, c.saldo, -c.id_perfil),
+            )
+            return [self._representar(candidato) for candidato in elegidos]
+
+    def _representar(self, candidato):
+        return {
+            'id_perfil': candidato.id_perfil,
+            'nombre_usuario': candidato.nombre_usuario,
+            'casa': candidato.casa,
+            'casa_nombre': self.casas[candidato.casa].nombre,
+            'deporte': candidato.deporte,
+            'meta_ops_semanales': candidato.meta_ops_semanales,
+            'ops_semanales': candidato.ops_semanales,
+            'cupo_semanal': candidato.cupo_semanal,
+            'saldo': candidato.saldo,
+        }
+
+    def _actualizar(self):
+        ahora = time.monotonic()
+        if (self.cargado is None or self.dia != timezone.localdate()
+                or ahora - self.cargado >= INTERVALO_RECARGA):
+            self._cargar()
+        elif ahora - self.sondeado >= INTERVALO_SONDEO:
+            self._sondear()
+
+    def _cargar(self):
+        marca = timezone.now()
+        self._vaciar()
+        self.dia = timezone.localdate()
+        self._cargar_casas(CasaApuestas.objects.all())
+        self._cargar_perfiles(PerfilOperativo.objects.all())
+        self.marca = marca
+        self.cargado = self.sondeado = time.monotonic()
+
+    def _sondear(self):
+        marca = timezone.now()
+        desde = self.marca - MARGEN_SONDEO
+        inicio_semana, _, _ = periodos_actuales()
+
+        perfiles = set(
+            Operacion.objects.filter(
+                fecha_registro__gte=inicio_semana, fecha_actualizacion__gte=desde
+            ).order_by().values_list('perfil_id', flat=True).union(
+                PlanificacionRotacion.objects.filter(
+                    fecha=self.dia, fecha_actualizacion__gte=desde
+                ).values_list('perfil_id', flat=True),
+                TransaccionFinanciera.objects.filter(
+                    fecha_actualizacion__gte=desde
+                ).values_list('perfil_id', flat=True),
+                PerfilOperativo.objects.filter(
+                    fecha_actualizacion__gte=desde
+                ).values_list('id_perfil', flat=True),
+            )
+        )
+        self._cargar_casas(CasaApuestas.objects.filter(fecha_actualizacion_capital__gte=desde))
+        if perfiles:
+            self._cargar_perfiles(PerfilOperativo.objects.filter(pk__in=perfiles), perfiles)
+        self.marca = marca
+        self.sondeado = time.monotonic()
+
+    def _cargar_casas(self, queryset):
+        for id_casa, nombre, capital, activo in queryset.values_list(
+            'id_casa', 'nombre', 'capital_activo_hoy', 'activo'
+        ):
+            self.casas[id_casa] = Casa(nombre, capital, activo)
+
+    def _cargar_perfiles(self, queryset, ids=()):
+        """(Re)carga los perfiles del queryset; los de `ids` que ya no son candidatos salen."""
+        for id_perfil in ids:
+            self._quitar(id_perfil)
+
+        planificacion = PlanificacionRotacion.objects.filter(fecha=self.dia, estado_dia=DESCANSO)
+        if ids:
+            planificacion = planificacion.filter(perfil__in=ids)
+        descansan = set(planificacion.values_list('perfil_id', flat=True))
+
+        filas = queryset.filter(activo=True, casa__isnull=False).con_disponibilidad().values_list(
+            'id_perfil', 'nombre_usuario', 'casa_id', 'deporte_dna', 'meta_ops_semanales',
+            'metrica_ops_semanales', 'metrica_saldo',
+        )
+        for fila in filas:
+            candidato = Candidato(*fila, descansa=fila[0] in descansan)
+            self.perfiles[candidato.id_perfil] = candidato
+            self.grupos[candidato.deporte][candidato.casa].add(candidato.id_perfil)
+
+    def _quitar(self, id_perfil):
+        candidato = self.perfiles.pop(id_perfil, None)
+        if candidato is not None:
+            self.grupos[candidato.deporte][candidato.casa].discard(id_perfil)
+
+
+indice = IndiceSeleccion()
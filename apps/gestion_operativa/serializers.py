@@ -1,11 +1,34 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from django.db.models import Avg, Sum, Count
-from django.utils import timezone
+from django.db.models import Count, Sum
+from .choices import DeportesChoices, EstadoTransaccionChoices
 from .models import (
     Distribuidora, CasaApuestas, Ubicacion, Agencia, PerfilOperativo,
     ConfiguracionOperativa, TransaccionFinanciera, PlanificacionRotacion,
-    AlertaOperativa, BitacoraMando, Operacion
+    AlertaOperativa, BitacoraMando, Operacion, MovimientoCapital, ExposicionAbierta, LiquidacionRake,
+    saldo_transacciones, periodos_actuales
 )
+from .calibracion import AGRUPACIONES
+from .jerarquia import NIVELES as NIVELES_ARBOL
+from .simulacion import ELEMENTOS_POR_LOTE, FIJO, MIN_OPERACIONES, POLITICAS
+
+
+# ============================================================================
+# CAMPOS
+# ============================================================================
+
+class OpcionesMultiplesField(serializers.MultipleChoiceField):
+    """
+    `MultipleChoiceField` para query params: con un QueryDict DRF lee
+    `getlist()` y un parámetro ausente llega como `[]`, así que nunca se
+    aplicaría `default`. Aquí ausente significa no enviado.
+    """
+
+    def get_value(self, dictionary):
+        if self.field_name not in dictionary:
+            return serializers.empty
+        return super().get_value(dictionary)
 
 
 # ============================================================================
@@ -39,6 +62,29 @@ class CasaApuestasSerializer(serializers.ModelSerializer):
     class Meta:
         model = CasaApuestas
         fields = '__all__'
+        # Los saldos solo cambian a través del libro de movimientos
+        read_only_fields = ['capital_activo_hoy', 'capital_total', 'fecha_actualizacion_capital']
+
+
+class MovimientoCapitalSerializer(serializers.ModelSerializer):
+    """Movimiento del libro de capital de una casa."""
+    usuario_registro_username = serializers.ReadOnlyField(source='usuario_registro.username')
+
+    class Meta:
+        model = MovimientoCapital
+        fields = '__all__'
+        read_only_fields = ['casa', 'usuario_registro', 'fecha_registro']
+
+    def validate(self, attrs):
+        if not attrs.get('monto_activo') and not attrs.get('monto_total'):
+            raise serializers.ValidationError('El movimiento debe variar algún saldo.')
+        transaccion = attrs.get('transaccion')
+        casa = self.context.get('casa')
+        if transaccion and casa and transaccion.perfil.casa_id != casa.pk:
+            raise serializers.ValidationError(
+                {'transaccion': 'La transacción pertenece a un perfil de otra casa.'}
+            )
+        return attrs
 
 
 # ============================================================================
@@ -53,8 +99,19 @@ class DistribuidoraSerializer(serializers.ModelSerializer):
         model = Distribuidora
         fields = '__all__'
     
+    def validate_deportes(self, value):
+        """Exige una lista de valores de DeportesChoices, sin duplicados."""
+        if not isinstance(value, list):
+            raise serializers.ValidationError('Debe ser una lista de deportes.')
+        invalidos = [deporte for deporte in value if deporte not in DeportesChoices.values]
+        if invalidos:
+            raise serializers.ValidationError(f'Deportes no válidos: {invalidos}')
+        return list(dict.fromkeys(value))
+    
     def get_casas_count(self, obj):
         """Retorna cantidad de casas sin cargar todas."""
+        if hasattr(obj, 'num_casas'):
+            return obj.num_casas
         return obj.casas.count()
 
 
@@ -80,6 +137,25 @@ class AgenciaSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class LiquidacionRakeSerializer(serializers.ModelSerializer):
+    """Línea del libro de liquidaciones de rake (liquidación o ajuste)."""
+
+    class Meta:
+        model = LiquidacionRake
+        exclude = ['agencia']
+
+
+class EstadoCuentaRakeSerializer(serializers.Serializer):
+    """Parámetros de `agencias/{id}/liquidaciones/` (`AAAA-MM`)."""
+    desde = serializers.DateField(input_formats=['%Y-%m'], required=False)
+    hasta = serializers.DateField(input_formats=['%Y-%m'], required=False)
+
+    def validate(self, attrs):
+        if attrs.get('desde') and attrs.get('hasta') and attrs['desde'] > attrs['hasta']:
+            raise serializers.ValidationError({'hasta': 'Debe ser igual o posterior a desde.'})
+        return attrs
+
+
 # ============================================================================
 # OPERACIONES SERIALIZERS
 # ============================================================================
@@ -93,6 +169,23 @@ class OperacionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ExposicionAbiertaSerializer(serializers.ModelSerializer):
+    """Exposición de un ámbito con el límite que se le aplica."""
+    limite = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExposicionAbierta
+        fields = [
+            'ambito', 'clave', 'num_operaciones', 'importe_abierto', 'payout_potencial',
+            'limite_importe', 'limite', 'fecha_actualizacion',
+        ]
+
+    def get_limite(self, obj):
+        if obj.limite_importe is not None:
+            return obj.limite_importe
+        return self.context['limites_generales'][obj.ambito]
+
+
 # ============================================================================
 # PERFILES OPERATIVOS SERIALIZERS
 # ============================================================================
@@ -116,37 +209,116 @@ class PerfilOperativoSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_saldo_real(self, obj):
-        """Calcula saldo desde TransaccionFinanciera."""
-        depositos = obj.transacciones.filter(
-            tipo_transaccion__icontains='deposito'
-        ).aggregate(total=Sum('monto'))['total'] or 0
-        retiros = obj.transacciones.filter(
-            tipo_transaccion__icontains='retiro'
-        ).aggregate(total=Sum('monto'))['total'] or 0
-        return float(depositos - retiros)
+        """Saldo de transacciones confirmadas (depósitos - retiros)."""
+        if hasattr(obj, 'metrica_saldo'):
+            return float(obj.metrica_saldo)
+        confirmadas = obj.transacciones.filter(estado=EstadoTransaccionChoices.CONFIRMADA)
+        return float(confirmadas.aggregate(saldo=saldo_transacciones())['saldo'])
     
+    def _historico(self, obj):
+        """(operaciones, importe) de Operacion más los resúmenes del archivo."""
+        vivas = obj.operaciones_reales.aggregate(num=Count('pk'), importe=Sum('importe', default=0))
+        archivadas = obj.resumenes_mensuales.aggregate(
+            num=Sum('num_operaciones', default=0), importe=Sum('importe_total', default=0)
+        )
+        return vivas['num'] + archivadas['num'], vivas['importe'] + archivadas['importe']
+
     def get_stake_promedio(self, obj):
-        """Calcula stake promedio desde Operacion."""
-        avg = obj.operaciones_reales.aggregate(promedio=Avg('importe'))['promedio']
+        """Stake promedio de las operaciones, incluidas las archivadas."""
+        if hasattr(obj, 'metrica_stake_promedio'):
+            avg = obj.metrica_stake_promedio
+        else:
+            num, importe = self._historico(obj)
+            avg = importe / num if num else None
         return float(avg) if avg else 0.0
     
     def get_ops_semanales(self, obj):
         """Cuenta operaciones de la semana actual."""
-        hoy = timezone.now().date()
-        inicio_semana = hoy - timezone.timedelta(days=hoy.weekday())
-        return obj.operaciones_reales.filter(fecha_registro__date__gte=inicio_semana).count()
+        if hasattr(obj, 'metrica_ops_semanales'):
+            return obj.metrica_ops_semanales
+        inicio_semana, _, _ = periodos_actuales()
+        return obj.operaciones_reales.filter(fecha_registro__gte=inicio_semana).count()
     
     def get_ops_mensuales(self, obj):
         """Cuenta operaciones del mes actual."""
-        hoy = timezone.now()
+        if hasattr(obj, 'metrica_ops_mensuales'):
+            return obj.metrica_ops_mensuales
+        _, inicio_mes, fin_mes = periodos_actuales()
         return obj.operaciones_reales.filter(
-            fecha_registro__year=hoy.year,
-            fecha_registro__month=hoy.month
+            fecha_registro__gte=inicio_mes,
+            fecha_registro__lt=fin_mes
         ).count()
     
     def get_ops_historicas(self, obj):
-        """Cuenta total de operaciones."""
-        return obj.operaciones_reales.count()
+        """Cuenta total de operaciones, incluidas las archivadas."""
+        if hasattr(obj, 'metrica_ops_historicas'):
+            return obj.metrica_ops_historicas
+        return self._historico(obj)[0]
+
+
+
+class SeleccionPerfilSerializer(serializers.Serializer):
+    """Parámetros de `perfiles-operativos/seleccion/`."""
+    deporte = serializers.ChoiceField(choices=DeportesChoices.choices)
+    casa = serializers.IntegerField(required=False)
+    importe = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+    limite = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def to_internal_value(self, data):
+        data = data.copy()
+        if 'deporte' in data:
+            data['deporte'] = data['deporte'].upper()
+        return super().to_internal_value(data)
+
+
+class SimulacionBankrollSerializer(serializers.Serializer):
+    """Parámetros de `perfiles-operativos/simulacion/`."""
+    politica = serializers.ChoiceField(choices=POLITICAS, default=FIJO)
+    fraccion = serializers.FloatField(min_value=0.0001, max_value=1, default=0.02)
+    trayectorias = serializers.IntegerField(min_value=100, max_value=10_000, default=1000)
+    apuestas = serializers.IntegerField(min_value=1, max_value=1000, default=100)
+    historial = serializers.IntegerField(min_value=MIN_OPERACIONES, max_value=5000, default=500)
+    bankroll = serializers.DecimalField(max_digits=15, decimal_places=2, min_value=Decimal('0.01'), required=False)
+    semilla = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        # Un perfil por lote como mínimo: su array de trayectorias × apuestas debe caber en un lote
+        if attrs['trayectorias'] * attrs['apuestas'] > ELEMENTOS_POR_LOTE:
+            raise serializers.ValidationError(
+                f'trayectorias × apuestas no puede superar {ELEMENTOS_POR_LOTE}.'
+            )
+        return attrs
+
+
+class CalibracionSerializer(serializers.Serializer):
+    """Parámetros de `operaciones/calibracion/`."""
+    agrupar = OpcionesMultiplesField(choices=AGRUPACIONES, default=AGRUPACIONES)
+    deporte = serializers.CharField(max_length=50, required=False)
+    mercado = serializers.CharField(max_length=100, required=False)
+    fecha_desde = serializers.DateTimeField(required=False)
+    fecha_hasta = serializers.DateTimeField(required=False)
+
+    def validate_agrupar(self, value):
+        # Orden fijo: la clave de caché y las columnas no dependen del orden pedido
+        return tuple(campo for campo in AGRUPACIONES if campo in value)
+
+    def validate_deporte(self, value):
+        return value.upper()
+
+    def validate(self, attrs):
+        desde, hasta = attrs.pop('fecha_desde', None), attrs.pop('fecha_hasta', None)
+        if desde and hasta and desde >= hasta:
+            raise serializers.ValidationError({'fecha_hasta': 'Debe ser posterior a fecha_desde.'})
+        return {**attrs, 'desde': desde, 'hasta': hasta}
+
+
+class ArbolSerializer(serializers.Serializer):
+    """Parámetros de `distribuidoras/arbol/`."""
+    niveles = OpcionesMultiplesField(choices=NIVELES_ARBOL, default=NIVELES_ARBOL, allow_empty=False)
+    activo = serializers.BooleanField(allow_null=True, required=False, default=None)
+
+    def validate_niveles(self, value):
+        return tuple(nivel for nivel in NIVELES_ARBOL if nivel in value)
 
 
 # ============================================================================
@@ -205,4 +377,10 @@ class BitacoraMandoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = BitacoraMando
-        fields = '__all__'
+        exclude = ['observacion_busqueda']
+
+
+class BitacoraBusquedaSerializer(BitacoraMandoSerializer):
+    """Resultado de búsqueda full-text: relevancia y fragmento resaltado."""
+    relevancia = serializers.FloatField(read_only=True)
+    fragmento = serializers.CharField(read_only=True)
@@ -0,0 +1,197 @@
+"""
+Simulación Monte Carlo del bankroll de los perfiles.
+
+Para cada perfil se cargan sus últimas `historial` operaciones liquidadas
+como dos vectores de NumPy: el stake (`importe`) y el rendimiento por unidad
+apostada (`cuota - 1` si GANADA, `-1` si PERDIDA, `0` si ANULADA). Cada
+trayectoria remuestrea con reposición `apuestas` operaciones de ese historial
+y las aplica al bankroll inicial según la política de stake:
+
+- `historico`: cada apuesta conserva su importe original.
+- `fijo`: stake constante de `fraccion * bankroll inicial`.
+- `proporcional`: stake de `fraccion * bankroll actual` (interés compuesto).
+
+Una trayectoria se arruina cuando el bankroll toca
+`ConfiguracionOperativa.umbral_saldo_critico`; desde ahí deja de apostar.
+Por perfil se devuelve el riesgo de ruina, los percentiles del drawdown
+máximo y del bankroll final y el crecimiento esperado.
+
+Todos los perfiles comparten un único array plano de operaciones (con el
+desplazamiento y el tamaño de cada historial), así que el remuestreo y la
+evolución de miles de trayectorias son operaciones vectorizadas por lotes
+de perfiles, acotados a `ELEMENTOS_POR_LOTE` valores en memoria.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When, Window
+from django.db.models.functions import Cast, RowNumber
+
+from .choices import EstadoTransaccionChoices
+from .models import ConfiguracionOperativa, Operacion, TransaccionFinanciera, saldo_transacciones
+
+HISTORICO = 'historico'
+FIJO = 'fijo'
+PROPORCIONAL = 'proporcional'
+POLITICAS = [HISTORICO, FIJO, PROPORCIONAL]
+
+LIQUIDADAS = ['GANADA', 'PERDIDA', 'ANULADA']
+MIN_OPERACIONES = 10
+# Tamaño máximo (perfiles × trayectorias × apuestas) de cada lote
+ELEMENTOS_POR_LOTE = 2_000_000
+
+
+def rendimiento_por_unidad():
+    """Resultado de una operación liquidada por unidad apostada (float)."""
+    flotante = FloatField()
+    return Case(
+        When(estado='GANADA', then=Cast(F('cuota') - 1, flotante)),
+        When(estado='PERDIDA', then=Value(-1.0)),
+        default=Value(0.0),
+        output_field=flotante,
+    )
+
+
+def cargar_historial(perfiles, historial):
+    """
+    Últimas `historial` operaciones liquidadas de cada perfil, ordenadas por
+    perfil: (ids, stakes, rendimientos) como arrays de NumPy.
+    """
+    queryset = Operacion.objects.filter(perfil__in=perfiles, estado__in=LIQUIDADAS).annotate(
+        orden=Window(
+            RowNumber(), partition_by=F('perfil_id'),
+            order_by=[F('fecha_registro').desc(), F('id_operacion').desc()],
+        ),
+        stake=Cast('importe', FloatField()),
+        rendimiento=rendimiento_por_unidad(),
+    ).filter(orden__lte=historial).order_by('perfil_id').values_list('perfil_id', 'stake', 'rendimiento')
+
+    filas = matriz(queryset)
+    return filas[:, 0].astype(np.int64), filas[:, 1], filas[:, 2]
+
+
+def matriz(queryset):
+    """
+    Filas de un `values_list` numérico como array float64, con las columnas
+    en el orden pedido. Sin instanciar filas de Django: las tuplas del cursor
+    van directas a NumPy.
+    """
+    query = queryset.query
+    # El SQL pone los campos antes que las anotaciones (como ValuesListIterable)
+    nombres = [*query.extra_select, *query.values_select, *query.annotation_select]
+    sql, params = query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        filas = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, len(nombres))
+    return filas[:, [nombres.index(campo) for campo in queryset._fields]]
+
+
+def saldos(perfiles):
+    """Saldo actual (transacciones confirmadas) de cada perfil: {id: Decimal}."""
+    return dict(
+        TransaccionFinanciera.objects.filter(
+            perfil__in=perfiles, estado=EstadoTransaccionChoices.CONFIRMADA
+        ).order_by().values('perfil_id').annotate(saldo=saldo_transacciones()).values_list('perfil_id', 'saldo')
+    )
+
+
+def umbral_ruina():
+    configuracion = ConfiguracionOperativa.objects.first()
+    return configuracion.umbral_saldo_critico if configuracion else Decimal('0')
+
+
+def simular_bankroll(perfiles, politica=FIJO, fraccion=0.02, trayectorias=1000, apuestas=100,
+                     historial=500, bankroll=None, semilla=None):
+    """
+    Simula los perfiles indicados (ids) y devuelve una lista de dicts en el
+    mismo orden. `bankroll` sustituye al saldo actual de cada perfil como
+    bankroll inicial. Los perfiles sin historial suficiente o con un bankroll
+    que no supera el umbral de ruina salen con `motivo` y sin métricas.
+    """
+    perfiles = list(perfiles)
+    umbral = float(umbral_ruina())
+    ids, stakes, rendimientos = cargar_historial(perfiles, historial)
+    presentes, inicios, tamanos = np.unique(ids, return_index=True, return_counts=True)
+    historiales = {int(p): (int(i), int(n)) for p, i, n in zip(presentes, inicios, tamanos)}
+    iniciales = {} if bankroll is not None else saldos(perfiles)
+
+    resultados, simulables = {}, []
+    for perfil in perfiles:
+        inicial = float(bankroll if bankroll is not None else iniciales.get(perfil, 0))
+        inicio, n = historiales.get(perfil, (0, 0))
+        fila = {'perfil': perfil, 'operaciones': n, 'bankroll_inicial': round(inicial, 2)}
+        if n < MIN_OPERACIONES:
+            fila['motivo'] = f'Menos de {MIN_OPERACIONES} operaciones liquidadas'
+        elif inicial <= umbral:
+            fila['motivo'] = 'El bankroll inicial no supera el umbral de ruina'
+        else:
+            simulables.append((perfil, inicio, n, inicial))
+        resultados[perfil] = fila
+
+    rng = np.random.default_rng(semilla)
+    por_lote = max(1, ELEMENTOS_POR_LOTE // (trayectorias * apuestas))
+    for desde in range(0, len(simulables), por_lote):
+        lote = simulables[desde:desde + por_lote]
+        metricas = _simular_lote(
+            stakes, rendimientos,
+            np.array([inicio for _, inicio, _, _ in lote]),
+            np.array([n for _, _, n, _ in lote]),
+            np.array([inicial for _, _, _, inicial in lote]),
+            umbral, politica, fraccion, trayectorias, apuestas, rng,
+        )
+        for i, (perfil, _, _, _) in enumerate(lote):
+            resultados[perfil].update({clave: valores[i] for clave, valores in metricas.items()})
+    return [resultados[perfil] for perfil in perfiles]
+
+
+def _simular_lote(stakes, rendimientos, inicios, tamanos, iniciales, umbral, politica, fraccion,
+                  trayectorias, apuestas, rng):
+    forma = (len(inicios), trayectorias, apuestas)
+    inicial = iniciales[:, None, None]
+    # Remuestreo con reposición dentro del historial de cada perfil
+    # (producto en float64: en float32 `azar * n` puede redondear a n)
+    indices = (rng.random(forma, dtype=np.float32) * tamanos[:, None, None]).astype(np.int64)
+    indices += inicios[:, None, None]
+
+    # Operaciones in situ: cada array intermedio cuesta un recorrido de memoria
+    caminos = rendimientos[indices]
+    if politica == PROPORCIONAL:
+        caminos *= fraccion
+        np.log1p(caminos, out=caminos)
+        np.cumsum(caminos, axis=-1, out=caminos)
+        np.exp(caminos, out=caminos)
+        caminos *= inicial
+    else:
+        caminos *= stakes[indices] if politica == HISTORICO else fraccion * inicial
+        np.cumsum(caminos, axis=-1, out=caminos)
+        caminos += inicial
+
+    # Tras la ruina el bankroll se congela en el valor con el que cayó
+    bajo_umbral = caminos <= umbral
+    arruinadas = bajo_umbral.any(axis=-1)
+    if arruinadas.any():
+        ruina = bajo_umbral.argmax(axis=-1)[..., None]
+        tras_ruina = arruinadas[..., None] & (np.arange(apuestas) > ruina)
+        np.copyto(caminos, np.take_along_axis(caminos, ruina, axis=-1), where=tras_ruina)
+
+    finales = caminos[..., -1].copy()
+    crecimiento = finales / iniciales[:, None] - 1
+    picos = np.maximum.accumulate(caminos, axis=-1)
+    np.maximum(picos, inicial, out=picos)
+    caminos /= picos
+    drawdown = np.clip(1 - caminos.min(axis=-1), 0, 1)
+
+    drawdown_p = np.percentile(drawdown, [50, 95, 99], axis=1).round(4)
+    final_p = np.percentile(finales, [5, 50, 95], axis=1).round(2)
+    return {
+        'riesgo_ruina': arruinadas.mean(axis=1).round(4).tolist(),
+        'drawdown_p50': drawdown_p[0].tolist(),
+        'drawdown_p95': drawdown_p[1].tolist(),
+        'drawdown_p99': drawdown_p[2].tolist(),
+        'bankroll_final_p5': final_p[0].tolist(),
+        'bankroll_final_p50': final_p[1].tolist(),
+        'bankroll_final_p95': final_p[2].tolist(),
+        'crecimiento_esperado': crecimiento.mean(axis=1).round(4).tolist(),
+        'crecimiento_mediano': np.median(crecimiento, axis=1).round(4).tolist(),
+    }
@@ -0,0 +1,165 @@
+"""
+Factoría masiva de datos para tests.
+
+Crea todos los niveles de la jerarquía (distribuidora → casa → agencia →
+perfil → operaciones/transacciones/...) con `bulk_create`, de modo que sembrar
+cientos de filas cueste unas pocas consultas.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.gestion_operativa.choices import (
+    DeportesChoices, TipoJugadorChoices, NivelCuentaChoices, ConceptoCapitalChoices,
+    TipoTransaccionChoices, EstadoTransaccionChoices
+)
+from apps.gestion_operativa.models import (
+    Distribuidora, CasaApuestas, Ubicacion, Agencia, PerfilOperativo,
+    ConfiguracionOperativa, TransaccionFinanciera, PlanificacionRotacion,
+    AlertaOperativa, BitacoraMando, Operacion, MovimientoCapital
+)
+
+User = get_user_model()
+
+
+def _round_robin(padres, indice):
+    return padres[indice % len(padres)]
+
+
+class DatasetFactory:
+    """
+    Siembra lotes de `n` filas por modelo.
+
+    Los hijos de cada lote se reparten entre *todos* los padres sembrados
+    hasta el momento, así que sucesivas llamadas también hacen crecer las
+    relaciones de los objetos ya existentes.
+    """
+
+    def __init__(self):
+        self.secuencia = 0
+        self.distribuidoras = []
+        self.casas = []
+        self.ubicaciones = []
+        self.agencias = []
+        self.usuarios = []
+        self.perfiles = []
+
+    def sembrar(self, n):
+        inicio = self.secuencia
+        self.secuencia += n
+        rango = range(inicio, inicio + n)
+        ahora = timezone.now()
+        deportes = DeportesChoices.values
+
+        self.distribuidoras += Distribuidora.objects.bulk_create([
+            Distribuidora(nombre=f'Distribuidora {i}', deportes=deportes[:1 + i % 3])
+            for i in rango
+        ])
+        casas = CasaApuestas.objects.bulk_create([
+            CasaApuestas(
+                distribuidora=_round_robin(self.distribuidoras, i),
+                nombre=f'Casa {i}',
+                capital_activo_hoy=Decimal('1000.00'),
+                capital_total=Decimal('5000.00'),
+            )
+            for i in rango
+        ])
+        self.casas += casas
+        MovimientoCapital.objects.bulk_create([
+            MovimientoCapital(
+                casa=casa,
+                concepto=ConceptoCapitalChoices.APERTURA,
+                monto_activo=casa.capital_activo_hoy,
+                monto_total=casa.capital_total,
+            )
+            for casa in casas
+        ])
+        self.ubicaciones += Ubicacion.objects.bulk_create([
+            Ubicacion(provincia_estado='Lima', ciudad=f'Ciudad {i}', direccion=f'Calle {i}')
+            for i in rango
+        ])
+        self.agencias += Agencia.objects.bulk_create([
+            Agencia(
+                nombre=f'Agencia {i}',
+                ubicacion=_round_robin(self.ubicaciones, i),
+                responsable=f'Responsable {i}',
+                casa_madre=_round_robin(self.casas, i),
+            )
+            for i in rango
+        ])
+        self.usuarios += User.objects.bulk_create([
+            User(username=f'operador{i}', email=f'operador{i}@example.com', password='!')
+            for i in rango
+        ])
+        self.perfiles += PerfilOperativo.objects.bulk_create([
+            PerfilOperativo(
+                usuario=self.usuarios[i],
+                casa=_round_robin(self.casas, i),
+                agencia=_round_robin(self.agencias, i),
+                nombre_usuario=f'perfil{i}',
+                tipo_jugador=TipoJugadorChoices.values[i % len(TipoJugadorChoices.values)],
+                deporte_dna=deportes[i % len(deportes)],
+                ip_operativa=f'10.0.{i // 250}.{i % 250 + 1}',
+                nivel_cuenta=NivelCuentaChoices.values[i % len(NivelCuentaChoices.values)],
+                meta_ops_semanales=10,
+            )
+            for i in rango
+        ])
+
+        Operacion.objects.bulk_create([
+            Operacion(
+                perfil=_round_robin(self.perfiles, i),
+                fecha_registro=ahora,
+                importe=Decimal('10.00'),
+                cuota=Decimal('1.90'),
+                estado='GANADA',
+                payout=Decimal('19.00'),
+                profit_loss=Decimal('9.00'),
+                deporte=deportes[i % len(deportes)],
+                mercado='Ganador del partido',
+            )
+            for i in rango
+        ])
+        TransaccionFinanciera.objects.bulk_create([
+            TransaccionFinanciera(
+                perfil=_round_robin(self.perfiles, i),
+                tipo_transaccion=TipoTransaccionChoices.DEPOSITO if i % 2 == 0 else TipoTransaccionChoices.RETIRO,
+                monto=Decimal('100.00'),
+                fecha_transaccion=ahora,
+                metodo_pago='Transferencia',
+                estado=EstadoTransaccionChoices.CONFIRMADA,
+            )
+            for i in rango
+        ])
+        PlanificacionRotacion.objects.bulk_create([
+            PlanificacionRotacion(
+                perfil=_round_robin(self.perfiles, i),
+                fecha=ahora.date(),
+                estado_dia='A' if i % 2 == 0 else 'D',
+                mes=ahora.month,
+                anio=ahora.year,
+            )
+            for i in rango
+        ])
+        AlertaOperativa.objects.bulk_create([
+            AlertaOperativa(
+                tipo_alerta='SALDO_BAJO',
+                descripcion=f'Alerta {i}',
+                severidad='ALTA',
+                perfil_afectado=_round_robin(self.perfiles, i),
+                casa_afectada=_round_robin(self.casas, i),
+                estado='ABIERTA',
+            )
+            for i in rango
+        ])
+        BitacoraMando.objects.bulk_create([
+            BitacoraMando(
+                perfil=_round_robin(self.perfiles, i),
+                observacion=f'Observación {i}',
+                usuario_registro=_round_robin(self.usuarios, i),
+            )
+            for i in rango
+        ])
+        if not ConfiguracionOperativa.objects.exists():
+            ConfiguracionOperativa.objects.create()
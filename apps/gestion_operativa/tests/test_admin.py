@@ -0,0 +1,137 @@
+from decimal import ROUND_HALF_UP, Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.authentication.models import User
+from apps.gestion_operativa import admin as gestion_admin
+from apps.gestion_operativa.admin import OperacionAdmin
+from apps.gestion_operativa.models import Operacion, PerfilOperativo, TransaccionFinanciera
+
+from .factories import DatasetFactory
+
+
+class ListadosAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = DatasetFactory()
+        cls.dataset.sembrar(3)
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        cls.suelto = PerfilOperativo.objects.order_by('pk').last()
+        PerfilOperativo.objects.filter(pk=cls.suelto.pk).update(casa=None)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _consultas(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta, len(contexto.captured_queries)
+
+    def test_perfil_sin_casa(self):
+        self.assertEqual(str(PerfilOperativo.objects.get(pk=self.suelto.pk)), self.suelto.nombre_usuario)
+
+    def test_consultas_constantes_al_crecer(self):
+        for nombre in ('perfiloperativo', 'transaccionfinanciera'):
+            url = reverse(f'admin:gestion_operativa_{nombre}_changelist')
+            _, antes = self._consultas(url)
+            self.dataset.sembrar(4)
+            respuesta, despues = self._consultas(url)
+            self.assertEqual(antes, despues, nombre)
+            self.assertContains(respuesta, self.suelto.nombre_usuario)
+
+    def test_formulario_con_todos_los_campos(self):
+        transaccion = TransaccionFinanciera.objects.first()
+        respuesta = self.client.get(
+            reverse('admin:gestion_operativa_transaccionfinanciera_change', args=[transaccion.pk])
+        )
+        self.assertContains(respuesta, transaccion.metodo_pago)
+
+    def test_conteo_estimado_en_tablas_grandes(self):
+        url = reverse('admin:gestion_operativa_transaccionfinanciera_changelist')
+        with mock.patch.object(gestion_admin, 'UMBRAL_CONTEO_EXACTO', 0):
+            with CaptureQueriesContext(connection) as contexto:
+                respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        consultas = [consulta['sql'] for consulta in contexto.captured_queries]
+        self.assertFalse([sql for sql in consultas if 'COUNT(*)' in sql])
+        self.assertTrue([sql for sql in consultas if sql.startswith('EXPLAIN')])
+
+
+class OperacionAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(4)
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        # Empates de fecha para que el keyset tenga que desempatar por pk
+        Operacion.objects.filter(pk__in=Operacion.objects.order_by('pk').values('pk')[:4]).update(
+            fecha_registro=timezone.now()
+        )
+        cls.url = reverse('admin:gestion_operativa_operacion_changelist')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _pagina(self, url):
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        cl = respuesta.context['cl']
+        return [operacion.pk for operacion in cl.result_list], cl.siguiente
+
+    def test_recorre_todas_las_paginas_sin_repetir(self):
+        esperado = list(
+            Operacion.objects.order_by('-fecha_registro', '-id_operacion').values_list('pk', flat=True)
+        )
+        vistos, url = [], self.url
+        with mock.patch.object(OperacionAdmin, 'list_per_page', 3):
+            while url:
+                ids, siguiente = self._pagina(url)
+                vistos += ids
+                url = siguiente and self.url + siguiente
+        self.assertEqual(vistos, esperado)
+
+    def test_cursor_invalido(self):
+        respuesta = self.client.get(self.url, {'tras': 'no-es-un-cursor'})
+        self.assertRedirects(respuesta, f'{self.url}?e=1', fetch_redirect_response=False)
+
+    def test_filtros_y_jerarquia(self):
+        operacion = Operacion.objects.order_by('pk').first()
+        ids, _ = self._pagina(
+            f'{self.url}?estado__exact={operacion.estado}&deporte={operacion.deporte}'
+            f'&fecha_registro__year={operacion.fecha_registro.year}'
+        )
+        self.assertIn(operacion.pk, ids)
+
+    def test_liquidacion_en_un_update(self):
+        pendientes = list(Operacion.objects.order_by('pk')[:3])
+        Operacion.objects.filter(pk__in=[o.pk for o in pendientes]).update(
+            estado='PENDIENTE', payout=None, profit_loss=None
+        )
+        ganada = Operacion.objects.exclude(pk__in=[o.pk for o in pendientes]).filter(estado='GANADA').first()
+
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.post(self.url, {
+                'action': 'liquidar_ganadas',
+                '_selected_action': [o.pk for o in pendientes] + [ganada.pk],
+            })
+        self.assertEqual(len([c for c in contexto.captured_queries if c['sql'].startswith('UPDATE')]), 1)
+
+        for operacion in pendientes:
+            liquidada = Operacion.objects.get(pk=operacion.pk)
+            self.assertEqual(liquidada.estado, 'GANADA')
+            self.assertEqual(liquidada.payout, (operacion.importe * operacion.cuota).quantize(Decimal('0.01'), ROUND_HALF_UP))
+            self.assertEqual(liquidada.profit_loss, liquidada.payout - operacion.importe)
+            self.assertGreater(liquidada.fecha_actualizacion, operacion.fecha_actualizacion)
+        # Las ya liquidadas no se tocan
+        self.assertEqual(Operacion.objects.get(pk=ganada.pk).fecha_actualizacion, ganada.fecha_actualizacion)
+
+    def test_ubicaciones(self):
+        respuesta = self.client.get(reverse('admin:gestion_operativa_ubicacion_changelist'), {'q': 'a'})
+        self.assertEqual(respuesta.status_code, 200)
@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentication.models import User
+from apps.gestion_operativa.anomalias import (
+    MERCADO_INUSUAL, PICO_STAKE, RAFAGA_OPERACIONES, detectar_anomalias
+)
+from apps.gestion_operativa.models import (
+    Agencia, AlertaOperativa, CasaApuestas, Distribuidora, Operacion, PerfilOperativo, Ubicacion
+)
+
+
+class AnomaliasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        cls.casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        usuario = User.objects.create_user(username='anomalias', email='anomalias@example.com', password='x')
+        cls.pico, cls.rafaga, cls.mercado, cls.normal = [
+            PerfilOperativo.objects.create(
+                usuario=usuario, casa=cls.casa, agencia=agencia, nombre_usuario=nombre, tipo_jugador='PROFESIONAL',
+                deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE', meta_ops_semanales=meta,
+            )
+            for nombre, meta in [('pico', 0), ('rafaga', 7), ('mercado', 35), ('normal', 35)]
+        ]
+
+        cls.dia = timezone.localdate() - timedelta(days=1)
+        mediodia = timezone.make_aware(datetime.combine(cls.dia, time(12)))
+
+        def operacion(perfil, importe, dias_antes=0, deporte='FUTBOL'):
+            return Operacion(perfil=perfil, importe=Decimal(importe), cuota=Decimal('2.00'), deporte=deporte,
+                             fecha_registro=mediodia - timedelta(days=dias_antes))
+
+        operaciones = []
+        # Línea base de 20 operaciones a 90/110 (media 100, desviación 10)
+        for perfil in (cls.pico, cls.mercado, cls.normal):
+            operaciones += [operacion(perfil, 90 + 20 * (i % 2), dias_antes=1 + i) for i in range(20)]
+        operaciones += [
+            operacion(cls.pico, 200),
+            *(operacion(cls.rafaga, 50) for _ in range(6)),
+            *(operacion(cls.mercado, 100, deporte='TENNIS') for _ in range(5)),
+            *(operacion(cls.normal, 110) for _ in range(3)),
+            # Fuera de la ventana base: no cuenta
+            operacion(cls.rafaga, 50, dias_antes=40),
+        ]
+        Operacion.objects.bulk_create(operaciones)
+
+    def test_detecta_y_no_repite_alertas_abiertas(self):
+        alertas = detectar_anomalias(self.dia)
+        self.assertEqual(
+            sorted((a.perfil_afectado_id, a.tipo_alerta, a.severidad) for a in alertas),
+            sorted([
+                (self.pico.pk, PICO_STAKE, 'ALTA'),
+                (self.rafaga.pk, RAFAGA_OPERACIONES, 'ALTA'),
+                (self.mercado.pk, MERCADO_INUSUAL, 'ALTA'),
+            ]),
+        )
+        pico = AlertaOperativa.objects.get(tipo_alerta=PICO_STAKE)
+        self.assertEqual((pico.estado, pico.casa_afectada_id), ('ABIERTA', self.casa.pk))
+        self.assertIn('10.0 desviaciones', pico.descripcion)
+
+        self.assertEqual(detectar_anomalias(self.dia), [])
+        AlertaOperativa.objects.filter(tipo_alerta=PICO_STAKE).update(estado='CERRADA')
+        self.assertEqual([a.tipo_alerta for a in detectar_anomalias(self.dia)], [PICO_STAKE])
+
+    def test_comando_dry_run(self):
+        salida = StringIO()
+        call_command('detectar_anomalias', '--fecha', self.dia.isoformat(), '--dry-run', '--z-stake', '20', stdout=salida)
+        self.assertIn('2 alertas detectadas', salida.getvalue())
+        self.assertFalse(AlertaOperativa.objects.exists())
+        # Un día sin operaciones no detecta nada
+        self.assertEqual(detectar_anomalias(self.dia - timedelta(days=60)), [])
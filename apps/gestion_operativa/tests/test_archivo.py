@@ -0,0 +1,89 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.archivo import archivar_operaciones
+from apps.gestion_operativa.models import (
+    Operacion, OperacionArchivada, PerfilOperativo, ResumenOperacionMensual
+)
+from apps.gestion_operativa.serializers import PerfilOperativoSerializer
+
+from .factories import DatasetFactory
+
+CORTE = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class ArchivoOperacionesTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(12)
+        ids = list(Operacion.objects.order_by('pk').values_list('pk', flat=True))
+        # Ocho operaciones antiguas en dos meses; una sigue pendiente
+        for indice, pk in enumerate(ids[:8]):
+            Operacion.objects.filter(pk=pk).update(
+                fecha_registro=datetime(2019, 5 + indice % 2, 10 + indice, tzinfo=dt_timezone.utc),
+                estado='PERDIDA' if indice % 3 else 'GANADA',
+            )
+        Operacion.objects.filter(pk=ids[0]).update(estado='PENDIENTE')
+        cls.usuario = User.objects.create_user(username='archivo', email='archivo@example.com', password='x')
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def _listado(self, **params):
+        respuesta = self.client.get(reverse('operacion-list'), {'page_size': 100, **params})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def _resumen(self, **params):
+        respuesta = self.client.get(reverse('operacion-resumen'), params)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()
+
+    def test_archiva_solo_liquidadas_anteriores_al_corte(self):
+        resultado = archivar_operaciones(CORTE, lote=3)
+        self.assertEqual(resultado.operaciones, 7)
+        self.assertEqual(resultado.lotes, 3)
+        self.assertEqual(OperacionArchivada.objects.count(), 7)
+        self.assertFalse(Operacion.objects.filter(fecha_registro__lt=CORTE).exclude(estado='PENDIENTE').exists())
+        self.assertEqual(archivar_operaciones(CORTE).operaciones, 0)
+
+    def test_listado_con_archivo_es_identico_al_original(self):
+        original = self._listado()
+        archivar_operaciones(CORTE)
+        self.assertEqual(self._listado()['count'], original['count'] - 7)
+        self.assertEqual(self._listado(incluir_archivo='true'), original)
+
+        filtrado = self._listado(estado='GANADA', fecha_hasta=CORTE.isoformat(), incluir_archivo='1')
+        self.assertTrue(filtrado['results'])
+        self.assertTrue(all(fila['estado'] == 'GANADA' for fila in filtrado['results']))
+
+    def test_resumen_incluye_el_rollup(self):
+        original = self._resumen()
+        archivar_operaciones(CORTE)
+        self.assertTrue(ResumenOperacionMensual.objects.exists())
+        self.assertEqual(self._resumen(incluir_archivo='true'), original)
+        self.assertEqual(
+            sum(fila['num_operaciones'] for fila in self._resumen()),
+            sum(fila['num_operaciones'] for fila in original) - 7,
+        )
+        mayo = self._resumen(incluir_archivo='true', fecha_hasta='2019-06-01T00:00:00Z')
+        self.assertEqual([fila['mes'] for fila in mayo], ['2019-05-01'])
+
+    def test_metricas_historicas_de_perfiles_incluyen_archivo(self):
+        def metricas():
+            respuesta = self.client.get(reverse('perfiloperativo-list'), {'page_size': 100})
+            self.assertEqual(respuesta.status_code, 200, respuesta.content)
+            return {p['id_perfil']: (p['ops_historicas'], p['stake_promedio']) for p in respuesta.json()['results']}
+
+        original = metricas()
+        archivar_operaciones(CORTE)
+        self.assertEqual(metricas(), original)
+        self.assertEqual(sum(ops for ops, _ in original.values()), Operacion.objects.count() + 7)
+
+        perfil = PerfilOperativo.objects.get(pk=OperacionArchivada.objects.values('perfil')[:1])
+        serializado = PerfilOperativoSerializer(perfil).data
+        self.assertEqual((serializado['ops_historicas'], serializado['stake_promedio']), original[perfil.pk])
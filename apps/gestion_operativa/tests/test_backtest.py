@@ -0,0 +1,110 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentication.models import User
+from apps.gestion_operativa.archivo import archivar_operaciones
+from apps.gestion_operativa.backtest import ParametrosStake, backtest
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, Distribuidora, Operacion, PerfilOperativo, Ubicacion
+)
+
+
+def reproducir(operaciones, regla, parametros):
+    """Referencia apuesta a apuesta: (apostado, pnl, bankroll, drawdown, quebrado)."""
+    bankroll = pico = parametros.bankroll
+    apostado = pnl_total = drawdown = 0.0
+    ganadas = decididas = 0
+    for importe, cuota, estado in operaciones:
+        rendimiento = {'GANADA': cuota - 1, 'PERDIDA': -1.0, 'ANULADA': 0.0}[estado]
+        if regla == 'historico':
+            stake = importe if bankroll > 0 else 0
+        elif regla == 'plano':
+            stake = parametros.importe if bankroll > 0 else 0
+        elif regla == 'porcentaje':
+            stake = parametros.fraccion * bankroll
+        else:
+            p = (ganadas + 1) / (decididas + 2)
+            kelly = (p * cuota - 1) / (cuota - 1) * parametros.kelly_multiplicador
+            stake = min(max(kelly, 0), parametros.kelly_tope) * bankroll
+        bankroll += stake * rendimiento
+        apostado += stake
+        pnl_total += stake * rendimiento
+        pico = max(pico, bankroll)
+        drawdown = max(drawdown, min((pico - bankroll) / pico, 1))
+        ganadas += estado == 'GANADA'
+        decididas += estado != 'ANULADA'
+    return apostado, pnl_total, bankroll, drawdown, bankroll <= 0
+
+
+class BacktestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        usuario = User.objects.create_user(username='backtest', email='backtest@example.com', password='x')
+        cls.perfiles = [
+            PerfilOperativo.objects.create(
+                usuario=usuario, casa=casa, agencia=agencia, nombre_usuario=f'perfil{i}',
+                tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta=nivel,
+            )
+            for i, nivel in enumerate(['ORO', 'ORO', 'BRONCE'])
+        ]
+
+        rng = random.Random(7)
+        inicio = timezone.now() - timedelta(days=60)
+        cls.historial = {perfil.pk: [] for perfil in cls.perfiles}
+        operaciones = []
+        for i in range(90):
+            perfil = cls.perfiles[i % 3]
+            importe = Decimal(rng.choice(['50.00', '120.00', '400.00']))
+            cuota = Decimal(rng.choice(['1.50', '1.91', '2.40', '3.75']))
+            estado = rng.choice(['GANADA', 'PERDIDA', 'PERDIDA', 'ANULADA'])
+            cls.historial[perfil.pk].append((float(importe), float(cuota), estado))
+            # Misma fecha para pares de operaciones: el keyset desempata por id
+            operaciones.append(Operacion(
+                perfil=perfil, importe=importe, cuota=cuota, estado=estado,
+                fecha_registro=inicio + timedelta(hours=i // 2),
+            ))
+        operaciones.append(Operacion(perfil=cls.perfiles[0], importe=Decimal('1'), cuota=Decimal('9')))
+        Operacion.objects.bulk_create(operaciones)
+
+    def _comprobar_referencia(self):
+        parametros = ParametrosStake(bankroll=1000, importe=25, fraccion=0.05, kelly_multiplicador=1, kelly_tope=0.2)
+        for tamano_lote in (7, 1000):
+            resultado = backtest(PerfilOperativo.objects.all(), parametros=parametros, tamano_lote=tamano_lote)
+            self.assertEqual(resultado['operaciones'], 90)
+            for regla, informe in resultado['reglas'].items():
+                for fila in informe['perfiles']:
+                    esperado = reproducir(self.historial[fila['perfil']], regla, parametros)
+                    obtenido = (fila['apostado'], fila['pnl'], fila['bankroll_final'], fila['drawdown_max'], fila['quebrado'])
+                    for valor, referencia in zip(obtenido, esperado):
+                        self.assertAlmostEqual(valor, referencia, delta=0.01, msg=(regla, tamano_lote, fila))
+
+    def test_coincide_con_la_referencia_en_cualquier_tamano_de_lote(self):
+        self._comprobar_referencia()
+
+    def test_incluye_operaciones_archivadas(self):
+        # Corte a mitad del historial: los lotes mezclan archivo y operaciones vivas
+        corte = Operacion.objects.order_by('fecha_registro')[45].fecha_registro
+        self.assertEqual(archivar_operaciones(corte).operaciones, 44)
+        self._comprobar_referencia()
+
+    def test_agrupado_y_quiebra(self):
+        resultado = backtest(PerfilOperativo.objects.all(), reglas=['historico'], parametros=ParametrosStake(bankroll=500))
+        informe = resultado['reglas']['historico']
+        self.assertEqual([(g['grupo'], g['perfiles']) for g in informe['grupos']], [('BRONCE', 1), ('ORO', 2)])
+        quebrados = [fila for fila in informe['perfiles'] if fila['quebrado']]
+        self.assertTrue(quebrados)
+        for fila in quebrados:
+            self.assertLessEqual(fila['bankroll_final'], 0)
+            self.assertEqual(fila['drawdown_max'], 1.0)
+        oro = informe['grupos'][1]
+        miembros = [fila for fila in informe['perfiles'] if fila['grupo'] == 'ORO']
+        self.assertAlmostEqual(oro['pnl'], sum(fila['pnl'] for fila in miembros), delta=0.01)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.contrib import admin
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import BitacoraMando, PerfilOperativo
+
+from .factories import DatasetFactory
+
+
+class BusquedaBitacoraTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(2)
+        cls.usuario = User.objects.create_user(username='bitacora', email='bitacora@example.com', password='x')
+        cls.perfil, cls.otro = PerfilOperativo.objects.order_by('pk')[:2]
+        cls.limitada = BitacoraMando.objects.create(
+            perfil=cls.perfil, observacion='Cuenta limitada por la casa tras varias apuestas ganadas'
+        )
+        cls.verificacion = BitacoraMando.objects.create(
+            perfil=cls.otro, observacion='Solicitan verificación de documentos; cuenta limitada temporalmente'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def _buscar(self, params):
+        respuesta = self.client.get(reverse('bitacoramando-buscar'), params)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()['results']
+
+    def test_busca_por_raiz_y_resalta(self):
+        resultados = self._buscar({'q': 'limitadas'})
+        self.assertEqual({fila['id_bitacora'] for fila in resultados}, {self.limitada.pk, self.verificacion.pk})
+        self.assertIn('<mark>limitada</mark>', resultados[0]['fragmento'])
+        self.assertNotIn('observacion_busqueda', resultados[0])
+
+    def test_ordena_por_relevancia_y_respeta_filtros(self):
+        resultados = self._buscar({'q': 'verificación documentos'})
+        self.assertEqual([fila['id_bitacora'] for fila in resultados], [self.verificacion.pk])
+        self.assertEqual(self._buscar({'q': 'limitada', 'perfil': self.perfil.pk})[0]['id_bitacora'], self.limitada.pk)
+        manana = (timezone.now() + timedelta(days=1)).isoformat()
+        self.assertEqual(self._buscar({'q': 'limitada', 'fecha_desde': manana}), [])
+
+    def test_vector_se_actualiza_al_editar(self):
+        self.limitada.observacion = 'Retiro aprobado'
+        self.limitada.save()
+        self.assertEqual([fila['id_bitacora'] for fila in self._buscar({'q': 'retiro'})], [self.limitada.pk])
+
+    def test_requiere_texto(self):
+        respuesta = self.client.get(reverse('bitacoramando-buscar'))
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_busqueda_del_admin_usa_el_indice(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', email='admin@example.com',
+                                                              password='x'))
+        url = reverse('admin:gestion_operativa_bitacoramando_changelist')
+        respuesta = self.client.get(url, {'q': 'limitadas'})
+        self.assertEqual(set(respuesta.context['cl'].result_list), {self.limitada, self.verificacion})
+        respuesta = self.client.get(url, {'q': self.otro.nombre_usuario})
+        resultados = respuesta.context['cl'].result_list
+        self.assertIn(self.verificacion, resultados)
+        self.assertEqual({fila.perfil_id for fila in resultados}, {self.otro.pk})
+
+        # Con tablas tan pequeñas el planificador prefiere el seq scan: se descarta para ver si el índice es usable
+        resultados, _ = admin.site._registry[BitacoraMando].get_search_results(
+            None, BitacoraMando.objects.all(), 'limitadas'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            self.assertIn('bitacora_busqueda_gin', resultados.explain())
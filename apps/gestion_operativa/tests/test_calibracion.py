@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.calibracion import informe_calibracion, informe_calibracion_diario, intervalo_wilson
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, Distribuidora, Operacion, PerfilOperativo, Ubicacion
+)
+
+
+class CalibracionMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='calibracion', email='calibracion@example.com', password='x')
+        perfil = PerfilOperativo.objects.create(
+            usuario=cls.usuario, casa=casa, agencia=agencia, nombre_usuario='perfil',
+            tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE',
+        )
+        operaciones = [
+            # Tramo 2.00-2.50: 3 de 4 ganadas a 2.00 -> P&L 3 * 10 - 10 = 20
+            *(Operacion(perfil=perfil, importe=Decimal('10.00'), cuota=Decimal('2.00'), estado=estado,
+                        deporte='FUTBOL', mercado='1X2')
+              for estado in ['GANADA', 'GANADA', 'GANADA', 'PERDIDA']),
+            # Borde superior del tramo: 2.50 cae en 2.50-3.00
+            Operacion(perfil=perfil, importe=Decimal('20.00'), cuota=Decimal('2.50'), estado='PERDIDA',
+                      deporte='FUTBOL', mercado='1X2'),
+            Operacion(perfil=perfil, importe=Decimal('5.00'), cuota=Decimal('12.00'), estado='GANADA',
+                      deporte='TENIS', mercado='Ganador'),
+            # Anuladas y pendientes no cuentan
+            Operacion(perfil=perfil, importe=Decimal('99.00'), cuota=Decimal('2.10'), estado='ANULADA',
+                      deporte='FUTBOL', mercado='1X2'),
+            Operacion(perfil=perfil, importe=Decimal('99.00'), cuota=Decimal('2.10'), deporte='FUTBOL', mercado='1X2'),
+        ]
+        Operacion.objects.bulk_create(operaciones)
+
+    def setUp(self):
+        cache.clear()
+
+
+class CalibracionTests(CalibracionMixin, TestCase):
+
+    def test_intervalo_wilson(self):
+        inferior, superior = intervalo_wilson(3, 4)
+        self.assertAlmostEqual(inferior, 0.3006, places=4)
+        self.assertAlmostEqual(superior, 0.9544, places=4)
+        self.assertEqual(intervalo_wilson(0, 0), (None, None))
+        self.assertEqual(intervalo_wilson(0, 5)[0], 0.0)
+
+    def test_tramos_y_yield(self):
+        filas = informe_calibracion()
+        self.assertEqual(
+            [(f['deporte'], f['mercado'], f['banda'], f['operaciones'], f['ganadas']) for f in filas],
+            [('FUTBOL', '1X2', '2.00-2.50', 4, 3), ('FUTBOL', '1X2', '2.50-3.00', 1, 0),
+             ('TENIS', 'Ganador', '10.00+', 1, 1)],
+        )
+        primera = filas[0]
+        self.assertEqual((primera['stake'], primera['pnl'], primera['yield']), (Decimal('40.00'), Decimal('20.00'), 0.5))
+        self.assertEqual((primera['prob_implicita'], primera['tasa_real'], primera['desviacion']), (0.5, 0.75, 0.25))
+        self.assertFalse(primera['significativa'])
+        self.assertEqual(filas[2]['pnl'], Decimal('55.00'))
+
+        solo_deporte = informe_calibracion(agrupar=('deporte',), deporte='TENIS')
+        self.assertEqual([(f['banda'], f['operaciones']) for f in solo_deporte], [('10.00+', 1)])
+        self.assertNotIn('mercado', solo_deporte[0])
+
+    def test_cache_diaria(self):
+        primero = informe_calibracion_diario(agrupar=('deporte',))
+        Operacion.objects.filter(deporte='TENIS').delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(informe_calibracion_diario(agrupar=('deporte',)), primero)
+        # Otros parámetros, otra entrada
+        self.assertEqual(informe_calibracion_diario(agrupar=('deporte',), deporte='TENIS'), [])
+
+
+class CalibracionApiTests(CalibracionMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.usuario)
+
+    def test_endpoint(self):
+        url = reverse('operacion-calibracion')
+        respuesta = self.client.get(url, {'agrupar': ['mercado', 'deporte'], 'deporte': 'futbol'})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual(datos['bandas'][0], '1.00')
+        self.assertEqual(list(datos['results'][0])[:3], ['deporte', 'mercado', 'banda'])
+        self.assertEqual(len(datos['results']), 2)
+
+        self.assertEqual(self.client.get(url, {'agrupar': 'casa'}).status_code, 400)
+        respuesta = self.client.get(url, {'fecha_desde': '2026-02-01T00:00:00Z', 'fecha_hasta': '2026-01-01T00:00:00Z'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('fecha_hasta', respuesta.json())
+
+    def test_endpoint_sin_parametros_agrupa_por_deporte_y_mercado(self):
+        respuesta = self.client.get(reverse('operacion-calibracion'))
+        self.assertEqual(respuesta.status_code, 200)
+        resultados = respuesta.json()['results']
+        self.assertEqual(list(resultados[0])[:3], ['deporte', 'mercado', 'banda'])
+        self.assertEqual({(fila['deporte'], fila['mercado']) for fila in resultados},
+                         {('FUTBOL', '1X2'), ('TENIS', 'Ganador')})
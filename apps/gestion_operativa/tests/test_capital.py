@@ -0,0 +1,88 @@
+import threading
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.capital import conciliar_capital, registrar_movimiento
+from apps.gestion_operativa.models import CasaApuestas, TransaccionFinanciera
+
+from .factories import DatasetFactory
+
+
+class LibroCapitalTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(2)
+        cls.casa, cls.otra = CasaApuestas.objects.order_by('pk')
+        cls.usuario = User.objects.create_user(username='capital', email='capital@example.com', password='x')
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def test_movimiento_aplica_deltas_y_devuelve_saldos(self):
+        url = reverse('casaapuestas-movimientos', args=[self.casa.pk])
+        respuesta = self.client.post(url, {
+            'concepto': 'ASIGNACION', 'monto_activo': '250.50', 'descripcion': 'Refuerzo'
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertEqual(respuesta.json()['saldos']['capital_activo_hoy'], '1250.50')
+
+        self.casa.refresh_from_db()
+        self.assertEqual(self.casa.capital_activo_hoy, Decimal('1250.50'))
+        self.assertEqual(self.casa.capital_total, Decimal('5000.00'))
+        self.assertEqual(len(self.client.get(url).json()['results']), 2)
+
+    def test_saldos_no_se_escriben_por_put(self):
+        self.client.patch(
+            reverse('casaapuestas-detail', args=[self.casa.pk]),
+            {'capital_total': '1.00'}, format='json'
+        )
+        self.casa.refresh_from_db()
+        self.assertEqual(self.casa.capital_total, Decimal('5000.00'))
+
+    def test_transaccion_de_otra_casa(self):
+        transaccion = TransaccionFinanciera.objects.filter(perfil__casa=self.otra).first()
+        respuesta = self.client.post(
+            reverse('casaapuestas-movimientos', args=[self.casa.pk]),
+            {'concepto': 'DEPOSITO', 'monto_total': '10', 'transaccion': transaccion.pk},
+            format='json'
+        )
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_conciliacion_corrige_solo_las_desviadas(self):
+        CasaApuestas.objects.filter(pk=self.otra.pk).update(capital_total=Decimal('1.00'))
+        diferencias = conciliar_capital()
+        self.assertEqual([d.casa_id for d in diferencias], [self.otra.pk])
+        self.otra.refresh_from_db()
+        self.assertEqual(self.otra.capital_total, Decimal('5000.00'))
+        self.assertEqual(conciliar_capital(), [])
+
+
+class CapitalConcurrenteTests(TransactionTestCase):
+
+    def test_movimientos_concurrentes_no_pierden_escrituras(self):
+        DatasetFactory().sembrar(1)
+        casa = CasaApuestas.objects.get()
+        hilos, por_hilo = 8, 5
+
+        def operar():
+            try:
+                for _ in range(por_hilo):
+                    registrar_movimiento(casa.pk, 'ASIGNACION', monto_activo=Decimal('10.00'))
+            finally:
+                connection.close()
+
+        trabajadores = [threading.Thread(target=operar) for _ in range(hilos)]
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join()
+
+        casa.refresh_from_db()
+        self.assertEqual(casa.capital_activo_hoy, Decimal('1000.00') + hilos * por_hilo * 10)
+        self.assertEqual(conciliar_capital(), [])
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import Distribuidora, Operacion, PerfilOperativo
+from apps.gestion_operativa.views import PerfilOperativoViewSet
+
+from .factories import DatasetFactory
+
+
+class PeticionCondicionalTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(3)
+        cls.usuario = User.objects.create_user(username='etag', email='etag@example.com', password='x')
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def test_listado_304_hasta_que_cambian_los_datos(self):
+        url = reverse('distribuidora-list')
+        respuesta = self.client.get(url)
+        etag = respuesta['ETag']
+        self.assertTrue(respuesta.has_header('Last-Modified'))
+
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+        distribuidora = Distribuidora.objects.first()
+        distribuidora.nombre = 'Renombrada'
+        distribuidora.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_etag_depende_de_los_filtros_y_del_media_type(self):
+        url = reverse('operacion-list')
+        etag = self.client.get(url)['ETag']
+        perfil = PerfilOperativo.objects.first()
+        self.assertNotEqual(etag, self.client.get(url, {'perfil': perfil.pk})['ETag'])
+        self.assertNotEqual(
+            etag, self.client.get(url, HTTP_ACCEPT='application/json; decimals=float')['ETag']
+        )
+
+    def test_detalle_304_sin_serializar(self):
+        operacion = Operacion.objects.first()
+        url = reverse('operacion-detail', args=[operacion.pk])
+        etag = self.client.get(url)['ETag']
+
+        # Fecha de la fila, fecha máxima del dependiente y versiones de borrado
+        with self.assertNumQueries(3):
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_detalle_con_clave_mal_formada_404(self):
+        self.assertEqual(self.client.get(reverse('operacion-detail', args=['abc'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('distribuidora-detail', args=['abc'])).status_code, 404)
+
+    def test_validador_del_listado_sin_group_by(self):
+        url = reverse('distribuidora-list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertFalse([c['sql'] for c in consultas if 'GROUP BY' in c['sql'].upper()])
+        self.assertEqual(
+            {d['nombre']: d['casas_count'] for d in self.client.get(url).json()['results']},
+            {d.nombre: d.casas.count() for d in Distribuidora.objects.all()},
+        )
+
+    def test_cambio_en_modelo_dependiente_invalida(self):
+        operacion = Operacion.objects.first()
+        url = reverse('operacion-detail', args=[operacion.pk])
+        etag = self.client.get(url)['ETag']
+
+        perfil = operacion.perfil
+        perfil.nombre_usuario = 'nuevo_nombre'
+        perfil.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['perfil_nombre'], 'nuevo_nombre')
+
+    def test_borrado_invalida_sin_contar_filas(self):
+        url = reverse('operacion-list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertFalse([c['sql'] for c in consultas if 'COUNT(' in c['sql'].upper()])
+
+        # Borrar una operación que no es la última modificada no mueve MAX(fecha_actualizacion)
+        Operacion.objects.order_by('fecha_actualizacion').first().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    # Sin ventana: el ETag no puede caducar entre las dos peticiones
+    @mock.patch.object(PerfilOperativoViewSet, 'ventana_etag', None)
+    def test_perfiles_sin_dependencias_de_alto_volumen(self):
+        url = reverse('perfiloperativo-list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        sql = ' '.join(c['sql'] for c in consultas)
+        self.assertNotIn('"operaciones"', sql)
+        self.assertNotIn('"transacciones_financieras"', sql)
@@ -0,0 +1,115 @@
+"""
+Regresión de consultas N+1 para todos los endpoints del router.
+
+Para cada ruta registrada se mide el número de consultas del listado y del
+detalle con un dataset pequeño y otra vez tras hacerlo crecer. Si el número
+cambia, el test falla mostrando el SQL que se repite por fila.
+
+El tamaño del dataset grande se configura con la variable de entorno
+`N1_TAMANO_DATASET` (por defecto 15).
+"""
+import os
+import re
+from collections import Counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.urls import router
+
+from .factories import DatasetFactory
+
+
+TAMANO_INICIAL = 2
+TAMANO_FINAL = int(os.environ.get('N1_TAMANO_DATASET', 15))
+
+# Variantes adicionales de listado que cambian el serializer o el queryset
+PARAMETROS_EXTRA = {
+    'distribuidoras': [{'expand': 'casas'}],
+}
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def _normalizar_sql(sql):
+    """Sustituye literales por `?` para agrupar consultas equivalentes."""
+    return _LITERALES.sub('?', sql)
+
+
+def _sql_repetido(consultas):
+    conteo = Counter(_normalizar_sql(q['sql']) for q in consultas)
+    repetidas = [(veces, sql) for sql, veces in conteo.items() if veces > 1]
+    if not repetidas:
+        return 'Sin consultas repetidas; revisa las consultas capturadas.'
+    return '\n'.join(f'  [{veces}x] {sql}' for veces, sql in sorted(repetidas, reverse=True))
+
+
+class ConsultasN1Tests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(
+            username='n1', email='n1@example.com', password='n1pass123'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+        self.factory = DatasetFactory()
+        self.rutas = [(prefijo, viewset) for prefijo, viewset, _ in router.registry]
+
+    def _medir(self, url, params=None):
+        with CaptureQueriesContext(connection) as contexto:
+            respuesta = self.client.get(url, params or {})
+        self.assertEqual(respuesta.status_code, 200, f'{url}: {respuesta.status_code}')
+        return contexto.captured_queries
+
+    def _url_listado(self, viewset):
+        basename = router.get_default_basename(viewset)
+        return reverse(f'{basename}-list')
+
+    def _url_detalle(self, viewset, pk):
+        basename = router.get_default_basename(viewset)
+        return reverse(f'{basename}-detail', args=[pk])
+
+    def _assert_constante(self, url, antes, despues):
+        if len(antes) != len(despues):
+            self.fail(
+                f'{url}: {len(antes)} consultas con {TAMANO_INICIAL} filas y '
+                f'{len(despues)} con {TAMANO_FINAL}. SQL repetido:\n'
+                f'{_sql_repetido(despues)}'
+            )
+
+    def test_listados_no_dependen_del_tamano(self):
+        self.factory.sembrar(TAMANO_INICIAL)
+        casos = []
+        for prefijo, viewset in self.rutas:
+            for params in [{}] + PARAMETROS_EXTRA.get(prefijo, []):
+                params = {'page_size': 100, **params}
+                casos.append((prefijo, self._url_listado(viewset), params))
+        antes = {
+            (prefijo, tuple(params.items())): self._medir(url, params)
+            for prefijo, url, params in casos
+        }
+
+        self.factory.sembrar(TAMANO_FINAL - TAMANO_INICIAL)
+        for prefijo, url, params in casos:
+            with self.subTest(ruta=prefijo, params=params):
+                despues = self._medir(url, params)
+                self._assert_constante(url, antes[(prefijo, tuple(params.items()))], despues)
+
+    def test_detalles_no_dependen_de_las_relaciones(self):
+        self.factory.sembrar(TAMANO_INICIAL)
+        casos = []
+        for prefijo, viewset in self.rutas:
+            instancia = viewset.queryset.model.objects.order_by('pk').first()
+            casos.append((prefijo, self._url_detalle(viewset, instancia.pk)))
+        antes = {prefijo: self._medir(url) for prefijo, url in casos}
+
+        # Los nuevos hijos se reparten también entre los objetos ya medidos
+        self.factory.sembrar(TAMANO_FINAL - TAMANO_INICIAL)
+        for prefijo, url in casos:
+            with self.subTest(ruta=prefijo):
+                self._assert_constante(url, antes[prefijo], self._medir(url))
@@ -0,0 +1,124 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.admin import liquidar_operaciones
+from apps.gestion_operativa.exposicion import conciliar_exposicion
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, ConfiguracionOperativa, Distribuidora, ExposicionAbierta,
+    Operacion, PerfilOperativo, Ubicacion
+)
+
+
+class ExposicionMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        cls.casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        cls.agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='exposicion', email='exposicion@example.com', password='x')
+        cls.perfiles = [
+            PerfilOperativo.objects.create(
+                usuario=cls.usuario, casa=cls.casa, agencia=cls.agencia, nombre_usuario=f'perfil{i}',
+                tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE',
+            )
+            for i in range(2)
+        ]
+
+    def _exposicion(self, ambito, clave):
+        fila = ExposicionAbierta.objects.filter(ambito=ambito, clave=str(clave)).first()
+        if fila is None:
+            return (0, Decimal('0'), Decimal('0'))
+        return (fila.num_operaciones, fila.importe_abierto, fila.payout_potencial)
+
+
+class ExposicionApiTests(ExposicionMixin, APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def _apostar(self, perfil, importe, cuota='2.50', mercado='Over 2.5'):
+        return self.client.post(reverse('operacion-list'), {
+            'perfil': perfil.pk, 'importe': importe, 'cuota': cuota, 'deporte': 'FUTBOL', 'mercado': mercado,
+        }, format='json')
+
+    def test_alta_y_liquidacion_mueven_la_exposicion(self):
+        uno, dos = self.perfiles
+        self.assertEqual(self._apostar(uno, '10.00').status_code, 201)
+        respuesta = self._apostar(dos, '5.55', cuota='1.91')
+        self.assertEqual(respuesta.status_code, 201)
+
+        self.assertEqual(self._exposicion('PERFIL', uno.pk), (1, Decimal('10.00'), Decimal('25.00')))
+        # 5.55 * 1.91 = 10.6005 -> 10.60
+        self.assertEqual(self._exposicion('CASA', self.casa.pk), (2, Decimal('15.55'), Decimal('35.60')))
+        self.assertEqual(self._exposicion('AGENCIA', self.agencia.pk), (2, Decimal('15.55'), Decimal('35.60')))
+        self.assertEqual(self._exposicion('MERCADO', 'Over 2.5'), (2, Decimal('15.55'), Decimal('35.60')))
+
+        url = reverse('operacion-detail', args=[respuesta.json()['id_operacion']])
+        self.assertEqual(self.client.patch(url, {'estado': 'PERDIDA'}, format='json').status_code, 200)
+        self.assertEqual(self._exposicion('PERFIL', dos.pk), (0, Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(self._exposicion('CASA', self.casa.pk), (1, Decimal('10.00'), Decimal('25.00')))
+        self.assertEqual(conciliar_exposicion(aplicar=False), [])
+
+    def test_limite_excedido_rechaza_la_apuesta(self):
+        ConfiguracionOperativa.objects.create(limite_exposicion_casa=Decimal('100.00'))
+        uno, dos = self.perfiles
+        self.assertEqual(self._apostar(uno, '60.00').status_code, 201)
+
+        respuesta = self._apostar(dos, '50.00')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('exposicion', respuesta.json())
+        self.assertFalse(Operacion.objects.filter(perfil=dos).exists())
+        self.assertEqual(self._exposicion('PERFIL', dos.pk), (0, Decimal('0'), Decimal('0')))
+        self.assertEqual(self._exposicion('CASA', self.casa.pk), (1, Decimal('60.00'), Decimal('150.00')))
+
+        # El límite propio de la fila sustituye al general
+        ExposicionAbierta.objects.filter(ambito='CASA').update(limite_importe=Decimal('200.00'))
+        self.assertEqual(self._apostar(dos, '50.00').status_code, 201)
+
+    def test_endpoint(self):
+        ConfiguracionOperativa.objects.create(limite_exposicion_perfil=Decimal('500.00'))
+        self._apostar(self.perfiles[0], '10.00')
+        respuesta = self.client.get(reverse('operacion-exposicion'), {'ambito': 'perfil'})
+        self.assertEqual(respuesta.status_code, 200)
+        fila, = respuesta.json()['results']
+        self.assertEqual(
+            (fila['clave'], fila['importe_abierto'], fila['limite']),
+            (str(self.perfiles[0].pk), '10.00', '500.00'),
+        )
+        self.assertEqual(self.client.get(reverse('operacion-exposicion'), {'ambito': 'PAIS'}).status_code, 400)
+
+
+class ConciliacionExposicionTests(ExposicionMixin, TestCase):
+
+    def test_corrige_operaciones_fuera_del_flujo(self):
+        uno, dos = self.perfiles
+        Operacion.objects.bulk_create([
+            Operacion(perfil=uno, importe=Decimal('20.00'), cuota=Decimal('3.00')),
+            Operacion(perfil=dos, importe=Decimal('5.00'), cuota=Decimal('2.00'), estado='GANADA'),
+        ])
+        ExposicionAbierta.objects.create(ambito='PERFIL', clave=str(dos.pk), num_operaciones=1,
+                                         importe_abierto=Decimal('5.00'), limite_importe=Decimal('50.00'))
+
+        call_command('conciliar_exposicion', '--dry-run', stdout=StringIO())
+        self.assertEqual(self._exposicion('PERFIL', uno.pk), (0, Decimal('0'), Decimal('0')))
+
+        diferencias = conciliar_exposicion()
+        self.assertEqual(len(diferencias), 5)
+        self.assertEqual(self._exposicion('PERFIL', uno.pk), (1, Decimal('20.00'), Decimal('60.00')))
+        self.assertEqual(self._exposicion('MERCADO', ''), (1, Decimal('20.00'), Decimal('60.00')))
+        # Sin operaciones abiertas la fila queda a cero y conserva su límite
+        self.assertEqual(self._exposicion('PERFIL', dos.pk), (0, Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(ExposicionAbierta.objects.get(ambito='PERFIL', clave=str(dos.pk)).limite_importe, Decimal('50.00'))
+        self.assertEqual(conciliar_exposicion(), [])
+
+        liquidar_operaciones(Operacion.objects.all(), 'GANADA')
+        self.assertEqual(self._exposicion('CASA', self.casa.pk), (0, Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(conciliar_exposicion(), [])
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import (
+    Distribuidora, CasaApuestas, AlertaOperativa, Operacion
+)
+
+from .factories import DatasetFactory
+
+
+class FiltroDeporteTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenis = Distribuidora.objects.create(nombre='Tenis', deportes=['TENNIS', 'FUTBOL'])
+        cls.futbol = Distribuidora.objects.create(nombre='Fútbol', deportes=['FUTBOL'])
+        cls.casa_tenis = CasaApuestas.objects.create(distribuidora=cls.tenis, nombre='Casa tenis')
+        CasaApuestas.objects.create(distribuidora=cls.futbol, nombre='Casa fútbol')
+        cls.usuario = User.objects.create_user(username='filtros', email='filtros@example.com', password='x')
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def _ids(self, url_name, params, campo):
+        respuesta = self.client.get(reverse(url_name), params)
+        self.assertEqual(respuesta.status_code, 200)
+        return {fila[campo] for fila in respuesta.json()['results']}
+
+    def test_distribuidoras_por_deporte(self):
+        self.assertEqual(
+            self._ids('distribuidora-list', {'deporte': 'tennis'}, 'id_distribuidora'),
+            {self.tenis.pk},
+        )
+        self.assertEqual(
+            self._ids('distribuidora-list', {'deporte': 'FUTBOL'}, 'id_distribuidora'),
+            {self.tenis.pk, self.futbol.pk},
+        )
+
+    def test_casas_por_deporte_de_la_distribuidora(self):
+        self.assertEqual(
+            self._ids('casaapuestas-list', {'deporte': 'TENNIS,FUTBOL'}, 'id_casa'),
+            {self.casa_tenis.pk},
+        )
+
+    def test_deporte_invalido(self):
+        respuesta = self.client.get(reverse('distribuidora-list'), {'deporte': 'CURLING'})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_valida_deportes_al_escribir(self):
+        respuesta = self.client.patch(
+            reverse('distribuidora-detail', args=[self.futbol.pk]),
+            {'deportes': ['FUTBOL', 'FUTBOL', 'CURLING']}, format='json'
+        )
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class FiltrosBusquedaOrdenTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(6)
+        cls.usuario = User.objects.create_user(username='orden', email='orden@example.com', password='x')
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def _resultados(self, url_name, params):
+        respuesta = self.client.get(reverse(url_name), params)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()['results']
+
+    def test_busqueda_por_nombre_de_usuario(self):
+        resultados = self._resultados('perfiloperativo-list', {'search': 'PERFIL3'})
+        self.assertEqual([fila['nombre_usuario'] for fila in resultados], ['perfil3'])
+
+    def test_operaciones_por_rango_estado_y_agencia(self):
+        operacion = Operacion.objects.first()
+        Operacion.objects.filter(pk=operacion.pk).update(
+            estado='PENDIENTE', fecha_registro=timezone.now() - timedelta(days=10)
+        )
+        resultados = self._resultados('operacion-list', {
+            'estado': 'PENDIENTE',
+            'fecha_hasta': (timezone.now() - timedelta(days=5)).isoformat(),
+            'agencia': operacion.perfil.agencia_id,
+        })
+        self.assertEqual([fila['id_operacion'] for fila in resultados], [operacion.pk])
+
+    def test_ordenamiento_solo_en_campos_permitidos(self):
+        ids = [fila['id_operacion'] for fila in self._resultados('operacion-list', {'ordering': 'id_operacion'})]
+        self.assertEqual(ids, sorted(ids))
+        # `importe` no está en la lista blanca: se ignora y se usa el orden por defecto
+        por_defecto = self._resultados('operacion-list', {})
+        self.assertEqual(self._resultados('operacion-list', {'ordering': 'importe'}), por_defecto)
+
+    def test_alertas_por_severidad(self):
+        AlertaOperativa.objects.filter(pk=AlertaOperativa.objects.first().pk).update(severidad='BAJA')
+        self.assertEqual(len(self._resultados('alertaoperativa-list', {'severidad': 'BAJA'})), 1)
@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.jerarquia import arbol, arbol_en_cache
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, Distribuidora, Operacion, PerfilOperativo, ResumenOperacionMensual,
+    TransaccionFinanciera, Ubicacion
+)
+
+
+def resumen(nodo):
+    """(nivel, nombre, perfiles, hijos) recorriendo el árbol."""
+    return (nodo['nivel'], nodo['nombre'], nodo['perfiles'], [resumen(hijo) for hijo in nodo.get('hijos', [])])
+
+
+class JerarquiaTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='D1')
+        Distribuidora.objects.create(nombre='D2', activo=False)
+        casa_1 = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='C1', capital_total=Decimal('1000'),
+                                             capital_activo_hoy=Decimal('400'))
+        casa_2 = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='C2', capital_total=Decimal('500'),
+                                             capital_activo_hoy=Decimal('100'), activo=False)
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        agencia_1 = Agencia.objects.create(nombre='A1', ubicacion=ubicacion, responsable='R', casa_madre=casa_1)
+        agencia_2 = Agencia.objects.create(nombre='A2', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='jerarquia', email='jerarquia@example.com', password='x')
+        p1, p2, p3 = [
+            PerfilOperativo.objects.create(
+                usuario=cls.usuario, casa=casa, agencia=agencia, nombre_usuario=nombre, activo=activo,
+                tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE',
+            )
+            for nombre, casa, agencia, activo in [('p1', casa_1, agencia_1, True), ('p2', casa_1, agencia_2, False),
+                                                  ('p3', casa_2, agencia_1, True)]
+        ]
+        TransaccionFinanciera.objects.bulk_create([
+            TransaccionFinanciera(perfil=perfil, tipo_transaccion=tipo, monto=Decimal(monto), estado=estado,
+                                  fecha_transaccion=timezone.now(), metodo_pago='Banco')
+            for perfil, tipo, monto, estado in [(p1, 'DEPOSITO', '100', 'CONFIRMADA'), (p1, 'RETIRO', '30', 'CONFIRMADA'),
+                                                (p3, 'DEPOSITO', '50', 'PENDIENTE')]
+        ])
+        Operacion.objects.create(perfil=p1, importe=Decimal('10'), cuota=Decimal('2.50'), payout=Decimal('25'),
+                                 estado='GANADA')
+        Operacion.objects.create(perfil=p3, importe=Decimal('20'), cuota=Decimal('2.00'), payout=Decimal('0'),
+                                 estado='PERDIDA', fecha_registro=timezone.now() - timedelta(days=30))
+        ResumenOperacionMensual.objects.create(perfil=p2, mes=date(2024, 1, 1), estado='GANADA',
+                                               profit_loss_total=Decimal('7'))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.usuario)
+
+    def test_arbol_completo(self):
+        with self.assertNumQueries(7):
+            raiz = arbol()
+        self.assertEqual(
+            {campo: raiz[campo] for campo in ['perfiles', 'perfiles_activos', 'ops_semana', 'saldo', 'pnl',
+                                              'capital_total', 'capital_activo_hoy']},
+            {'perfiles': 3, 'perfiles_activos': 2, 'ops_semana': 1, 'saldo': Decimal('70'), 'pnl': Decimal('2'),
+             'capital_total': Decimal('1500'), 'capital_activo_hoy': Decimal('500')},
+        )
+        self.assertEqual(resumen(raiz), (None, None, 3, [
+            ('distribuidora', 'D1', 3, [
+                ('casa', 'C1', 2, [
+                    ('agencia', 'A1', 1, [('perfil', 'p1', 1, [])]),
+                    ('agencia', 'A2', 1, [('perfil', 'p2', 1, [])]),
+                ]),
+                ('casa', 'C2', 1, [('agencia', 'A1', 1, [('perfil', 'p3', 1, [])])]),
+            ]),
+            ('distribuidora', 'D2', 0, []),
+        ]))
+        casa_1 = raiz['hijos'][0]['hijos'][0]
+        self.assertEqual((casa_1['pnl'], casa_1['saldo'], casa_1['capital_total']),
+                         (Decimal('22'), Decimal('70'), Decimal('1000')))
+
+    def test_niveles_colapsados_y_activo(self):
+        raiz = arbol(niveles=('casa', 'perfil'))
+        self.assertEqual(resumen(raiz), (None, None, 3, [
+            ('casa', 'C1', 2, [('perfil', 'p1', 1, []), ('perfil', 'p2', 1, [])]),
+            ('casa', 'C2', 1, [('perfil', 'p3', 1, [])]),
+        ]))
+        self.assertNotIn('hijos', raiz['hijos'][0]['hijos'][0])
+        self.assertEqual(raiz['pnl'], Decimal('2'))
+
+        # Un perfil activo aparece bajo su casa aunque la casa esté inactiva
+        activos = arbol(niveles=('distribuidora', 'casa'), activo=True)
+        self.assertEqual(resumen(activos), (None, None, 2, [
+            ('distribuidora', 'D1', 2, [('casa', 'C1', 1, []), ('casa', 'C2', 1, [])]),
+        ]))
+        self.assertEqual(activos['capital_total'], Decimal('1500'))
+
+    def test_endpoint_y_cache(self):
+        url = reverse('distribuidora-arbol')
+        respuesta = self.client.get(url, {'niveles': ['casa', 'distribuidora'], 'activo': 'false'})
+        self.assertEqual(respuesta.status_code, 200)
+        # Las entidades inactivas aparecen aunque no tengan perfiles inactivos
+        self.assertEqual(resumen(respuesta.json()), (None, None, 1, [
+            ('distribuidora', 'D1', 1, [('casa', 'C1', 1, []), ('casa', 'C2', 0, [])]),
+            ('distribuidora', 'D2', 0, []),
+        ]))
+        self.assertEqual(self.client.get(url, {'niveles': 'pais'}).status_code, 400)
+
+        # Sin parámetros: todos los niveles
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(resumen(respuesta.json()), resumen(arbol()))
+
+        arbol_en_cache(niveles=('casa',), activo=None)
+        with self.assertNumQueries(0):
+            arbol_en_cache(niveles=('casa',), activo=None)
@@ -0,0 +1,45 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import (
+    Operacion, TransaccionFinanciera, PlanificacionRotacion
+)
+from apps.gestion_operativa.renderers import ORJSONRenderer
+from apps.gestion_operativa.serializers import (
+    OperacionSerializer, TransaccionFinancieraSerializer,
+    PlanificacionRotacionSerializer
+)
+
+from .factories import DatasetFactory
+
+
+class ListadoRapidoTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(5)
+        # Filas con nulos para cubrir los conversores
+        Operacion.objects.filter(pk=Operacion.objects.first().pk).update(
+            payout=None, profit_loss=None, mercado=None
+        )
+        cls.usuario = User.objects.create_user(username='rapido', email='rapido@example.com', password='x')
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def test_mismo_json_que_el_serializer(self):
+        casos = [
+            ('operacion-list', Operacion, OperacionSerializer),
+            ('transaccionfinanciera-list', TransaccionFinanciera, TransaccionFinancieraSerializer),
+            ('planificacionrotacion-list', PlanificacionRotacion, PlanificacionRotacionSerializer),
+        ]
+        renderer = ORJSONRenderer()
+        for url_name, model, serializer_class in casos:
+            with self.subTest(serializer=serializer_class.__name__):
+                respuesta = self.client.get(reverse(url_name), {'page_size': 100})
+                obtenido = sorted(respuesta.data['results'], key=lambda fila: next(iter(fila.values())))
+                esperado = serializer_class(
+                    model.objects.select_related('perfil').order_by('pk'), many=True
+                ).data
+                self.assertEqual(renderer.render(obtenido), renderer.render(esperado))
@@ -0,0 +1,98 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.metas import actualizar_meta
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, ConfiguracionOperativa, Distribuidora, Operacion, PerfilOperativo,
+    PlanificacionRotacion, Ubicacion
+)
+
+
+class MetaDiariaTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='metas', email='metas@example.com', password='x')
+        cls.p1, cls.p2, cls.p3, inactivo = [
+            PerfilOperativo.objects.create(
+                usuario=cls.usuario, casa=casa, agencia=agencia, nombre_usuario=nombre, activo=activo,
+                tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE',
+            )
+            for nombre, activo in [('p1', True), ('p2', True), ('p3', True), ('inactivo', False)]
+        ]
+        cls.hoy = timezone.localdate()
+        for perfil, estado_dia in [(cls.p1, 'D'), (cls.p2, 'A'), (inactivo, 'D')]:
+            PlanificacionRotacion.objects.create(perfil=perfil, fecha=cls.hoy, estado_dia=estado_dia,
+                                                 mes=cls.hoy.month, anio=cls.hoy.year)
+
+        def hace(dias):
+            return timezone.make_aware(datetime.combine(cls.hoy - timedelta(days=dias), time(12)))
+
+        # Ventana de 7 días: 210 de volumen en 3 perfiles-día
+        for perfil, importe, estado, fecha in [
+            (cls.p1, '100', 'GANADA', hace(1)),
+            (cls.p2, '50', 'PENDIENTE', hace(1)),
+            (cls.p2, '999', 'ANULADA', hace(1)),
+            (cls.p1, '60', 'PERDIDA', hace(2)),
+            (cls.p3, '999', 'PERDIDA', hace(10)),
+            (cls.p2, '35', 'PENDIENTE', timezone.now()),
+        ]:
+            Operacion.objects.create(perfil=perfil, importe=Decimal(importe), cuota=Decimal('2.00'), estado=estado,
+                                     payout=Decimal('0') if estado == 'PERDIDA' else None, fecha_registro=fecha)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.usuario)
+
+    def _configuracion(self):
+        return ConfiguracionOperativa.objects.values_list(
+            'meta_volumen_diario', 'perfiles_listos_operar', 'perfiles_en_descanso'
+        ).get()
+
+    def test_actualizar_meta(self):
+        ConfiguracionOperativa.objects.create(meta_volumen_diario=Decimal('500'))
+        self.assertIsNone(actualizar_meta(dias_base=7))
+        self.assertEqual(self._configuracion(), (Decimal('500.00'), 0, 0))
+
+        meta = actualizar_meta(dias_base=7, forzar=True)
+        self.assertEqual(meta.volumen_por_perfil, Decimal('70.00'))
+        self.assertEqual(self._configuracion(), (Decimal('140.00'), 2, 1))
+
+        # Sin historial en la ventana se conserva la meta
+        ConfiguracionOperativa.objects.update(actualizar_meta_diariamente=True)
+        call_command('actualizar_meta_diaria', '--fecha', (self.hoy + timedelta(days=60)).isoformat(),
+                     stdout=StringIO())
+        self.assertEqual(self._configuracion(), (Decimal('140.00'), 3, 0))
+
+        call_command('actualizar_meta_diaria', '--dias-base', '7', '--dry-run', stdout=StringIO())
+        self.assertEqual(self._configuracion(), (Decimal('140.00'), 3, 0))
+
+    def test_progreso(self):
+        url = reverse('configuracionoperativa-progreso')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        ConfiguracionOperativa.objects.create(meta_volumen_diario=Decimal('140'))
+        datos = self.client.get(url).json()
+        self.assertEqual(
+            (datos['volumen'], datos['restante'], datos['porcentaje'], datos['operaciones'], datos['perfiles_operando']),
+            ('35.00', '105.00', 25.0, 1, 1),
+        )
+
+        # Los contadores del día salen de la caché hasta que caducan
+        Operacion.objects.create(perfil=self.p3, importe=Decimal('70'), cuota=Decimal('2.00'))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).json()['volumen'], '35.00')
+        cache.clear()
+        self.assertEqual(self.client.get(url).json()['porcentaje'], 75.0)
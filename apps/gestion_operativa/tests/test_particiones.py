@@ -0,0 +1,84 @@
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from apps.gestion_operativa.models import Operacion, TransaccionFinanciera
+from apps.gestion_operativa.particiones import (
+    crear_particion, es_particionada, listar_particiones, repartir_default
+)
+
+from .factories import DatasetFactory
+
+MARZO_2019 = datetime(2019, 3, 10, 15, 0, tzinfo=dt_timezone.utc)
+
+
+class ParticionesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(2)
+        cls.antigua = Operacion.objects.create(
+            perfil=Operacion.objects.first().perfil, fecha_registro=MARZO_2019,
+            importe=10, cuota=2, estado='GANADA',
+        )
+
+    def _particion_de(self, operacion):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT tableoid::regclass::text FROM operaciones WHERE id_operacion = %s',
+                [operacion.pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_tablas_particionadas(self):
+        self.assertTrue(es_particionada(Operacion._meta.db_table))
+        self.assertTrue(es_particionada(TransaccionFinanciera._meta.db_table))
+
+    def test_crear_particion_mueve_filas_de_default(self):
+        self.assertEqual(self._particion_de(self.antigua), 'operaciones_pdefault')
+        self.assertEqual(crear_particion('operaciones', date(2019, 3, 1)), 1)
+        self.assertEqual(self._particion_de(self.antigua), 'operaciones_p201903')
+        self.assertIsNone(crear_particion('operaciones', date(2019, 3, 1)))
+
+    def test_repartir_default(self):
+        abril = Operacion.objects.create(
+            perfil=self.antigua.perfil, fecha_registro=datetime(2019, 4, 30, 23, 59, tzinfo=dt_timezone.utc),
+            importe=10, cuota=2, estado='PERDIDA',
+        )
+        salida = StringIO()
+        call_command('gestionar_particiones', tabla=['operaciones'], stdout=salida)
+        self.assertIn('operaciones_p201903: creada (1 filas movidas desde DEFAULT)', salida.getvalue())
+        self.assertEqual(self._particion_de(self.antigua), 'operaciones_p201903')
+        self.assertEqual(self._particion_de(abril), 'operaciones_p201904')
+        self.assertEqual(repartir_default('operaciones'), {})
+
+        # La DEFAULT vuelve a estar adjunta y recoge las filas sin partición
+        suelta = Operacion.objects.create(
+            perfil=self.antigua.perfil, fecha_registro=datetime(2018, 1, 5, tzinfo=dt_timezone.utc),
+            importe=10, cuota=2, estado='GANADA',
+        )
+        self.assertEqual(self._particion_de(suelta), 'operaciones_pdefault')
+
+    def test_rango_de_fechas_descarta_particiones(self):
+        crear_particion('operaciones', date(2019, 3, 1))
+        plan = Operacion.objects.filter(
+            fecha_registro__gte=datetime(2019, 3, 1, tzinfo=dt_timezone.utc),
+            fecha_registro__lt=datetime(2019, 4, 1, tzinfo=dt_timezone.utc),
+        ).explain()
+        self.assertIn('operaciones_p201903', plan)
+        self.assertNotIn('operaciones_pdefault', plan)
+
+    def test_comando_precrea_y_desacopla(self):
+        crear_particion('operaciones', date(2019, 3, 1))
+        salida = StringIO()
+        call_command(
+            'gestionar_particiones', tabla=['operaciones'], meses_adelante=6,
+            retener_meses=24, eliminar=True, stdout=salida,
+        )
+        self.assertIn('operaciones_p201903: eliminada', salida.getvalue())
+        self.assertNotIn(date(2019, 3, 1), listar_particiones('operaciones'))
+        self.assertFalse(Operacion.objects.filter(pk=self.antigua.pk).exists())
+        self.assertEqual(len(listar_particiones('operaciones')), 7)
@@ -0,0 +1,103 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, Distribuidora, LiquidacionRake, Operacion, PerfilOperativo, Ubicacion
+)
+from apps.gestion_operativa.archivo import archivar_operaciones
+from apps.gestion_operativa.rake import liquidar_rake, periodo
+
+
+class RakeTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        cls.agencia_pnl, cls.agencia_volumen, _ = [
+            Agencia.objects.create(nombre=nombre, ubicacion=ubicacion, responsable='R',
+                                   rake_porcentaje=Decimal(porcentaje), base_rake=base)
+            for nombre, porcentaje, base in [('PNL', '5', 'PNL'), ('Volumen', '10', 'VOLUMEN'), ('Sin ops', '5', 'PNL')]
+        ]
+        cls.usuario = User.objects.create_user(username='rake', email='rake@example.com', password='x')
+        perfil_pnl, perfil_volumen = [
+            PerfilOperativo.objects.create(
+                usuario=cls.usuario, casa=casa, agencia=agencia, nombre_usuario=agencia.nombre,
+                tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE',
+            )
+            for agencia in (cls.agencia_pnl, cls.agencia_volumen)
+        ]
+
+        cls.mes = (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+        dentro = timezone.make_aware(datetime.combine(cls.mes, time(12)))
+        fuera = timezone.make_aware(datetime.combine(timezone.localdate().replace(day=1), time(0, 30)))
+        for perfil, importe, payout, estado, fecha in [
+            (perfil_pnl, '100', '250', 'GANADA', dentro),
+            (perfil_pnl, '50', '0', 'PERDIDA', dentro),
+            (perfil_pnl, '30', '30', 'ANULADA', dentro),
+            (perfil_pnl, '10', None, 'PENDIENTE', dentro),
+            (perfil_pnl, '500', '0', 'PERDIDA', fuera),
+            (perfil_volumen, '200', '0', 'PERDIDA', dentro),
+        ]:
+            Operacion.objects.create(perfil=perfil, importe=Decimal(importe), cuota=Decimal('2.50'), estado=estado,
+                                     payout=payout and Decimal(payout), fecha_registro=fecha)
+
+    def _lineas(self):
+        return list(LiquidacionRake.objects.order_by('agencia_id', 'secuencia').values_list(
+            'agencia_id', 'secuencia', 'num_operaciones', 'volumen', 'pnl', 'rake'
+        ))
+
+    def test_liquidacion_idempotente_con_ajustes(self):
+        self.assertEqual(len(liquidar_rake(self.mes, aplicar=False)), 2)
+        self.assertFalse(LiquidacionRake.objects.exists())
+
+        liquidar_rake(self.mes)
+        esperado = [
+            (self.agencia_pnl.pk, 1, 3, Decimal('150.00'), Decimal('100.00'), Decimal('5.00')),
+            # Con P&L negativo la base VOLUMEN sigue generando rake
+            (self.agencia_volumen.pk, 1, 1, Decimal('200.00'), Decimal('-200.00'), Decimal('20.00')),
+        ]
+        self.assertEqual(self._lineas(), esperado)
+        self.assertEqual(liquidar_rake(self.mes), [])
+
+        # Una operación liquidada tarde: el ajuste usa el porcentaje de la liquidación original
+        Agencia.objects.filter(pk=self.agencia_pnl.pk).update(rake_porcentaje=Decimal('50'))
+        pendiente = Operacion.objects.get(estado='PENDIENTE')
+        pendiente.estado, pendiente.payout = 'GANADA', Decimal('30')
+        pendiente.save()
+        ajuste, = liquidar_rake(self.mes)
+        self.assertEqual(
+            (ajuste.secuencia, ajuste.num_operaciones, ajuste.volumen, ajuste.pnl, ajuste.rake, ajuste.rake_porcentaje),
+            (2, 1, Decimal('10.00'), Decimal('20.00'), Decimal('1.00'), Decimal('5.00')),
+        )
+        self.assertEqual(liquidar_rake(self.mes), [])
+
+    def test_archivar_no_revierte_lo_liquidado(self):
+        liquidar_rake(self.mes)
+        lineas = self._lineas()
+        archivadas = archivar_operaciones(periodo(self.mes)[1])
+        self.assertEqual(archivadas.operaciones, 4)
+        self.assertEqual(liquidar_rake(self.mes), [])
+        self.assertEqual(self._lineas(), lineas)
+
+    def test_estado_de_cuenta(self):
+        call_command('liquidar_rake', '--mes', f'{self.mes:%Y-%m}', stdout=StringIO())
+        url = reverse('agencia-liquidaciones', args=[self.agencia_pnl.pk])
+        self.client.force_authenticate(self.usuario)
+        datos = self.client.get(url).json()
+        self.assertEqual((datos['base_rake'], datos['total_rake']), ('PNL', '5.00'))
+        mes, = datos['meses']
+        self.assertEqual((mes['mes'], mes['rake'], len(mes['lineas'])), (self.mes.isoformat(), '5.00', 1))
+
+        siguiente = f'{self.mes + timedelta(days=32):%Y-%m}'
+        self.assertEqual(self.client.get(url, {'desde': siguiente}).json()['meses'], [])
+        self.assertEqual(self.client.get(url, {'desde': '2026/01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': siguiente, 'hasta': f'{self.mes:%Y-%m}'}).status_code, 400)
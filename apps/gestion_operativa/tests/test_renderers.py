@@ -0,0 +1,76 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.parsers import ORJSONParser
+from apps.gestion_operativa.renderers import ORJSONRenderer, StdJSONRenderer
+
+from .factories import DatasetFactory
+
+
+DATOS = {
+    'importe': Decimal('1250.50'),
+    'cuota': Decimal('1.90'),
+    'payout': None,
+    'fecha_registro': datetime(2026, 1, 18, 1, 20, 5, 123000, tzinfo=dt_timezone.utc),
+    'mercado': 'Más de 2.5 — línea asiática',
+    'ids': [1, 2, 3],
+}
+
+
+class ORJSONRendererTests(SimpleTestCase):
+
+    def test_misma_salida_que_stdlib(self):
+        for media_type in (None, 'application/json; decimals=str', 'application/json; decimals=float'):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    ORJSONRenderer().render(DATOS, media_type),
+                    StdJSONRenderer().render(DATOS, media_type),
+                )
+
+    def test_stdjson_sin_estado_entre_peticiones(self):
+        renderer = StdJSONRenderer()
+        self.assertIn(b'"importe":1250.5', renderer.render(DATOS, 'application/json; decimals=float'))
+        self.assertIn(b'"importe":"1250.50"', renderer.render(DATOS, 'application/json'))
+        self.assertNotIn('encoder_class', vars(renderer))
+
+    def test_decimales_como_string_por_defecto(self):
+        self.assertIn(b'"importe":"1250.50"', ORJSONRenderer().render(DATOS))
+
+    @override_settings(JSON_DECIMAL_ENCODING='float')
+    def test_decimales_como_float_desde_settings(self):
+        self.assertIn(b'"importe":1250.5', ORJSONRenderer().render(DATOS))
+
+    def test_parser(self):
+        datos = ORJSONParser().parse(BytesIO(b'{"importe": "10.00", "cuota": 1.9}'))
+        self.assertEqual(datos, {'importe': '10.00', 'cuota': 1.9})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"importe": NaN}'))
+
+
+class NegociacionContenidoTests(APITestCase):
+
+    def setUp(self):
+        DatasetFactory().sembrar(1)
+        self.client.force_authenticate(
+            User.objects.create_user(username='json', email='json@example.com', password='x')
+        )
+        self.url = reverse('operacion-list')
+
+    def test_decimales_por_parametro_de_media_type(self):
+        respuesta = self.client.get(self.url, HTTP_ACCEPT='application/json; decimals=float')
+        self.assertEqual(respuesta.json()['results'][0]['importe'], 10.0)
+
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.json()['results'][0]['importe'], '10.00')
+
+    def test_formato_stdjson_equivalente(self):
+        rapido = self.client.get(self.url)
+        estandar = self.client.get(self.url, {'format': 'stdjson'})
+        self.assertEqual(rapido.content, estandar.content)
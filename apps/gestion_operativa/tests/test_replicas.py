@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import Distribuidora
+from apps.gestion_operativa.replicas import (
+    CABECERA, ReplicaRouter, _replica_actual, decidir_lectura, fijar_primario
+)
+
+
+class RouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_lee_de_la_replica_de_la_peticion(self):
+        self.assertEqual(self.router.db_for_read(Distribuidora), 'default')
+        token = _replica_actual.set('replica_1')
+        try:
+            self.assertEqual(self.router.db_for_read(Distribuidora), 'replica_1')
+            # Las escrituras nunca salen del primario
+            self.assertEqual(self.router.db_for_write(Distribuidora), 'default')
+        finally:
+            _replica_actual.reset(token)
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_no_migra_las_replicas(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'gestion_operativa'))
+        self.assertIsNone(self.router.allow_migrate('default', 'gestion_operativa'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class DecisionTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User(pk=1, username='replicas')
+
+    def _decidir(self, metodo='get'):
+        request = getattr(APIRequestFactory(), metodo)('/')
+        request.user = self.usuario
+        return decidir_lectura(request)
+
+    def test_get_a_replica(self):
+        self.assertEqual(self._decidir(), ('replica_1', 'replica'))
+
+    def test_escritura_al_primario(self):
+        self.assertEqual(self._decidir('post'), ('default', 'escritura'))
+
+    def test_ventana_tras_escritura(self):
+        fijar_primario(self.usuario)
+        self.assertEqual(self._decidir(), ('default', 'lectura_tras_escritura'))
+        self.assertEqual(self._decidir('head'), ('default', 'lectura_tras_escritura'))
+
+    def test_dentro_de_transaccion(self):
+        conexion = connections['default']
+        conexion.in_atomic_block = True
+        try:
+            self.assertEqual(self._decidir(), ('default', 'transaccion'))
+        finally:
+            conexion.in_atomic_block = False
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_sin_replicas(self):
+        self.assertEqual(self._decidir(), ('default', 'sin_replicas'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class CabeceraLecturaTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user(username='cabecera', email='cabecera@example.com', password='x')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.usuario)
+
+    def test_escritura_fija_el_primario(self):
+        respuesta = self.client.post(reverse('distribuidora-list'), {'nombre': 'Nueva'}, format='json')
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertEqual(respuesta[CABECERA], 'default; motivo=escritura')
+
+        respuesta = self.client.get(reverse('distribuidora-list'))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta[CABECERA], 'default; motivo=lectura_tras_escritura')
+        self.assertIsNone(_replica_actual.get())
+
+    def test_escritura_fallida_no_fija(self):
+        respuesta = self.client.post(reverse('distribuidora-list'), {}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIsNone(cache.get(f'replicas:primario:{self.usuario.pk}'))
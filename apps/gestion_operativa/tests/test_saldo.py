@@ -0,0 +1,78 @@
+from decimal import Decimal
+from importlib import import_module
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import PerfilOperativo, TransaccionFinanciera
+from apps.gestion_operativa.serializers import PerfilOperativoSerializer
+
+from .factories import DatasetFactory
+
+migracion = import_module('apps.gestion_operativa.migrations.0012_transacciones_choices')
+
+
+class SaldoPerfilTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetFactory().sembrar(2)
+        cls.perfil = PerfilOperativo.objects.order_by('pk').first()
+        cls.perfil.transacciones.all().delete()
+        ahora = timezone.now()
+        TransaccionFinanciera.objects.bulk_create([
+            TransaccionFinanciera(
+                perfil=cls.perfil, tipo_transaccion=tipo, estado=estado, monto=Decimal(monto),
+                fecha_transaccion=ahora, metodo_pago='Yape',
+            )
+            for tipo, estado, monto in [
+                ('DEPOSITO', 'CONFIRMADA', '500.00'),
+                ('RETIRO', 'CONFIRMADA', '120.50'),
+                ('DEPOSITO', 'PENDIENTE', '1000.00'),
+                ('RETIRO', 'FALLIDA', '300.00'),
+                ('OTROS', 'CONFIRMADA', '999.00'),
+            ]
+        ])
+        cls.usuario = User.objects.create_user(username='saldo', email='saldo@example.com', password='x')
+
+    def test_solo_cuentan_las_confirmadas(self):
+        anotado = PerfilOperativo.objects.con_metricas().get(pk=self.perfil.pk)
+        self.assertEqual(anotado.metrica_saldo, Decimal('379.50'))
+        self.assertEqual(PerfilOperativoSerializer(anotado).data['saldo_real'], 379.5)
+        # Sin anotación se calcula con el mismo agregado
+        self.assertEqual(PerfilOperativoSerializer(self.perfil).data['saldo_real'], 379.5)
+
+    def test_choices_validados(self):
+        self.client.force_authenticate(self.usuario)
+        respuesta = self.client.post(reverse('transaccionfinanciera-list'), {
+            'perfil': self.perfil.pk, 'tipo_transaccion': 'deposito', 'monto': '10.00',
+            'fecha_transaccion': timezone.now().isoformat(), 'metodo_pago': 'Yape',
+            'estado': 'completado',
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(set(respuesta.json()), {'tipo_transaccion', 'estado'})
+
+
+class NormalizacionTransaccionesTests(SimpleTestCase):
+
+    def test_texto_libre_a_choices(self):
+        casos = {
+            'Depósito': 'DEPOSITO', 'recarga yape': 'DEPOSITO', ' retiro ': 'RETIRO',
+            'Cobro premio': 'RETIRO', 'bono bienvenida': 'OTROS', '': 'OTROS',
+        }
+        for texto, esperado in casos.items():
+            self.assertEqual(migracion._normalizar(texto, migracion.TIPOS, 'OTROS'), esperado, texto)
+        casos = {
+            'completado': 'CONFIRMADA', 'Aprobada': 'CONFIRMADA', 'fallido': 'FALLIDA',
+            'Rechazado': 'FALLIDA', 'cancelada': 'ANULADA', 'en proceso': 'PENDIENTE',
+            'Pago exitoso': 'CONFIRMADA', 'DONE': 'CONFIRMADA',
+            # Negaciones y fallos no cuentan como confirmadas
+            'incompleto': 'PENDIENTE', 'no aprobado': 'PENDIENTE', 'desaprobado': 'PENDIENTE',
+            'Pago no completado': 'PENDIENTE', 'no pagado': 'PENDIENTE', 'impagado': 'PENDIENTE',
+            'completado con error': 'FALLIDA', 'aprobado y luego cancelado': 'ANULADA',
+        }
+        for texto, esperado in casos.items():
+            self.assertEqual(migracion._normalizar(texto, migracion.ESTADOS, 'PENDIENTE'), esperado, texto)
@@ -0,0 +1,132 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa import seleccion
+from apps.gestion_operativa.choices import EstadoTransaccionChoices, TipoTransaccionChoices
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, Distribuidora, Operacion, PerfilOperativo,
+    PlanificacionRotacion, TransaccionFinanciera, Ubicacion
+)
+from apps.gestion_operativa.seleccion import indice
+
+
+class SeleccionMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        cls.casa = CasaApuestas.objects.create(
+            distribuidora=distribuidora, nombre='Casa', capital_activo_hoy=Decimal('500.00')
+        )
+        cls.casa_sin_capital = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Sin capital')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        cls.agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='seleccion', email='seleccion@example.com', password='x')
+
+        cls.holgado = cls._perfil('holgado', meta=10, saldo='300.00')
+        cls.justo = cls._perfil('justo', meta=3, saldo='900.00')
+        cls.pobre = cls._perfil('pobre', meta=10, saldo='5.00')
+        # No elegibles
+        cls._perfil('agotado', meta=1)
+        cls._perfil('inactivo', meta=10, activo=False)
+        cls._perfil('tenis', meta=10, deporte='TENNIS')
+        cls._perfil('sin_capital', meta=10, casa=cls.casa_sin_capital)
+        descansa = cls._perfil('descansa', meta=10)
+        hoy = timezone.localdate()
+        PlanificacionRotacion.objects.create(perfil=descansa, fecha=hoy, estado_dia='D', mes=hoy.month, anio=hoy.year)
+        PlanificacionRotacion.objects.create(perfil=cls.holgado, fecha=hoy, estado_dia='A', mes=hoy.month, anio=hoy.year)
+
+    @classmethod
+    def _perfil(cls, nombre, meta, saldo=None, deporte='FUTBOL', casa=None, activo=True):
+        perfil = PerfilOperativo.objects.create(
+            usuario=cls.usuario, casa=casa or cls.casa, agencia=cls.agencia, nombre_usuario=nombre,
+            tipo_jugador='PROFESIONAL', deporte_dna=deporte, ip_operativa='10.0.0.1',
+            nivel_cuenta='BRONCE', meta_ops_semanales=meta, activo=activo,
+        )
+        cls._operar(perfil)
+        if saldo:
+            TransaccionFinanciera.objects.create(
+                perfil=perfil, tipo_transaccion=TipoTransaccionChoices.DEPOSITO, monto=Decimal(saldo),
+                fecha_transaccion=timezone.now(), metodo_pago='Transferencia',
+                estado=EstadoTransaccionChoices.CONFIRMADA,
+            )
+        return perfil
+
+    @staticmethod
+    def _operar(perfil):
+        return Operacion.objects.create(
+            perfil=perfil, importe=Decimal('10.00'), cuota=Decimal('2.00'), deporte=perfil.deporte_dna
+        )
+
+    def setUp(self):
+        indice.invalidar()
+        self.addCleanup(indice.invalidar)
+
+    def _nombres(self, **kwargs):
+        return [fila['nombre_usuario'] for fila in indice.seleccionar('FUTBOL', **kwargs)]
+
+
+class IndiceSeleccionTests(SeleccionMixin, TestCase):
+
+    def test_elegibles_ordenados_por_cupo_y_saldo(self):
+        self.assertEqual(self._nombres(), ['holgado', 'pobre', 'justo'])
+        self.assertEqual(self._nombres(importe=Decimal('50')), ['holgado', 'justo'])
+        self.assertEqual(self._nombres(casa=self.casa_sin_capital.pk), [])
+        self.assertEqual(self._nombres(limite=1), ['holgado'])
+
+    def test_sin_consultas_con_el_indice_al_dia(self):
+        indice.seleccionar('FUTBOL')
+        with self.assertNumQueries(0):
+            indice.seleccionar('FUTBOL')
+
+    def test_sondeo_incremental(self):
+        indice.seleccionar('FUTBOL')
+        cargado = indice.cargado
+        self._operar(self.justo)
+        self._operar(self.justo)
+        hoy = timezone.localdate()
+        PlanificacionRotacion.objects.create(perfil=self.pobre, fecha=hoy, estado_dia='D', mes=hoy.month, anio=hoy.year)
+        CasaApuestas.objects.filter(pk=self.casa_sin_capital.pk).update(
+            capital_activo_hoy=Decimal('100.00'), fecha_actualizacion_capital=timezone.now()
+        )
+
+        with mock.patch.object(seleccion, 'INTERVALO_SONDEO', 0):
+            self.assertEqual(self._nombres(), ['holgado', 'sin_capital'])
+        # Solo se recalcularon los perfiles tocados
+        self.assertEqual(indice.cargado, cargado)
+        self.assertEqual(indice.perfiles[self.justo.pk].ops_semanales, 3)
+
+    def test_recarga_completa_recoge_borrados(self):
+        indice.seleccionar('FUTBOL')
+        PerfilOperativo.objects.filter(pk=self.holgado.pk).delete()
+        with mock.patch.object(seleccion, 'INTERVALO_RECARGA', 0):
+            self.assertEqual(self._nombres(), ['pobre', 'justo'])
+
+
+class SeleccionEndpointTests(SeleccionMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.usuario)
+
+    def test_shortlist(self):
+        respuesta = self.client.get(
+            reverse('perfiloperativo-seleccion'), {'deporte': 'futbol', 'importe': '50', 'limite': 1}
+        )
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertEqual(respuesta.json()['results'], [{
+            'id_perfil': self.holgado.pk, 'nombre_usuario': 'holgado', 'casa': self.casa.pk,
+            'casa_nombre': 'Casa', 'deporte': 'FUTBOL', 'meta_ops_semanales': 10,
+            'ops_semanales': 1, 'cupo_semanal': 9, 'saldo': '300.00',
+        }])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get(reverse('perfiloperativo-seleccion')).status_code, 400)
+        respuesta = self.client.get(reverse('perfiloperativo-seleccion'), {'deporte': 'CURLING'})
+        self.assertEqual(respuesta.status_code, 400)
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.choices import EstadoTransaccionChoices, TipoTransaccionChoices
+from apps.gestion_operativa.models import (
+    Agencia, CasaApuestas, ConfiguracionOperativa, Distribuidora, Operacion, PerfilOperativo,
+    TransaccionFinanciera, Ubicacion
+)
+from apps.gestion_operativa.simulacion import simular_bankroll
+
+
+class SimulacionMixin:
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        cls.casa = CasaApuestas.objects.create(distribuidora=distribuidora, nombre='Casa')
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        cls.agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='simulacion', email='simulacion@example.com', password='x')
+        ConfiguracionOperativa.objects.create(umbral_saldo_critico=Decimal('50.00'))
+
+        hace_un_mes = timezone.now() - timedelta(days=30)
+        # Ganó sus 10 últimas apuestas; antes perdió 15 (fuera de un historial de 10)
+        cls.ganador = cls._perfil('ganador', saldo='100.00', operaciones=[
+            *[('PERDIDA', hace_un_mes)] * 15, *[('GANADA', None)] * 10,
+        ])
+        cls.perdedor = cls._perfil('perdedor', saldo='100.00', operaciones=[('PERDIDA', None)] * 12)
+        cls.novato = cls._perfil('novato', saldo='100.00', operaciones=[('GANADA', None)] * 3)
+
+    @classmethod
+    def _perfil(cls, nombre, saldo, operaciones):
+        perfil = PerfilOperativo.objects.create(
+            usuario=cls.usuario, casa=cls.casa, agencia=cls.agencia, nombre_usuario=nombre,
+            tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.0.1', nivel_cuenta='BRONCE',
+        )
+        TransaccionFinanciera.objects.create(
+            perfil=perfil, tipo_transaccion=TipoTransaccionChoices.DEPOSITO, monto=Decimal(saldo),
+            fecha_transaccion=timezone.now(), metodo_pago='Transferencia',
+            estado=EstadoTransaccionChoices.CONFIRMADA,
+        )
+        Operacion.objects.bulk_create([
+            Operacion(
+                perfil=perfil, importe=Decimal('10.00'), cuota=Decimal('2.00'), estado=estado,
+                fecha_registro=fecha or timezone.now(),
+            )
+            for estado, fecha in operaciones
+        ])
+        # Las pendientes no cuentan
+        Operacion.objects.create(perfil=perfil, importe=Decimal('99.00'), cuota=Decimal('9.00'))
+        return perfil
+
+
+class SimularBankrollTests(SimulacionMixin, TestCase):
+
+    def _simular(self, perfil, **kwargs):
+        resultado, = simular_bankroll([perfil.pk], trayectorias=100, semilla=1, **kwargs)
+        return resultado
+
+    def test_stake_fijo(self):
+        ganador = self._simular(self.ganador, politica='fijo', fraccion=0.1, apuestas=10, historial=10)
+        self.assertEqual(ganador['operaciones'], 10)
+        self.assertEqual(
+            (ganador['riesgo_ruina'], ganador['drawdown_p99'], ganador['bankroll_final_p5'], ganador['crecimiento_esperado']),
+            (0.0, 0.0, 200.0, 1.0),
+        )
+
+        # Cae al umbral (50) en la 5ª apuesta y ahí se detiene
+        perdedor = self._simular(self.perdedor, politica='fijo', fraccion=0.1, apuestas=10)
+        self.assertEqual(
+            (perdedor['riesgo_ruina'], perdedor['drawdown_p50'], perdedor['bankroll_final_p95']),
+            (1.0, 0.5, 50.0),
+        )
+
+    def test_stake_historico_y_proporcional(self):
+        historico = self._simular(self.perdedor, politica='historico', apuestas=3)
+        self.assertEqual((historico['riesgo_ruina'], historico['bankroll_final_p50']), (0.0, 70.0))
+
+        proporcional = self._simular(self.perdedor, politica='proporcional', fraccion=0.5, apuestas=3, bankroll=Decimal('800'))
+        self.assertEqual(proporcional['bankroll_inicial'], 800.0)
+        self.assertEqual((proporcional['bankroll_final_p50'], proporcional['drawdown_p50']), (100.0, 0.875))
+
+    def test_perfiles_sin_datos_suficientes(self):
+        self.assertIn('motivo', self._simular(self.novato))
+        self.assertIn('motivo', self._simular(self.ganador, bankroll=Decimal('40')))
+
+
+class SimulacionEndpointTests(SimulacionMixin, APITestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def test_pagina_de_perfiles(self):
+        url = reverse('perfiloperativo-simulacion')
+        respuesta = self.client.get(url, {'trayectorias': 200, 'apuestas': 20, 'semilla': 3, 'page_size': 2})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        datos = respuesta.json()
+        self.assertEqual(datos['count'], 3)
+        self.assertEqual([fila['perfil'] for fila in datos['results']], [self.ganador.pk, self.novato.pk])
+        self.assertEqual(datos['results'][0]['riesgo_ruina'], 0.0)
+
+        self.assertEqual(self.client.get(url, {'politica': 'martingala'}).status_code, 400)
+        # Cada límite es válido por separado, pero el producto no cabe en un lote
+        self.assertEqual(self.client.get(url, {'trayectorias': 10_000, 'apuestas': 1000}).status_code, 400)
@@ -0,0 +1,91 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import User
+from apps.gestion_operativa.models import (
+    Agencia, AlertaOperativa, CasaApuestas, Distribuidora, PerfilOperativo, Ubicacion
+)
+from apps.gestion_operativa.vinculos import SUBRED, clusters, detectar_vinculos, subred_de
+
+
+class VinculosTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        distribuidora = Distribuidora.objects.create(nombre='Distribuidora')
+        cls.casa_a, cls.casa_b = [
+            CasaApuestas.objects.create(distribuidora=distribuidora, nombre=nombre) for nombre in ('A', 'B')
+        ]
+        ubicacion = Ubicacion.objects.create(provincia_estado='Lima', ciudad='Lima', direccion='Calle 1')
+        cls.agencia = Agencia.objects.create(nombre='Agencia', ubicacion=ubicacion, responsable='R')
+        cls.usuario = User.objects.create_user(username='vinculos', email='vinculos@example.com', password='x')
+        # Misma IP en la misma casa no vincula; la casa B comparte la subred
+        cls.a1, cls.a2, cls.b1 = [
+            PerfilOperativo.objects.create(
+                usuario=cls.usuario, casa=casa, agencia=cls.agencia, nombre_usuario=nombre,
+                tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa=ip, nivel_cuenta='BRONCE',
+            )
+            for nombre, casa, ip in [('a1', cls.casa_a, '10.0.0.1'), ('a2', cls.casa_a, '10.0.0.1'),
+                                     ('b1', cls.casa_b, '10.0.0.9')]
+        ]
+        PerfilOperativo.objects.create(
+            usuario=cls.usuario, casa=cls.casa_b, agencia=cls.agencia, nombre_usuario='lejos',
+            tipo_jugador='PROFESIONAL', deporte_dna='FUTBOL', ip_operativa='10.0.1.1', nivel_cuenta='BRONCE',
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def _alertas(self):
+        return sorted(AlertaOperativa.objects.values_list('perfil_afectado_id', 'tipo_alerta', 'severidad'))
+
+    def test_subred(self):
+        self.assertEqual(subred_de('10.0.0.77'), '10.0.0.0/24')
+        self.assertEqual(subred_de('2001:db8::1'), '2001:db8::/64')
+        grupo, = clusters(PerfilOperativo.objects.all(), SUBRED)
+        self.assertEqual(grupo['clave'], '10.0.0.0/24')
+        self.assertEqual(grupo['ids_perfiles'], [self.a1.pk, self.a2.pk, self.b1.pk])
+        self.assertEqual(grupo['ids_casas'], [self.casa_a.pk, self.casa_b.pk])
+        self.assertFalse(clusters(PerfilOperativo.objects.all()).exists())
+
+        self.assertEqual(len(detectar_vinculos()), 3)
+        self.assertEqual(detectar_vinculos(), [])
+
+    def test_alta_y_cambio_de_ip_comprueban_la_subred(self):
+        respuesta = self.client.post(reverse('perfiloperativo-list'), {
+            'usuario': self.usuario.pk, 'casa': self.casa_b.pk, 'agencia': self.agencia.pk,
+            'nombre_usuario': 'nuevo', 'tipo_jugador': 'PROFESIONAL', 'deporte_dna': 'FUTBOL',
+            'ip_operativa': '10.0.0.1', 'nivel_cuenta': 'BRONCE',
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        nuevo = respuesta.json()['id_perfil']
+        self.assertEqual(self._alertas(), [
+            (self.a1.pk, 'IP_COMPARTIDA', 'ALTA'), (self.a1.pk, 'SUBRED_COMPARTIDA', 'MEDIA'),
+            (self.a2.pk, 'IP_COMPARTIDA', 'ALTA'), (self.a2.pk, 'SUBRED_COMPARTIDA', 'MEDIA'),
+            (self.b1.pk, 'SUBRED_COMPARTIDA', 'MEDIA'), (nuevo, 'IP_COMPARTIDA', 'ALTA'),
+        ])
+        self.assertEqual(
+            AlertaOperativa.objects.get(perfil_afectado=nuevo).descripcion,
+            f'IP 10.0.0.1 compartida con perfiles de otras casas (2): {self.a1.pk}, {self.a2.pk}',
+        )
+
+        AlertaOperativa.objects.update(estado='CERRADA')
+        url = reverse('perfiloperativo-detail', args=[self.b1.pk])
+        # Sin cambio de IP ni de casa no se comprueba
+        self.assertEqual(self.client.patch(url, {'preferencias': 'x'}, format='json').status_code, 200)
+        self.assertFalse(AlertaOperativa.objects.filter(estado='ABIERTA').exists())
+        self.assertEqual(self.client.patch(url, {'ip_operativa': '10.0.0.1'}, format='json').status_code, 200)
+        self.assertIn((self.b1.pk, 'IP_COMPARTIDA'), set(
+            AlertaOperativa.objects.filter(estado='ABIERTA').values_list('perfil_afectado_id', 'tipo_alerta')
+        ))
+
+    def test_endpoint(self):
+        url = reverse('perfiloperativo-vinculos')
+        respuesta = self.client.get(url, {'nivel': 'subred', 'casa': self.casa_a.pk})
+        # Filtrando una sola casa no queda ningún grupo entre casas
+        self.assertEqual(respuesta.json()['results'], [])
+        respuesta = self.client.get(url, {'nivel': 'SUBRED'})
+        self.assertEqual(respuesta.status_code, 200)
+        grupo, = respuesta.json()['results']
+        self.assertEqual((grupo['clave'], grupo['num_perfiles'], grupo['num_casas']), ('10.0.0.0/24', 3, 2))
+        self.assertEqual(self.client.get(url, {'nivel': 'pais'}).status_code, 400)
@@ -1,20 +1,57 @@
-from rest_framework import viewsets
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, DateField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.pagination import PageNumberPagination
-
+from rest_framework.response import Response
+
+from . import filters as filtros
+from .archivo import incluir_archivo
+from .calibracion import BANDAS_CUOTA, informe_calibracion_diario
+from .capital import registrar_movimiento
+from .choices import AmbitoExposicionChoices
+from .exposicion import Aporte, LimiteExposicionExcedido, limites_generales, registrar
+from .jerarquia import arbol_en_cache
+from .lectura_rapida import listado_rapido
+from .metas import progreso as progreso_meta
 from .models import (
     Distribuidora, CasaApuestas, Ubicacion, Agencia, PerfilOperativo,
     ConfiguracionOperativa, TransaccionFinanciera, PlanificacionRotacion,
-    AlertaOperativa, BitacoraMando, Operacion
+    AlertaOperativa, BitacoraMando, Operacion, MovimientoCapital, OperacionArchivada,
+    ResumenOperacionMensual, ExposicionAbierta, VersionTabla, CONFIG_BUSQUEDA
 )
+from .rake import estado_de_cuenta
+from .replicas import ReplicaLecturaMixin
+from .seleccion import indice as indice_seleccion
+from .simulacion import simular_bankroll
+from .vinculos import NIVELES as NIVELES_VINCULO, IP, clusters, comprobar_vinculos
 from .serializers import (
     DistribuidoraSerializer, DistribuidoraExpandedSerializer,
     CasaApuestasSerializer, UbicacionSerializer, AgenciaSerializer,
     PerfilOperativoSerializer, ConfiguracionOperativaSerializer,
     TransaccionFinancieraSerializer, PlanificacionRotacionSerializer,
-    AlertaOperativaSerializer, BitacoraMandoSerializer, OperacionSerializer
+    AlertaOperativaSerializer, BitacoraMandoSerializer, BitacoraBusquedaSerializer,
+    OperacionSerializer, MovimientoCapitalSerializer, SeleccionPerfilSerializer,
+    ExposicionAbiertaSerializer, SimulacionBankrollSerializer, CalibracionSerializer,
+    ArbolSerializer, LiquidacionRakeSerializer, EstadoCuentaRakeSerializer
 )
 
+User = get_user_model()
+
 
 # ============================================================================
 # PAGINATION CLASSES
@@ -27,22 +64,156 @@ class StandardPagination(PageNumberPagination):
     max_page_size = 100
 
 
+# ============================================================================
+# MIXINS
+# ============================================================================
+
+def _campo_actualizacion(model):
+    """Nombre del primer DateTimeField con `auto_now` del modelo."""
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            return field.name
+    raise ValueError(f'{model.__name__} no tiene un campo auto_now')
+
+
+def _ultima_actualizacion(queryset):
+    """`MAX(fecha de actualización)`: un recorrido hacia atrás del índice de la columna."""
+    campo = _campo_actualizacion(queryset.model)
+    return queryset.order_by().aggregate(ultima=Max(campo))['ultima']
+
+
+def _versiones(models):
+    """Versión de borrados (`VersionTabla`) de cada modelo, en una consulta."""
+    tablas = [model._meta.db_table for model in models]
+    versiones = dict(VersionTabla.objects.filter(tabla__in=tablas).values_list('tabla', 'version'))
+    return [versiones.get(tabla, 0) for tabla in tablas]
+
+
+class PeticionCondicionalMixin:
+    """
+    GET condicional (ETag / Last-Modified) para `list` y `retrieve`.
+
+    El validador del listado es `MAX(fecha_actualizacion)` sobre el queryset
+    filtrado; el del detalle, la fecha de actualización de la fila. Los
+    borrados no mueven esa fecha: se detectan con la versión de la tabla
+    (`VersionTabla`, mantenida por triggers). Si la respuesta serializada
+    incluye datos de otros modelos (nombres relacionados), se declaran en
+    `modelos_dependientes` y su fecha máxima y versión se incorporan al ETag.
+    Todo son lecturas de índice: ningún COUNT. Con `If-None-Match` /
+    `If-Modified-Since` vigentes se responde `304` sin serializar.
+    """
+    modelos_dependientes = []
+    # Incluye la fecha del día en el ETag (métricas semanales/mensuales)
+    etag_diario = False
+    # Segundos durante los que se reutiliza el ETag de métricas calculadas
+    # sobre tablas de alto volumen, que no se declaran como dependientes
+    ventana_etag = None
+
+    def list(self, request, *args, **kwargs):
+        ultima = _ultima_actualizacion(self.filter_queryset(self.get_queryset()))
+        return self._condicional(
+            request, [ultima, request.META.get('QUERY_STRING', '')],
+            ultima, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            ultima = self.get_queryset().order_by().filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            ).values_list(_campo_actualizacion(self.queryset.model), flat=True).first()
+        except (TypeError, ValueError, DjangoValidationError):
+            # Clave mal formada (`/operaciones/abc/`): el detalle estándar responde 404
+            ultima = None
+        if ultima is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self._condicional(
+            request, [kwargs[lookup_url_kwarg], ultima],
+            ultima, super().retrieve, *args, **kwargs
+        )
+
+    def _condicional(self, request, partes, ultima, handler, *args, **kwargs):
+        fechas = [ultima]
+        modelos = [self.queryset.model, *self.modelos_dependientes]
+        for model, version in zip(modelos, _versiones(modelos)):
+            dep_ultima = ultima if model is self.queryset.model else _ultima_actualizacion(model.objects.all())
+            partes += [model._meta.label, dep_ultima, version]
+            fechas.append(dep_ultima)
+        # Las ventanas de tiempo también marcan Last-Modified: If-Modified-Since caduca con ellas
+        if self.etag_diario:
+            partes.append(timezone.localdate())
+            fechas.append(timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0))
+        if self.ventana_etag:
+            inicio = int(timezone.now().timestamp()) // self.ventana_etag * self.ventana_etag
+            partes.append(inicio)
+            fechas.append(datetime.fromtimestamp(inicio, dt_timezone.utc))
+        partes.append(request.accepted_media_type)
+
+        clave = '|'.join(str(parte) for parte in [self.queryset.model._meta.label] + partes)
+        etag = quote_etag(hashlib.md5(clave.encode()).hexdigest())
+        fechas = [fecha for fecha in fechas if fecha is not None]
+        last_modified = int(max(fechas).timestamp()) if fechas else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ListadoRapidoMixin:
+    """
+    Sirve la acción `list` con `values_list()` y la tabla de conversores de
+    `lectura_rapida`, produciendo el mismo JSON que el serializer.
+    """
+
+    def list(self, request, *args, **kwargs):
+        listado = listado_rapido(self.get_serializer_class())
+        filas = self.filas_listado(listado)
+
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(listado.representar(page))
+        return Response(listado.representar(filas))
+
+    def filas_listado(self, listado):
+        return listado.filas(self.filter_queryset(self.get_queryset()))
+
+
 # ============================================================================
 # DISTRIBUIDORAS VIEWSET
 # ============================================================================
 
-class DistribuidoraViewSet(viewsets.ModelViewSet):
+class DistribuidoraViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para Distribuidoras (Flotas).
     
     Soporta:
     - `?expand=casas`: Incluye las casas anidadas
+    - `?deporte=TENNIS[,FUTBOL]`: Distribuidoras que cubren todos esos deportes
+    - `?activo=`, `?search=` (nombre) y `?ordering=`
     - Paginación automática
     - Optimización de queries con prefetch_related
     """
-    queryset = Distribuidora.objects.all()
+    # Conteo en subconsulta correlacionada y no `Count('casas')`: sin GROUP BY,
+    # el MAX de las cabeceras condicionales y el COUNT de la paginación no
+    # recorren las casas
+    queryset = Distribuidora.objects.annotate(num_casas=Coalesce(
+        Subquery(
+            CasaApuestas.objects.filter(distribuidora=OuterRef('pk')).order_by()
+            .values('distribuidora').annotate(total=Count('pk')).values('total')
+        ),
+        0,
+    ))
     permission_classes = [IsAuthenticatedOrReadOnly]  # Allow read without auth
     pagination_class = StandardPagination
+    modelos_dependientes = [CasaApuestas]
+    filterset_class = filtros.DistribuidoraFilter
+    search_fields = ['nombre']
+    ordering_fields = ['nombre', 'fecha_actualizacion']
+    ordering = ['nombre', 'id_distribuidora']
     
     def get_queryset(self):
         """Optimiza queries según el parámetro expand."""
@@ -52,7 +223,7 @@ class DistribuidoraViewSet(viewsets.ModelViewSet):
         if 'casas' in expand:
             queryset = queryset.prefetch_related('casas')
         
-        return queryset.order_by('nombre')
+        return queryset
     
     def get_serializer_class(self):
         """Retorna serializer expandido si se solicita."""
@@ -62,152 +233,447 @@ class DistribuidoraViewSet(viewsets.ModelViewSet):
             return DistribuidoraExpandedSerializer
         return DistribuidoraSerializer
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def arbol(self, request):
+        """
+        Totales por distribuidora → casa → agencia → perfil en una respuesta
+        (perfiles, activos, saldo, P&L, operaciones de la semana y capital).
+        `?niveles=` (repetible) elige los niveles; los omitidos se colapsan.
+        `?activo=true|false` filtra cada nivel. Ver `jerarquia.py`.
+        """
+        parametros = ArbolSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        return Response(arbol_en_cache(**parametros.validated_data))
+
 
 # ============================================================================
 # CASAS DE APUESTAS VIEWSET
 # ============================================================================
 
-class CasaApuestasViewSet(viewsets.ModelViewSet):
+class CasaApuestasViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     """
     ViewSet para Casas de Apuestas.
     
     Soporta:
     - `?distribuidora=ID`: Filtra por distribuidora
+    - `?deporte=TENNIS[,FUTBOL]`: Casas cuya distribuidora cubre esos deportes
+    - `?activo=`, `?search=` (nombre) y `?ordering=`
     - Paginación automática
+
+    Los saldos de capital son de solo lectura; se modifican registrando
+    movimientos en `/{id}/movimientos/`.
     """
     queryset = CasaApuestas.objects.select_related('distribuidora').all()
     serializer_class = CasaApuestasSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]  # Allow read without auth
     pagination_class = StandardPagination
-    
-    def get_queryset(self):
-        """Filtra por distribuidora si se especifica."""
-        queryset = super().get_queryset()
-        distribuidora_id = self.request.query_params.get('distribuidora')
-        
-        if distribuidora_id:
-            queryset = queryset.filter(distribuidora_id=distribuidora_id)
-        
-        return queryset.order_by('nombre')
+    modelos_dependientes = [Distribuidora]
+    filterset_class = filtros.CasaApuestasFilter
+    search_fields = ['nombre']
+    ordering_fields = ['nombre', 'fecha_actualizacion_capital']
+    ordering = ['nombre', 'id_casa']
+
+    @action(detail=True, methods=['get', 'post'])
+    def movimientos(self, request, pk=None):
+        """
+        GET: libro de movimientos de la casa, del más reciente al más antiguo.
+        POST: registra un movimiento y aplica sus deltas de forma atómica;
+        responde con el movimiento y los saldos resultantes.
+        """
+        casa = self.get_object()
+        if request.method == 'GET':
+            queryset = MovimientoCapital.objects.filter(casa=casa).select_related(
+                'usuario_registro'
+            ).order_by('-fecha_registro', '-id_movimiento')
+            page = self.paginate_queryset(queryset)
+            serializer = MovimientoCapitalSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = MovimientoCapitalSerializer(data=request.data, context={'casa': casa})
+        serializer.is_valid(raise_exception=True)
+        movimiento, saldos = registrar_movimiento(
+            casa.pk, usuario=request.user, **serializer.validated_data
+        )
+        return Response(
+            {**MovimientoCapitalSerializer(movimiento).data, 'saldos': saldos},
+            status=status.HTTP_201_CREATED,
+        )
 
 
 # ============================================================================
 # UBICACIONES VIEWSET
 # ============================================================================
 
-class UbicacionViewSet(viewsets.ModelViewSet):
+class UbicacionViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para Ubicaciones normalizadas."""
     queryset = Ubicacion.objects.all()
     serializer_class = UbicacionSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    filterset_class = filtros.UbicacionFilter
+    ordering_fields = ['ciudad', 'id_ubicacion']
+    ordering = ['ciudad', 'id_ubicacion']
 
 
 # ============================================================================
 # AGENCIAS VIEWSET
 # ============================================================================
 
-class AgenciaViewSet(viewsets.ModelViewSet):
+class AgenciaViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para Agencias con ubicación y casa madre."""
     queryset = Agencia.objects.select_related('ubicacion', 'casa_madre').all()
     serializer_class = AgenciaSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    modelos_dependientes = [Ubicacion, CasaApuestas]
+    filterset_class = filtros.AgenciaFilter
+    search_fields = ['nombre']
+    ordering_fields = ['nombre', 'fecha_registro']
+    ordering = ['nombre', 'id_agencia']
+
+    @action(detail=True, methods=['get'])
+    def liquidaciones(self, request, pk=None):
+        """
+        Estado de cuenta del rake de la agencia: por mes, el total liquidado y
+        sus líneas (liquidación y ajustes). `?desde=AAAA-MM`, `?hasta=AAAA-MM`.
+        Las liquidaciones se generan con `liquidar_rake` (ver `rake.py`).
+        """
+        agencia = self.get_object()
+        parametros = EstadoCuentaRakeSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        meses = estado_de_cuenta(agencia, **parametros.validated_data)
+        for mes in meses:
+            mes['lineas'] = LiquidacionRakeSerializer(mes['lineas'], many=True).data
+        return Response({
+            'agencia': agencia.pk,
+            'base_rake': agencia.base_rake,
+            'rake_porcentaje': agencia.rake_porcentaje,
+            'total_rake': sum((mes['rake'] for mes in meses), Decimal('0.00')),
+            'meses': meses,
+        })
 
 
 # ============================================================================
 # OPERACIONES VIEWSET
 # ============================================================================
 
-class OperacionViewSet(viewsets.ModelViewSet):
+class OperacionViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     """
     ViewSet para Operaciones/Apuestas.
     
     Soporta:
-    - `?perfil=ID`: Filtra por perfil
+    - `?perfil=ID`, `?agencia=ID`, `?casa=ID`
+    - `?fecha_desde=` / `?fecha_hasta=` sobre fecha_registro
+    - `?estado=` (repetible), `?deporte=`, `?mercado=`
+    - `?ordering=` sobre columnas indexadas
+    - Listado rápido sin instanciar el serializer por fila
+    - `?incluir_archivo=true`: incluye las operaciones archivadas
+    - Altas, cambios y bajas actualizan la exposición abierta en la misma
+      transacción; si la apuesta supera un límite se rechaza con 400
     """
     queryset = Operacion.objects.select_related('perfil').all()
     serializer_class = OperacionSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
-    
-    def get_queryset(self):
-        """Filtra por perfil si se especifica."""
-        queryset = super().get_queryset()
-        perfil_id = self.request.query_params.get('perfil')
-        
-        if perfil_id:
-            queryset = queryset.filter(perfil_id=perfil_id)
-        
-        return queryset
+    modelos_dependientes = [PerfilOperativo]
+    filterset_class = filtros.OperacionFilter
+    ordering_fields = ['fecha_registro', 'id_operacion']
+    ordering = ['-fecha_registro', '-id_operacion']
+
+    def filas_listado(self, listado):
+        activas = self.filter_queryset(self.get_queryset())
+        if not incluir_archivo(self.request):
+            return listado.filas(activas)
+        archivadas = filtros.OperacionArchivadaFilter(
+            self.request.query_params, queryset=OperacionArchivada.objects.all(), request=self.request
+        ).qs
+        return listado.filas(activas.order_by()).union(
+            listado.filas(archivadas), all=True
+        ).order_by(*activas.query.order_by)
+
+    def perform_create(self, serializer):
+        with transaction.atomic(), self._limites():
+            registrar(poner=[Aporte.de(serializer.save())], comprobar=True)
+
+    def perform_update(self, serializer):
+        with transaction.atomic(), self._limites():
+            # Bloquea la fila: una liquidación concurrente no la descuenta dos veces
+            anterior = Aporte.de(
+                Operacion.objects.select_related('perfil').select_for_update(of=('self',))
+                .get(pk=serializer.instance.pk)
+            )
+            registrar(quitar=[anterior], poner=[Aporte.de(serializer.save())], comprobar=True)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            anterior = Aporte.de(
+                Operacion.objects.select_related('perfil').select_for_update(of=('self',)).get(pk=instance.pk)
+            )
+            instance.delete()
+            registrar(quitar=[anterior])
+
+    @staticmethod
+    @contextmanager
+    def _limites():
+        try:
+            yield
+        except LimiteExposicionExcedido as error:
+            raise ValidationError({'exposicion': error.excesos})
+
+    @action(detail=False, methods=['get'])
+    def exposicion(self, request):
+        """
+        Stake abierto y payout potencial de las operaciones pendientes por
+        ámbito (`?ambito=PERFIL|CASA|AGENCIA|MERCADO`, `?clave=`), de mayor a
+        menor stake, con el límite que se aplica a cada fila.
+        """
+        queryset = ExposicionAbierta.objects.order_by('-importe_abierto', 'ambito', 'clave')
+        ambito = request.query_params.get('ambito')
+        if ambito:
+            ambito = ambito.upper()
+            if ambito not in AmbitoExposicionChoices.values:
+                raise ValidationError({'ambito': f'Valores posibles: {", ".join(AmbitoExposicionChoices.values)}.'})
+            queryset = queryset.filter(ambito=ambito)
+        if 'clave' in request.query_params:
+            queryset = queryset.filter(clave=request.query_params['clave'])
+
+        page = self.paginate_queryset(queryset)
+        serializer = ExposicionAbiertaSerializer(
+            page, many=True, context={'limites_generales': limites_generales()}
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def resumen(self, request):
+        """
+        Totales por mes (operaciones, stake, payout y P&L) con los filtros del
+        listado. Con `?incluir_archivo=true` suma el resumen mensual de las
+        operaciones archivadas; en ese caso las fechas se aplican por mes.
+        """
+        totales = ['num_operaciones', 'importe_total', 'payout_total', 'profit_loss_total']
+        meses = {}
+        activas = self.filter_queryset(self.get_queryset()).order_by().annotate(
+            mes=TruncMonth('fecha_registro', output_field=DateField(), tzinfo=dt_timezone.utc)
+        ).values('mes').annotate(
+            num_operaciones=Count('pk'),
+            importe_total=Coalesce(Sum('importe'), Decimal(0)),
+            payout_total=Coalesce(Sum('payout'), Decimal(0)),
+            profit_loss_total=Coalesce(Sum('profit_loss'), Decimal(0)),
+        )
+        for fila in activas:
+            meses[fila['mes']] = fila
+
+        if incluir_archivo(request):
+            archivadas = filtros.ResumenOperacionMensualFilter(
+                request.query_params, queryset=ResumenOperacionMensual.objects.all(), request=request
+            ).qs.order_by().values('mes').annotate(**{campo: Sum(campo) for campo in totales})
+            for fila in archivadas:
+                acumulado = meses.setdefault(fila['mes'], {'mes': fila['mes'], **dict.fromkeys(totales, 0)})
+                for campo in totales:
+                    acumulado[campo] += fila[campo]
+
+        return Response([meses[mes] for mes in sorted(meses)])
+
+    @action(detail=False, methods=['get'])
+    def calibracion(self, request):
+        """
+        Calibración de cuotas por tramo: probabilidad implícita frente a tasa
+        de acierto real (con intervalo de Wilson al 95 %), P&L y yield.
+        `?agrupar=deporte|mercado` (repetible), `?deporte=`, `?mercado=`,
+        `?fecha_desde=`, `?fecha_hasta=`. Se calcula una vez al día por
+        combinación de parámetros. Ver `calibracion.py`.
+        """
+        parametros = CalibracionSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        return Response({
+            'fecha': timezone.localdate(),
+            'bandas': BANDAS_CUOTA,
+            'results': informe_calibracion_diario(**parametros.validated_data),
+        })
 
 
 # ============================================================================
 # PERFILES OPERATIVOS VIEWSET
 # ============================================================================
 
-class PerfilOperativoViewSet(viewsets.ModelViewSet):
+class PerfilOperativoViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     queryset = PerfilOperativo.objects.select_related(
-        'usuario', 'casa', 'agencia'
+        'usuario', 'casa', 'agencia', 'agencia__ubicacion'
     ).all()
     serializer_class = PerfilOperativoSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    modelos_dependientes = [User, CasaApuestas, Agencia, Ubicacion]
+    etag_diario = True
+    # Las métricas salen de operaciones y transacciones: se refrescan por ventana
+    ventana_etag = 60
+    filterset_class = filtros.PerfilOperativoFilter
+    search_fields = ['nombre_usuario']
+    ordering_fields = ['nombre_usuario', 'id_perfil']
+    ordering = ['nombre_usuario', 'id_perfil']
+
+    def get_queryset(self):
+        """Anota las métricas calculadas para evitar consultas por perfil."""
+        return super().get_queryset().con_metricas()
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            comprobar_vinculos(serializer.save())
+
+    def perform_update(self, serializer):
+        anterior = (serializer.instance.ip_operativa, serializer.instance.casa_id)
+        with transaction.atomic():
+            perfil = serializer.save()
+            # Solo un cambio de IP o de casa puede crear vínculos nuevos
+            if (perfil.ip_operativa, perfil.casa_id) != anterior:
+                comprobar_vinculos(perfil)
+
+    @action(detail=False, methods=['get'])
+    def seleccion(self, request):
+        """
+        Perfiles elegibles para una nueva apuesta, ordenados por cupo semanal
+        restante y saldo (`?deporte=` obligatorio; `casa`, `importe`, `limite`).
+        Se sirve del índice en memoria de `seleccion.py`, no de un listado.
+        """
+        parametros = SeleccionPerfilSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        return Response({'results': indice_seleccion.seleccionar(**parametros.validated_data)})
+
+    @action(detail=False, methods=['get'])
+    def simulacion(self, request):
+        """
+        Simulación Monte Carlo del bankroll de los perfiles de la página
+        (admite los filtros del listado): riesgo de ruina, drawdown y
+        crecimiento esperado según la política de stake. Ver `simulacion.py`.
+        """
+        parametros = SimulacionBankrollSerializer(data=request.query_params)
+        parametros.is_valid(raise_exception=True)
+        # Sin las métricas de get_queryset: solo hacen falta los ids
+        perfiles = self.filter_queryset(PerfilOperativo.objects.all()).values_list('id_perfil', flat=True)
+        page = self.paginate_queryset(perfiles)
+        return self.get_paginated_response(simular_bankroll(page, **parametros.validated_data))
+
+    @action(detail=False, methods=['get'])
+    def vinculos(self, request):
+        """
+        Grupos de perfiles de casas distintas que comparten IP o subred
+        (`?nivel=ip|subred`, admite los filtros del listado). Ver `vinculos.py`.
+        """
+        nivel = request.query_params.get('nivel', IP).lower()
+        if nivel not in NIVELES_VINCULO:
+            raise ValidationError({'nivel': f'Valores posibles: {", ".join(NIVELES_VINCULO)}.'})
+        grupos = clusters(self.filter_queryset(PerfilOperativo.objects.all()), nivel)
+        return self.get_paginated_response(self.paginate_queryset(grupos))
 
 
 # ============================================================================
 # CONFIGURACIÓN OPERATIVA VIEWSET
 # ============================================================================
 
-class ConfiguracionOperativaViewSet(viewsets.ModelViewSet):
+class ConfiguracionOperativaViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     queryset = ConfiguracionOperativa.objects.all()
     serializer_class = ConfiguracionOperativaSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(detail=False, methods=['get'])
+    def progreso(self, request):
+        """
+        Volumen del día frente a `meta_volumen_diario`. Los contadores del día
+        se cachean `PROGRESO_CACHE_SEGUNDOS`; la meta la recalcula
+        `actualizar_meta_diaria` (ver `metas.py`).
+        """
+        configuracion = ConfiguracionOperativa.objects.first()
+        if configuracion is None:
+            raise NotFound('No hay configuración operativa.')
+        return Response(progreso_meta(configuracion))
+
 
 # ============================================================================
 # TRANSACCIONES FINANCIERAS VIEWSET
 # ============================================================================
 
-class TransaccionFinancieraViewSet(viewsets.ModelViewSet):
+class TransaccionFinancieraViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     queryset = TransaccionFinanciera.objects.select_related('perfil').all()
     serializer_class = TransaccionFinancieraSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    modelos_dependientes = [PerfilOperativo]
+    filterset_class = filtros.TransaccionFinancieraFilter
+    ordering_fields = ['fecha_transaccion', 'id_transaccion']
+    ordering = ['-fecha_transaccion', '-id_transaccion']
 
 
 # ============================================================================
 # PLANIFICACIÓN ROTACIÓN VIEWSET
 # ============================================================================
 
-class PlanificacionRotacionViewSet(viewsets.ModelViewSet):
+class PlanificacionRotacionViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, ListadoRapidoMixin, viewsets.ModelViewSet):
     queryset = PlanificacionRotacion.objects.select_related('perfil').all()
     serializer_class = PlanificacionRotacionSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    modelos_dependientes = [PerfilOperativo]
+    filterset_class = filtros.PlanificacionRotacionFilter
+    ordering_fields = ['fecha', 'id_planificacion']
+    ordering = ['-fecha', 'id_planificacion']
 
 
 # ============================================================================
 # ALERTAS OPERATIVAS VIEWSET
 # ============================================================================
 
-class AlertaOperativaViewSet(viewsets.ModelViewSet):
+class AlertaOperativaViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     queryset = AlertaOperativa.objects.select_related(
         'perfil_afectado', 'casa_afectada'
     ).all()
     serializer_class = AlertaOperativaSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    modelos_dependientes = [PerfilOperativo, CasaApuestas]
+    filterset_class = filtros.AlertaOperativaFilter
+    ordering_fields = ['id_alerta', 'fecha_actualizacion']
+    ordering = ['-id_alerta']
 
 
 # ============================================================================
 # BITÁCORA DE MANDO VIEWSET
 # ============================================================================
 
-class BitacoraMandoViewSet(viewsets.ModelViewSet):
+class BitacoraMandoViewSet(ReplicaLecturaMixin, PeticionCondicionalMixin, viewsets.ModelViewSet):
     queryset = BitacoraMando.objects.select_related(
         'perfil', 'usuario_registro'
     ).all()
     serializer_class = BitacoraMandoSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardPagination
+    modelos_dependientes = [User]
+    filterset_class = filtros.BitacoraMandoFilter
+    ordering_fields = ['fecha_registro', 'id_bitacora']
+    ordering = ['-fecha_registro', '-id_bitacora']
+
+    @action(detail=False, methods=['get'])
+    def buscar(self, request):
+        """
+        Búsqueda full-text en las observaciones (`?q=`, sintaxis websearch:
+        comillas, `or`, `-palabra`). Admite los filtros del listado
+        (`perfil`, `fecha_desde`, `fecha_hasta`) y ordena por relevancia.
+        """
+        texto = request.query_params.get('q', '').strip()
+        if not texto:
+            raise ValidationError({'q': 'Indique el texto a buscar.'})
+
+        consulta = SearchQuery(texto, config=CONFIG_BUSQUEDA, search_type='websearch')
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            observacion_busqueda=consulta
+        ).annotate(
+            relevancia=SearchRank('observacion_busqueda', consulta),
+            # ts_headline es caro: PostgreSQL lo evalúa solo sobre la página
+            fragmento=SearchHeadline(
+                'observacion', consulta, config=CONFIG_BUSQUEDA,
+                start_sel='<mark>', stop_sel='</mark>', max_fragments=2,
+            ),
+        ).order_by('-relevancia', '-fecha_registro', '-id_bitacora')
+
+        page = self.paginate_queryset(queryset)
+        serializer = BitacoraBusquedaSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,125 @@
+"""
+Vinculación de cuentas por IP: perfiles de casas distintas que comparten la
+IP operativa o su subred (/24 en IPv4, /64 en IPv6). Para la casa, dos
+cuentas desde la misma red son probablemente la misma persona.
+
+- `clusters`: grupos por IP o subred con perfiles de más de una casa, con
+  una consulta agrupada que se resuelve con los índices `perfiles_ip_idx` y
+  `perfiles_subred_idx` (expresión `SubredIP`).
+- `comprobar_vinculos`: al crear un perfil o cambiar su IP o su casa se
+  evalúa solo su subred (búsqueda por índice) y se abren las alertas de los
+  perfiles que quedan vinculados.
+- `detectar_vinculos`: la misma evaluación sobre todas las subredes con más
+  de una casa, para la carga inicial o una revisión periódica.
+
+Alertas: `IP_COMPARTIDA` (ALTA) si otra casa tiene un perfil con la misma IP
+y `SUBRED_COMPARTIDA` (MEDIA) si solo coincide la subred. No se abre una
+alerta si el perfil ya tiene otra ABIERTA del mismo tipo. Los perfiles sin
+casa no cuentan.
+"""
+import ipaddress
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, F
+
+from .models import AlertaOperativa, PerfilOperativo, SubredIP
+
+IP = 'ip'
+SUBRED = 'subred'
+NIVELES = [IP, SUBRED]
+
+IP_COMPARTIDA = 'IP_COMPARTIDA'
+SUBRED_COMPARTIDA = 'SUBRED_COMPARTIDA'
+TIPOS = [IP_COMPARTIDA, SUBRED_COMPARTIDA]
+# Perfiles vinculados que se citan en la descripción de la alerta
+MAX_CITADOS = 5
+
+
+def subred_de(ip):
+    """La subred de `SubredIP` calculada en Python (mismo texto que PostgreSQL)."""
+    direccion = ipaddress.ip_address(ip)
+    prefijo = 24 if direccion.version == 4 else 64
+    return str(ipaddress.ip_network(f'{direccion}/{prefijo}', strict=False))
+
+
+def clusters(perfiles, nivel=IP):
+    """
+    Grupos de `perfiles` (queryset) que comparten IP o subred entre casas
+    distintas, de más a menos casas implicadas.
+    """
+    clave = F('ip_operativa') if nivel == IP else SubredIP('ip_operativa')
+    return perfiles.filter(casa__isnull=False).order_by().annotate(clave=clave).values('clave').annotate(
+        num_perfiles=Count('pk'),
+        num_casas=Count('casa', distinct=True),
+        ids_perfiles=ArrayAgg('pk', ordering='pk'),
+        ids_casas=ArrayAgg('casa', distinct=True, ordering='casa'),
+    ).filter(num_casas__gt=1).order_by('-num_casas', '-num_perfiles', 'clave')
+
+
+def comprobar_vinculos(perfil, crear=True):
+    """Alertas nuevas de la subred de `perfil` (recién creado o con otra IP o casa)."""
+    if perfil.casa_id is None:
+        return []
+    filas = _con_subred(PerfilOperativo.objects.all()).filter(subred=subred_de(perfil.ip_operativa))
+    return _abrir_alertas(filas, crear)
+
+
+def detectar_vinculos(crear=True):
+    """Alertas nuevas de todas las subredes compartidas entre casas."""
+    subredes = clusters(PerfilOperativo.objects.all(), SUBRED).values('clave')
+    return _abrir_alertas(_con_subred(PerfilOperativo.objects.all()).filter(subred__in=subredes), crear)
+
+
+def _con_subred(queryset):
+    return queryset.filter(casa__isnull=False).annotate(subred=SubredIP('ip_operativa'))
+
+
+def _abrir_alertas(queryset, crear):
+    subredes = defaultdict(list)
+    for pk, ip, subred, casa in queryset.order_by('pk').values_list('pk', 'ip_operativa', 'subred', 'casa_id'):
+        subredes[subred].append((pk, ip, casa))
+
+    candidatas = []
+    for subred, miembros in subredes.items():
+        por_casa = Counter(casa for _, _, casa in miembros)
+        por_ip = Counter(ip for _, ip, _ in miembros)
+        por_ip_casa = Counter((ip, casa) for _, ip, casa in miembros)
+        for pk, ip, casa in miembros:
+            misma_ip = por_ip[ip] - por_ip_casa[ip, casa]
+            solo_subred = len(miembros) - por_casa[casa] - misma_ip
+            if misma_ip:
+                citados = _citados(o for o, o_ip, o_casa in miembros if o_casa != casa and o_ip == ip)
+                candidatas.append((pk, casa, IP_COMPARTIDA, f'IP {ip}', misma_ip, citados))
+            if solo_subred:
+                citados = _citados(o for o, o_ip, o_casa in miembros if o_casa != casa and o_ip != ip)
+                candidatas.append((pk, casa, SUBRED_COMPARTIDA, f'Subred {subred}', solo_subred, citados))
+
+    abiertas = set(AlertaOperativa.objects.filter(
+        perfil_afectado__in={pk for pk, *_ in candidatas}, tipo_alerta__in=TIPOS, estado='ABIERTA',
+    ).values_list('perfil_afectado_id', 'tipo_alerta'))
+    alertas = [
+        AlertaOperativa(
+            tipo_alerta=tipo,
+            descripcion=_descripcion(red, total, citados),
+            severidad='ALTA' if tipo == IP_COMPARTIDA else 'MEDIA',
+            perfil_afectado_id=pk,
+            casa_afectada_id=casa,
+            estado='ABIERTA',
+        )
+        for pk, casa, tipo, red, total, citados in candidatas
+        if (pk, tipo) not in abiertas
+    ]
+    if crear:
+        AlertaOperativa.objects.bulk_create(alertas, batch_size=1000)
+    return alertas
+
+
+def _citados(perfiles):
+    return ', '.join(str(pk) for pk in islice(perfiles, MAX_CITADOS))
+
+
+def _descripcion(red, total, citados):
+    resto = f' y {total - MAX_CITADOS} más' if total > MAX_CITADOS else ''
+    return f'{red} compartida con perfiles de otras casas ({total}): {citados}{resto}'
@@ -39,11 +39,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
+    'django_filters',
     
     # Local apps
     'apps.authentication',
@@ -96,6 +98,33 @@ DATABASES = {
     }
 }
 
+# Read replicas: DB_REPLICAS=[name@]host[:port],... (omitted parts are taken
+# from the primary, so `DB_REPLICAS=replica@` is a second local database).
+# Safe GETs on gestion_operativa go to a replica; see gestion_operativa/replicas.py.
+DATABASE_REPLICAS = []
+for _indice, _replica in enumerate(filter(None, config('DB_REPLICAS', default='').split(',')), start=1):
+    _nombre, _, _direccion = _replica.strip().rpartition('@')
+    _host, _, _puerto = _direccion.partition(':')
+    DATABASES[f'replica_{_indice}'] = {
+        **DATABASES['default'],
+        'NAME': _nombre or DATABASES['default']['NAME'],
+        'HOST': _host or DATABASES['default']['HOST'],
+        'PORT': _puerto or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{_indice}')
+
+DATABASE_ROUTERS = ['apps.gestion_operativa.replicas.ReplicaRouter']
+
+# Seconds a client stays pinned to the primary after a write (read-your-writes).
+REPLICA_VENTANA_PRIMARIO = config('REPLICA_VENTANA_PRIMARIO', default=5, cast=int)
+
+# Seconds the distribuidora → casa → agencia → perfil rollup tree is cached.
+ARBOL_CACHE_SEGUNDOS = config('ARBOL_CACHE_SEGUNDOS', default=60, cast=int)
+
+# Seconds today's operation counters behind the daily target progress endpoint are cached.
+PROGRESO_CACHE_SEGUNDOS = config('PROGRESO_CACHE_SEGUNDOS', default=30, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
 
@@ -149,13 +178,26 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'apps.gestion_operativa.renderers.ORJSONRenderer',
+        'apps.gestion_operativa.renderers.StdJSONRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'apps.gestion_operativa.parsers.ORJSONParser',
     ),
+    'DEFAULT_FILTER_BACKENDS': (
+        'django_filters.rest_framework.DjangoFilterBackend',
+        'rest_framework.filters.SearchFilter',
+        'rest_framework.filters.OrderingFilter',
+    ),
+    # Decimals reach the renderer untouched; JSON_DECIMAL_ENCODING decides
+    # whether they are written as strings or floats.
+    'COERCE_DECIMAL_TO_STRING': False,
 }
 
+# 'str' keeps DRF's default decimal output; 'float' emits JSON numbers.
+# Clients can override per request with `Accept: application/json; decimals=float`.
+JSON_DECIMAL_ENCODING = config('JSON_DECIMAL_ENCODING', default='str')
+
 # Simple JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),